@@ -1,5 +1,10 @@
 from langgraph.graph import StateGraph, START, END
-from langchain_groq import ChatGroq
+from utils.llm import invoke_model, ainvoke_model
+from utils.ats_scoring import compute_ats_score
+from utils.keyword_matcher import analyze_keywords
+from utils.prompting import build_prompt, project
+from utils.telemetry import traced_node
+from utils.checkpointing import run_graph, arun_graph
 from langchain_core.messages import HumanMessage
 from typing import TypedDict
 from dotenv import load_dotenv
@@ -11,6 +16,7 @@ load_dotenv()
 class ATSState(TypedDict):
     extracted_json: dict
     ats_score: int
+    score_breakdown: dict
     keyword_analysis: dict
     formatting_issues: list
     missing_sections: list
@@ -27,12 +33,6 @@ Resume Data:
 
 Provide your analysis in the following JSON format:
 {{
-  "ats_score": 85,
-  "keyword_analysis": {{
-    "technical_keywords": ["Python", "JavaScript"],
-    "soft_skills": ["Leadership", "Communication"],
-    "missing_important_keywords": ["Cloud", "Docker"]
-  }},
   "formatting_issues": [
     "Missing consistent date formatting",
     "Email format not standard"
@@ -51,41 +51,29 @@ Provide your analysis in the following JSON format:
 Be specific and actionable in your suggestions.
 """
 
-SCORE_CALCULATION_PROMPT = """
-Based on the following analysis, calculate a final ATS score (0-100):
-
-Analysis:
-{analysis}
-
-Consider:
-- Presence of key sections (name, contact, experience, education, skills)
-- Keyword density and relevance
-- Formatting consistency
-- Completeness of information
-
-Return ONLY a number between 0-100.
-"""
-
 # Node 1: Analyze ATS compatibility
-def analyze_ats_node(state: ATSState) -> ATSState:
-    model = ChatGroq(model="llama-3.1-8b-instant", temperature=0.3)
-    
-    resume_data = json.dumps(state["extracted_json"], indent=2)
-    message = HumanMessage(content=ATS_ANALYSIS_PROMPT.format(resume_data=resume_data))
-    
-    response = model.invoke([message])
-    
+# Resume fields the analysis looks at
+ANALYSIS_FIELDS = ["name", "email", "phone", "professional_summary", "education", "skills",
+                   "experience", "certifications", "projects", "raw_output"]
+
+def _analysis_message(state: ATSState) -> HumanMessage:
+    return HumanMessage(content=build_prompt(
+        "ats_analysis",
+        ATS_ANALYSIS_PROMPT,
+        {"resume_data": project(state["extracted_json"], ANALYSIS_FIELDS)},
+        baseline={"resume_data": state["extracted_json"]}
+    ))
+
+def _apply_analysis(state: ATSState, content: str) -> ATSState:
+    # Keywords come from the local taxonomy matcher, not the LLM
+    state["keyword_analysis"] = analyze_keywords(state["extracted_json"])
     try:
-        analysis = json.loads(response.content)
-        state["ats_score"] = analysis.get("ats_score", 0)
-        state["keyword_analysis"] = analysis.get("keyword_analysis", {})
+        analysis = json.loads(content)
         state["formatting_issues"] = analysis.get("formatting_issues", [])
         state["missing_sections"] = analysis.get("missing_sections", [])
         state["suggestions"] = analysis.get("suggestions", [])
     except json.JSONDecodeError:
         # Fallback if JSON parsing fails
-        state["ats_score"] = 50
-        state["keyword_analysis"] = {}
         state["formatting_issues"] = ["Unable to analyze formatting"]
         state["missing_sections"] = []
         state["suggestions"] = ["Review resume structure manually"]
@@ -93,29 +81,24 @@ def analyze_ats_node(state: ATSState) -> ATSState:
     print("✅ ATS Analysis complete")
     return state
 
-# Node 2: Calculate final score
+def analyze_ats_node(state: ATSState) -> ATSState:
+    response = invoke_model([_analysis_message(state)], temperature=0.3)
+    return _apply_analysis(state, response.content)
+
+async def aanalyze_ats_node(state: ATSState) -> ATSState:
+    response = await ainvoke_model([_analysis_message(state)], temperature=0.3)
+    return _apply_analysis(state, response.content)
+
+# Node 2: Calculate final score (local, rule-based)
 def calculate_score_node(state: ATSState) -> ATSState:
-    model = ChatGroq(model="llama-3.1-8b-instant", temperature=0.1)
-    
-    analysis_summary = {
-        "keyword_analysis": state["keyword_analysis"],
-        "formatting_issues": state["formatting_issues"],
-        "missing_sections": state["missing_sections"]
-    }
-    
-    message = HumanMessage(content=SCORE_CALCULATION_PROMPT.format(
-        analysis=json.dumps(analysis_summary, indent=2)
-    ))
-    
-    response = model.invoke([message])
-    
-    try:
-        # Extract number from response
-        score = int(''.join(filter(str.isdigit, response.content)))
-        state["ats_score"] = min(max(score, 0), 100)  # Clamp between 0-100
-    except:
-        # Keep the score from analysis node if calculation fails
-        pass
+    result = compute_ats_score(
+        state["extracted_json"],
+        state["keyword_analysis"],
+        state["formatting_issues"],
+        state["missing_sections"]
+    )
+    state["ats_score"] = result["ats_score"]
+    state["score_breakdown"] = result["components"]
     
     print(f"✅ Final ATS Score: {state['ats_score']}/100")
     return state
@@ -125,6 +108,7 @@ def generate_report_node(state: ATSState) -> ATSState:
     state["final_report"] = {
         "ats_score": state["ats_score"],
         "score_category": get_score_category(state["ats_score"]),
+        "score_breakdown": state["score_breakdown"],
         "keyword_analysis": state["keyword_analysis"],
         "formatting_issues": state["formatting_issues"],
         "missing_sections": state["missing_sections"],
@@ -169,23 +153,16 @@ def generate_summary(state: ATSState) -> str:
     
     return summary
 
-def ats_agent(extracted_json: dict) -> dict:
-    """
-    Main ATS agent function using LangGraph
-    
-    Args:
-        extracted_json: Structured resume data from extractor_agent
-    
-    Returns:
-        dict: Complete ATS analysis report
-    """
+def build_ats_graph():
+    """Build and compile the ATS analysis graph"""
     # Create the graph
     workflow = StateGraph(ATSState)
     
     # Add nodes
-    workflow.add_node("analyze", analyze_ats_node)
-    workflow.add_node("calculate_score", calculate_score_node)
-    workflow.add_node("generate_report", generate_report_node)
+    # LLM nodes carry an async twin so the same app serves invoke and ainvoke
+    workflow.add_node("analyze", traced_node("ats.analyze", analyze_ats_node, aanalyze_ats_node))
+    workflow.add_node("calculate_score", traced_node("ats.calculate_score", calculate_score_node))
+    workflow.add_node("generate_report", traced_node("ats.generate_report", generate_report_node))
     
     # Define workflow
     workflow.add_edge(START, "analyze")
@@ -194,21 +171,41 @@ def ats_agent(extracted_json: dict) -> dict:
     workflow.add_edge("generate_report", END)
     
     # Compile
-    app = workflow.compile()
-    
-    # Initial state
-    initial_state = {
+    return workflow.compile()
+
+# Compiled once at import and reused by every ats_agent call
+ats_app = build_ats_graph()
+
+def _initial_state(extracted_json: dict) -> ATSState:
+    return {
         "extracted_json": extracted_json,
         "ats_score": 0,
+        "score_breakdown": {},
         "keyword_analysis": {},
         "formatting_issues": [],
         "missing_sections": [],
         "suggestions": [],
         "final_report": {}
     }
+
+def ats_agent(extracted_json: dict, run_id: str = None) -> dict:
+    """
+    Main ATS agent function using LangGraph
+    
+    Args:
+        extracted_json: Structured resume data from extractor_agent
+        run_id: Checkpoint the graph under this run (resumes an interrupted run)
     
-    # Run the workflow
-    final_state = app.invoke(initial_state)
+    Returns:
+        dict: Complete ATS analysis report
+    """
+    final_state = run_graph(ats_app, _initial_state(extracted_json), run_id, "ats")
+    
+    return final_state["final_report"]
+
+async def aats_agent(extracted_json: dict, run_id: str = None) -> dict:
+    """Async counterpart of ats_agent, runs the graph with ainvoke"""
+    final_state = await arun_graph(ats_app, _initial_state(extracted_json), run_id, "ats")
     
     return final_state["final_report"]
 
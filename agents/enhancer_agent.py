@@ -1,5 +1,8 @@
 from langgraph.graph import StateGraph, START, END
-from langchain_groq import ChatGroq
+from utils.llm import invoke_model, ainvoke_model, strip_code_fence
+from utils.prompting import build_prompt, project
+from utils.telemetry import traced_node
+from utils.checkpointing import run_graph, arun_graph
 from langchain_core.messages import HumanMessage
 from typing import TypedDict
 from dotenv import load_dotenv
@@ -8,6 +11,8 @@ import json
 load_dotenv()
 
 # Define state for enhancement
+# Each section node writes only its own key, so the four section nodes can run
+# in the same step without conflicting updates
 class EnhancerState(TypedDict):
     original_json: dict
     ats_report: dict
@@ -124,122 +129,129 @@ Return ONLY valid JSON, no other text.
 """
 
 # Node 1: Enhance Professional Summary
-def enhance_summary_node(state: EnhancerState) -> EnhancerState:
-    model = ChatGroq(model="llama-3.1-8b-instant", temperature=0.7)
-    
-    resume_data = json.dumps(state["original_json"], indent=2)
-    ats_feedback = json.dumps(state["ats_report"].get("suggestions", []), indent=2)
-    
-    message = HumanMessage(content=SUMMARY_ENHANCEMENT_PROMPT.format(
-        resume_data=resume_data,
-        ats_feedback=ats_feedback
+# The summary only needs the career highlights, not contact details
+SUMMARY_FIELDS = ["skills", "experience.title", "experience.company", "experience.duration",
+                  "experience.responsibilities", "education.degree", "education.institution"]
+
+def _summary_message(state: EnhancerState) -> HumanMessage:
+    return HumanMessage(content=build_prompt(
+        "enhance_summary",
+        SUMMARY_ENHANCEMENT_PROMPT,
+        {
+            "resume_data": project(state["original_json"], SUMMARY_FIELDS),
+            "ats_feedback": state["ats_report"].get("suggestions", [])
+        },
+        baseline={"resume_data": state["original_json"]}
     ))
-    
-    response = model.invoke([message])
-    state["enhanced_summary"] = response.content.strip()
-    
+
+def _apply_summary(state: EnhancerState, content: str) -> dict:
     print("✅ Professional summary enhanced")
-    return state
+    return {"enhanced_summary": content.strip()}
+
+def enhance_summary_node(state: EnhancerState) -> dict:
+    response = invoke_model([_summary_message(state)], temperature=0.7, creative=True)
+    return _apply_summary(state, response.content)
+
+async def aenhance_summary_node(state: EnhancerState) -> dict:
+    response = await ainvoke_model([_summary_message(state)], temperature=0.7, creative=True)
+    return _apply_summary(state, response.content)
 
 # Node 2: Enhance Experience Section
-def enhance_experience_node(state: EnhancerState) -> EnhancerState:
-    model = ChatGroq(model="llama-3.1-8b-instant", temperature=0.6)
-    
+def _experience_message(state: EnhancerState) -> HumanMessage:
     experience = state["original_json"].get("experience", [])
     missing_keywords = state["ats_report"].get("keyword_analysis", {}).get("missing_important_keywords", [])
     
-    message = HumanMessage(content=EXPERIENCE_ENHANCEMENT_PROMPT.format(
-        experience=json.dumps(experience, indent=2),
-        missing_keywords=", ".join(missing_keywords)
+    return HumanMessage(content=build_prompt(
+        "enhance_experience",
+        EXPERIENCE_ENHANCEMENT_PROMPT,
+        {"experience": experience, "missing_keywords": ", ".join(missing_keywords)}
     ))
-    
-    response = model.invoke([message])
-    
+
+def _apply_experience(state: EnhancerState, content: str) -> dict:
     try:
         # Try to parse JSON from response
-        content = response.content.strip()
-        # Remove markdown code blocks if present
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        
-        enhanced_exp = json.loads(content)
-        state["enhanced_experience"] = enhanced_exp
+        enhanced_exp = json.loads(strip_code_fence(content))
     except json.JSONDecodeError:
         # Fallback: keep original if parsing fails
-        state["enhanced_experience"] = experience
+        enhanced_exp = state["original_json"].get("experience", [])
         print("⚠️  Experience enhancement parsing failed, keeping original")
     
     print("✅ Experience section enhanced")
-    return state
+    return {"enhanced_experience": enhanced_exp}
+
+def enhance_experience_node(state: EnhancerState) -> dict:
+    response = invoke_model([_experience_message(state)], temperature=0.6, creative=True)
+    return _apply_experience(state, response.content)
+
+async def aenhance_experience_node(state: EnhancerState) -> dict:
+    response = await ainvoke_model([_experience_message(state)], temperature=0.6, creative=True)
+    return _apply_experience(state, response.content)
 
 # Node 3: Enhance Skills Section
-def enhance_skills_node(state: EnhancerState) -> EnhancerState:
-    model = ChatGroq(model="llama-3.1-8b-instant", temperature=0.5)
-    
+def _skills_message(state: EnhancerState) -> HumanMessage:
     original_skills = state["original_json"].get("skills", [])
     missing_keywords = state["ats_report"].get("keyword_analysis", {}).get("missing_important_keywords", [])
     
-    message = HumanMessage(content=SKILLS_ENHANCEMENT_PROMPT.format(
-        original_skills=json.dumps(original_skills),
-        missing_keywords=", ".join(missing_keywords)
+    return HumanMessage(content=build_prompt(
+        "enhance_skills",
+        SKILLS_ENHANCEMENT_PROMPT,
+        {"original_skills": original_skills, "missing_keywords": ", ".join(missing_keywords)}
     ))
-    
-    response = model.invoke([message])
-    
+
+def _apply_skills(state: EnhancerState, content: str) -> dict:
     try:
-        content = response.content.strip()
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        
-        enhanced_skills = json.loads(content)
-        state["enhanced_skills"] = enhanced_skills
+        enhanced_skills = json.loads(strip_code_fence(content))
     except json.JSONDecodeError:
         # Fallback: organize original skills into categories
-        state["enhanced_skills"] = {
-            "technical_skills": original_skills,
+        enhanced_skills = {
+            "technical_skills": state["original_json"].get("skills", []),
             "soft_skills": [],
             "tools_technologies": []
         }
         print("⚠️  Skills enhancement parsing failed, using basic organization")
     
     print("✅ Skills section enhanced")
-    return state
+    return {"enhanced_skills": enhanced_skills}
+
+def enhance_skills_node(state: EnhancerState) -> dict:
+    response = invoke_model([_skills_message(state)], temperature=0.5, creative=True)
+    return _apply_skills(state, response.content)
+
+async def aenhance_skills_node(state: EnhancerState) -> dict:
+    response = await ainvoke_model([_skills_message(state)], temperature=0.5, creative=True)
+    return _apply_skills(state, response.content)
 
 # Node 4: Enhance Education Section
-def enhance_education_node(state: EnhancerState) -> EnhancerState:
-    model = ChatGroq(model="llama-3.1-8b-instant", temperature=0.4)
-    
+def _education_message(state: EnhancerState) -> HumanMessage:
     education = state["original_json"].get("education", [])
     
-    message = HumanMessage(content=EDUCATION_ENHANCEMENT_PROMPT.format(
-        education=json.dumps(education, indent=2)
+    return HumanMessage(content=build_prompt(
+        "enhance_education",
+        EDUCATION_ENHANCEMENT_PROMPT,
+        {"education": education}
     ))
-    
-    response = model.invoke([message])
-    
+
+def _apply_education(state: EnhancerState, content: str) -> dict:
     try:
-        content = response.content.strip()
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        
-        enhanced_edu = json.loads(content)
-        state["enhanced_education"] = enhanced_edu
+        enhanced_edu = json.loads(strip_code_fence(content))
     except json.JSONDecodeError:
-        state["enhanced_education"] = education
+        enhanced_edu = state["original_json"].get("education", [])
         print("⚠️  Education enhancement parsing failed, keeping original")
     
     print("✅ Education section enhanced")
-    return state
+    return {"enhanced_education": enhanced_edu}
+
+def enhance_education_node(state: EnhancerState) -> dict:
+    response = invoke_model([_education_message(state)], temperature=0.4, creative=True)
+    return _apply_education(state, response.content)
+
+async def aenhance_education_node(state: EnhancerState) -> dict:
+    response = await ainvoke_model([_education_message(state)], temperature=0.4, creative=True)
+    return _apply_education(state, response.content)
 
 # Node 5: Compile Final Enhanced Resume
-def compile_enhanced_resume_node(state: EnhancerState) -> EnhancerState:
-    state["final_enhanced_json"] = {
+def compile_enhanced_resume_node(state: EnhancerState) -> dict:
+    final_enhanced_json = {
         "name": state["original_json"].get("name", ""),
         "email": state["original_json"].get("email", ""),
         "phone": state["original_json"].get("phone", ""),
@@ -259,42 +271,37 @@ def compile_enhanced_resume_node(state: EnhancerState) -> EnhancerState:
     }
     
     print("✅ Enhanced resume compiled")
-    return state
+    return {"final_enhanced_json": final_enhanced_json}
 
-def enhancer_agent(original_json: dict, ats_report: dict) -> dict:
-    """
-    Main enhancer agent function using LangGraph
-    
-    Args:
-        original_json: Original extracted resume data
-        ats_report: ATS analysis report
-    
-    Returns:
-        dict: Enhanced resume JSON
-    """
+def build_enhancer_graph():
+    """Build and compile the resume enhancement graph"""
     # Create the graph
     workflow = StateGraph(EnhancerState)
     
     # Add nodes
-    workflow.add_node("enhance_summary", enhance_summary_node)
-    workflow.add_node("enhance_experience", enhance_experience_node)
-    workflow.add_node("enhance_skills", enhance_skills_node)
-    workflow.add_node("enhance_education", enhance_education_node)
-    workflow.add_node("compile_resume", compile_enhanced_resume_node)
+    # LLM nodes carry an async twin so the same app serves invoke and ainvoke
+    workflow.add_node("enhance_summary", traced_node("enhancer.enhance_summary", enhance_summary_node, aenhance_summary_node))
+    workflow.add_node("enhance_experience", traced_node("enhancer.enhance_experience", enhance_experience_node, aenhance_experience_node))
+    workflow.add_node("enhance_skills", traced_node("enhancer.enhance_skills", enhance_skills_node, aenhance_skills_node))
+    workflow.add_node("enhance_education", traced_node("enhancer.enhance_education", enhance_education_node, aenhance_education_node))
+    workflow.add_node("compile_resume", traced_node("enhancer.compile_resume", compile_enhanced_resume_node))
     
-    # Define workflow (parallel processing where possible)
-    workflow.add_edge(START, "enhance_summary")
-    workflow.add_edge("enhance_summary", "enhance_experience")
-    workflow.add_edge("enhance_experience", "enhance_skills")
-    workflow.add_edge("enhance_skills", "enhance_education")
-    workflow.add_edge("enhance_education", "compile_resume")
+    # Define workflow: the section nodes are independent, so fan out from
+    # START and join at compile_resume once all four have finished
+    section_nodes = ["enhance_summary", "enhance_experience", "enhance_skills", "enhance_education"]
+    for node in section_nodes:
+        workflow.add_edge(START, node)
+    workflow.add_edge(section_nodes, "compile_resume")
     workflow.add_edge("compile_resume", END)
     
     # Compile
-    app = workflow.compile()
-    
-    # Initial state
-    initial_state = {
+    return workflow.compile()
+
+# Compiled once at import and reused by every enhancer_agent call
+enhancer_app = build_enhancer_graph()
+
+def _initial_state(original_json: dict, ats_report: dict) -> EnhancerState:
+    return {
         "original_json": original_json,
         "ats_report": ats_report,
         "enhanced_summary": "",
@@ -303,9 +310,27 @@ def enhancer_agent(original_json: dict, ats_report: dict) -> dict:
         "enhanced_education": [],
         "final_enhanced_json": {}
     }
+
+def enhancer_agent(original_json: dict, ats_report: dict, run_id: str = None) -> dict:
+    """
+    Main enhancer agent function using LangGraph
+    
+    Args:
+        original_json: Original extracted resume data
+        ats_report: ATS analysis report
+        run_id: Checkpoint the graph under this run; a rerun only redoes the
+            section nodes that had not finished
     
-    # Run the workflow
-    final_state = app.invoke(initial_state)
+    Returns:
+        dict: Enhanced resume JSON
+    """
+    final_state = run_graph(enhancer_app, _initial_state(original_json, ats_report), run_id, "enhance")
+    
+    return final_state["final_enhanced_json"]
+
+async def aenhancer_agent(original_json: dict, ats_report: dict, run_id: str = None) -> dict:
+    """Async counterpart of enhancer_agent, runs the graph with ainvoke"""
+    final_state = await arun_graph(enhancer_app, _initial_state(original_json, ats_report), run_id, "enhance")
     
     return final_state["final_enhanced_json"]
 
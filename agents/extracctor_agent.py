@@ -1,17 +1,28 @@
 from langgraph.graph import StateGraph, START, END
-from langchain_groq import ChatGroq
+from utils.llm import invoke_model, ainvoke_model, strip_code_fence
+from utils.resume_schema import validate_resume_data
+from utils.prompting import build_prompt
+from utils.telemetry import traced_node
+from utils.checkpointing import run_graph, arun_graph
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 from typing import TypedDict
 import json
+import os
 
 load_dotenv()
 
+# Extraction is retried with a corrective prompt until the output validates,
+# up to this many attempts in total
+MAX_EXTRACTION_ATTEMPTS = int(os.getenv("MAX_EXTRACTION_ATTEMPTS", "2"))
+
 # Define the state structure
 class ResumeState(TypedDict):
     resume_text: str
     extracted_data: dict
     validation_status: str
+    validation_errors: list
+    attempts: int
 
 # Structure prompt
 STRUCTURE_PROMPT = """
@@ -30,68 +41,111 @@ Resume Text:
 {resume_text}
 """
 
-VALIDATION_PROMPT = """
-You are a resume data validator.
-Check if the extracted data looks correct and complete.
-Respond with either "VALID" or "INVALID" and explain why.
+CORRECTION_PROMPT = """
+You are a resume information extractor.
+Your previous extraction of the resume below had these problems:
+{errors}
+
+Previous output:
+{previous_output}
+
+Return ONLY corrected JSON in this format:
+{{
+  "name": "",
+  "email": "",
+  "phone": "",
+  "education": [{{"degree": "", "institution": "", "year": ""}}],
+  "skills": ["skill"],
+  "experience": [{{"title": "", "company": "", "duration": "", "responsibilities": []}}]
+}}
 
-Extracted Data:
-{data}
+Resume Text:
+{resume_text}
 """
 
-# Node 1: Extract structured data
-def extract_node(state: ResumeState) -> ResumeState:
-    model = ChatGroq(model="llama-3.1-8b-instant")
-    message = HumanMessage(content=STRUCTURE_PROMPT.format(resume_text=state["resume_text"]))
-    response = model.invoke([message])
-    
+# Node 1: Extract structured data (corrective prompt on retries)
+def _extract_message(state: ResumeState) -> HumanMessage:
+    if state["attempts"] and state["validation_errors"]:
+        return HumanMessage(content=build_prompt("extract_retry", CORRECTION_PROMPT, {
+            "errors": "\n".join(f"- {error}" for error in state["validation_errors"]),
+            "previous_output": state["extracted_data"],
+            "resume_text": state["resume_text"]
+        }))
+    return HumanMessage(content=build_prompt("extract", STRUCTURE_PROMPT, {"resume_text": state["resume_text"]}))
+
+def _apply_extraction(state: ResumeState, content: str) -> ResumeState:
     try:
-        structured_data = json.loads(response.content)
+        structured_data = json.loads(strip_code_fence(content))
     except Exception:
-        structured_data = {"raw_output": response.content}
+        structured_data = {"raw_output": content}
     
     state["extracted_data"] = structured_data
-    print("✅ Extraction complete")
+    state["attempts"] += 1
+    print(f"✅ Extraction complete (attempt {state['attempts']})")
     return state
 
-# Node 2: Validate extracted data
+def extract_node(state: ResumeState) -> ResumeState:
+    response = invoke_model([_extract_message(state)])
+    return _apply_extraction(state, response.content)
+
+async def aextract_node(state: ResumeState) -> ResumeState:
+    response = await ainvoke_model([_extract_message(state)])
+    return _apply_extraction(state, response.content)
+
+# Node 2: Validate extracted data locally against the schema
 def validate_node(state: ResumeState) -> ResumeState:
-    model = ChatGroq(model="llama-3.1-8b-instant")
-    message = HumanMessage(content=VALIDATION_PROMPT.format(data=json.dumps(state["extracted_data"])))
-    response = model.invoke([message])
-    
-    if "valid" in response.content.lower():
-        state["validation_status"] = "VALID"
-    else:
-        state["validation_status"] = "INVALID"
+    errors = validate_resume_data(state["extracted_data"])
+    state["validation_errors"] = errors
+    state["validation_status"] = "INVALID" if errors else "VALID"
     
     print(f"✅ Validation: {state['validation_status']}")
+    if errors and state["attempts"] >= MAX_EXTRACTION_ATTEMPTS:
+        print(f"⚠️  Extraction still invalid after {state['attempts']} attempt(s): {'; '.join(errors)}")
     return state
 
+def route_after_validation(state: ResumeState) -> str:
+    """Retry extraction while invalid and under the attempt cap"""
+    if state["validation_status"] == "INVALID" and state["attempts"] < MAX_EXTRACTION_ATTEMPTS:
+        return "extract"
+    return END
+
 # Build the graph
-def extractor_agent(resume_text: str):
+def build_extractor_graph():
+    """Build and compile the extraction graph"""
     # Create the graph
     workflow = StateGraph(ResumeState)
     
     # Add nodes
-    workflow.add_node("extract", extract_node)
-    workflow.add_node("validate", validate_node)
+    # The LLM node carries an async twin so the same app serves invoke and ainvoke
+    workflow.add_node("extract", traced_node("extractor.extract", extract_node, aextract_node))
+    workflow.add_node("validate", traced_node("extractor.validate", validate_node))
     
-    # Define edges (workflow)
+    # Define edges (workflow): loop back to extract only when validation fails
     workflow.add_edge(START, "extract")
     workflow.add_edge("extract", "validate")
-    workflow.add_edge("validate", END)
+    workflow.add_conditional_edges("validate", route_after_validation, ["extract", END])
     
     # Compile the graph
-    app = workflow.compile()
-    
-    # Run the workflow
-    initial_state = {
+    return workflow.compile()
+
+# Compiled once at import and reused by every extractor_agent call
+extractor_app = build_extractor_graph()
+
+def _initial_state(resume_text: str) -> ResumeState:
+    return {
         "resume_text": resume_text,
         "extracted_data": {},
-        "validation_status": ""
+        "validation_status": "",
+        "validation_errors": [],
+        "attempts": 0
     }
-    
-    final_state = app.invoke(initial_state)
+
+def extractor_agent(resume_text: str, run_id: str = None):
+    # Run the workflow (checkpointed per node when a run id is given, see utils.checkpointing)
+    final_state = run_graph(extractor_app, _initial_state(resume_text), run_id, "extract")
     return final_state["extracted_data"]
 
+async def aextractor_agent(resume_text: str, run_id: str = None):
+    """Async counterpart of extractor_agent, runs the graph with ainvoke"""
+    final_state = await arun_graph(extractor_app, _initial_state(resume_text), run_id, "extract")
+    return final_state["extracted_data"]
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Per-call setup overhead of the three agents, before and after compiling the
+graphs once and sharing chat models.
+
+"before" rebuilds and compiles the graph and constructs a fresh ChatGroq client
+for every LLM node on each call (the old behaviour); "after" is a plain invoke
+on the prebuilt app with cached models. Both use an instant fake model so only
+the setup cost is measured, no network access is needed.
+
+Run from the repository root:
+    python -m benchmarks.bench_graph_setup --iterations 200
+"""
+from langchain_core.messages import AIMessage
+from langchain_groq import ChatGroq
+import argparse
+import json
+import os
+import time
+
+# ChatGroq validates the key at construction time; any value works offline
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+
+from utils.rate_limiter import get_rate_limiter, set_rate_limiter
+from utils import llm
+from agents import extracctor_agent, ats_agent, enhancer_agent
+
+SAMPLE_RESUME = {
+    "name": "John Doe",
+    "email": "john.doe@email.com",
+    "phone": "+1234567890",
+    "education": [{"degree": "BSc Computer Science", "institution": "University XYZ", "year": "2020"}],
+    "skills": ["Python", "JavaScript", "React"],
+    "experience": [{"title": "Software Engineer", "company": "Tech Corp", "duration": "2020-2023",
+                    "responsibilities": ["Developed web applications"]}]
+}
+
+SAMPLE_ATS_REPORT = {
+    "ats_score": 65,
+    "keyword_analysis": {"missing_important_keywords": ["Docker"]},
+    "suggestions": ["Add professional summary"]
+}
+
+
+class InstantChatModel:
+    """Returns a canned response immediately, shaped for whichever prompt it gets"""
+
+    def invoke(self, messages):
+        prompt = messages[-1].content
+        if "ATS (Applicant Tracking System) expert" in prompt:
+            return AIMessage(content=json.dumps({"formatting_issues": [], "missing_sections": [],
+                                                 "suggestions": []}))
+        if "resume information extractor" in prompt:
+            return AIMessage(content=json.dumps(SAMPLE_RESUME))
+        if "skills optimization" in prompt:
+            return AIMessage(content='{"technical_skills": [], "soft_skills": [], "tools_technologies": []}')
+        if "experience sections" in prompt or "education sections" in prompt:
+            return AIMessage(content="[]")
+        return AIMessage(content="YES")
+
+
+def _fresh_client_factory(model_name, temperature):
+    """Pays the ChatGroq construction cost like the old per-node code did"""
+    if temperature is None:
+        ChatGroq(model=model_name)
+    else:
+        ChatGroq(model=model_name, temperature=temperature)
+    return InstantChatModel()
+
+
+AGENTS = {
+    "extractor": (extracctor_agent.build_extractor_graph,
+                  lambda app: app.invoke({"resume_text": "John Doe resume", "extracted_data": {},
+                                          "validation_status": "", "validation_errors": [],
+                                          "attempts": 0})),
+    "ats": (ats_agent.build_ats_graph,
+            lambda app: app.invoke({"extracted_json": SAMPLE_RESUME, "ats_score": 0, "keyword_analysis": {},
+                                    "formatting_issues": [], "missing_sections": [], "suggestions": [],
+                                    "final_report": {}})),
+    "enhancer": (enhancer_agent.build_enhancer_graph,
+                 lambda app: app.invoke({"original_json": SAMPLE_RESUME, "ats_report": SAMPLE_ATS_REPORT,
+                                         "enhanced_summary": "", "enhanced_experience": [],
+                                         "enhanced_skills": [], "enhanced_education": [],
+                                         "final_enhanced_json": {}})),
+}
+
+PREBUILT_APPS = {
+    "extractor": extracctor_agent.extractor_app,
+    "ats": ats_agent.ats_app,
+    "enhancer": enhancer_agent.enhancer_app,
+}
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def run(iterations: int) -> dict:
+    # Cache hits and rate-limit waits would hide the graph work being measured
+    previous_cache, previous_limiter = llm.get_cache(), get_rate_limiter()
+    llm.set_cache(None)
+    set_rate_limiter(None)
+    results = {}
+    try:
+        for name, (build_graph, run_graph) in AGENTS.items():
+            # Before: build + compile + new clients on every call
+            llm.set_model_factory(_fresh_client_factory)
+
+            def before():
+                llm.clear_models()
+                run_graph(build_graph())
+
+            before_ms = _time_per_call(before, iterations)
+
+            # After: invoke on the prebuilt app with shared models
+            llm.set_model_factory(lambda model_name, temperature: InstantChatModel())
+            app = PREBUILT_APPS[name]
+            after_ms = _time_per_call(lambda: run_graph(app), iterations)
+
+            results[name] = {
+                "before_ms_per_call": round(before_ms, 3),
+                "after_ms_per_call": round(after_ms, 3),
+                "overhead_saved_ms_per_call": round(before_ms - after_ms, 3),
+            }
+    finally:
+        llm.set_model_factory(None)
+        llm.set_cache(previous_cache)
+        set_rate_limiter(previous_limiter)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-call agent setup overhead")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.iterations), indent=2))
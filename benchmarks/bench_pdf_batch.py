@@ -0,0 +1,48 @@
+"""
+Documents/second of utils.pdf_batch.render_pdfs for several worker counts.
+
+Renders the same synthetic corpus (benchmarks.run_benchmarks.synthetic_resume)
+in memory with each pool size, plus a single-process baseline that calls
+generate_resume_pdf_bytes in a loop.
+
+Run from the repository root:
+    python -m benchmarks.bench_pdf_batch --documents 400 --workers 1,2,4,8
+"""
+import argparse
+import random
+import json
+import os
+import time
+
+# ChatGroq validates the key at construction time; any value works offline
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+
+from benchmarks.run_benchmarks import synthetic_resume
+from utils.pdf_generator import generate_resume_pdf_bytes
+from utils.pdf_batch import measure_throughput
+
+
+def run(documents: int, worker_counts: list, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    corpus = [synthetic_resume(rng, index) for index in range(documents)]
+
+    start = time.perf_counter()
+    for enhanced_json in corpus:
+        generate_resume_pdf_bytes(enhanced_json)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "cpu_count": os.cpu_count(),
+        "serial_docs_per_s": round(documents / elapsed, 2),
+        "pool": measure_throughput(corpus, worker_counts),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark process-pool PDF rendering")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.workers.split(",")]
+    print(json.dumps(run(args.documents, counts), indent=2))
@@ -0,0 +1,81 @@
+"""
+PDFs per second from utils.pdf_generator, before and after sharing the
+stylesheet and rendering in memory.
+
+"before" builds a fresh stylesheet for every PDF and writes it to a file
+(the old behaviour); "after" renders with the shared RESUME_STYLES into a
+BytesIO via generate_resume_pdf_bytes. "styles_only" is the stylesheet
+construction cost alone.
+
+Run from the repository root:
+    python -m benchmarks.bench_pdf_render --iterations 200
+"""
+from contextlib import redirect_stdout
+import argparse
+import tempfile
+import json
+import io
+import os
+import time
+
+from utils.pdf_generator import ResumePDFGenerator, _build_styles, generate_resume_pdf_bytes
+
+SAMPLE_ENHANCED = {
+    "name": "John Doe",
+    "email": "john.doe@example.com",
+    "phone": "+1 (555) 123-4567",
+    "professional_summary": "Software Engineer with 3+ years of experience in full-stack development "
+                            "and cloud architecture. Expertise in Python, JavaScript, React and AWS.",
+    "skills": {
+        "technical_skills": ["Python", "JavaScript", "React", "Node.js", "Docker", "Kubernetes", "AWS"],
+        "soft_skills": ["Leadership", "Problem Solving", "Communication"],
+        "tools_technologies": ["Git", "Jenkins", "CI/CD", "JIRA"]
+    },
+    "experience": [
+        {"title": "Senior Software Engineer", "company": "Tech Innovations Inc.", "duration": "2021-Present",
+         "responsibilities": ["Deployed 5+ microservices using Docker and Kubernetes",
+                              "Led a team of 6 developers implementing CI/CD pipelines",
+                              "Cut application response times by 40% with query optimization"]},
+        {"title": "Software Developer", "company": "StartUp Solutions LLC", "duration": "2020-2021",
+         "responsibilities": ["Built full-stack web applications with React, Node.js and PostgreSQL",
+                              "Raised test coverage to 90%"]}
+    ],
+    "education": [{"degree": "BSc Computer Science", "institution": "University of Technology",
+                   "year": "2020", "details": "GPA: 3.8/4.0"}]
+}
+
+
+def _per_second(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def run(iterations: int) -> dict:
+    with tempfile.TemporaryDirectory() as output_dir:
+        path = os.path.join(output_dir, "resume.pdf")
+
+        def before():
+            ResumePDFGenerator(path, styles=_build_styles()).generate(SAMPLE_ENHANCED)
+
+        # generate() reports each file it writes
+        with redirect_stdout(io.StringIO()):
+            before_rate = _per_second(before, iterations)
+        after_rate = _per_second(lambda: generate_resume_pdf_bytes(SAMPLE_ENHANCED), iterations)
+        styles_rate = _per_second(_build_styles, iterations)
+
+    return {
+        "before_pdfs_per_s": round(before_rate, 2),
+        "after_pdfs_per_s": round(after_rate, 2),
+        "speedup": round(after_rate / before_rate, 3),
+        "styles_only_ms": round(1000 / styles_rate, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark resume PDF rendering throughput")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.iterations), indent=2))
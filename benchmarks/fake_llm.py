@@ -0,0 +1,184 @@
+"""Offline stand-in for ChatGroq, for benchmarks and --fake-llm runs"""
+from langchain_core.messages import AIMessage
+from utils.prompting import count_tokens
+from utils.rate_limiter import get_rate_limiter, set_rate_limiter
+from utils import llm
+import asyncio
+import random
+import json
+import math
+import threading
+import time
+import re
+
+
+class LatencyDistribution:
+    """
+    Seconds to wait per call, parsed from a spec string:
+
+        "0"                      no delay
+        "constant:0.4"           always 0.4s
+        "uniform:0.2,0.8"        uniform between 0.2s and 0.8s
+        "normal:0.5,0.1"         mean 0.5s, stddev 0.1s (clipped at 0)
+        "lognormal:0.6,0.35"     median 0.6s, sigma 0.35 (long tail, like a real API)
+    """
+
+    KINDS = ("constant", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec: str = "0", seed: int = None):
+        kind, _, params = spec.partition(":")
+        if not params:
+            kind, params = "constant", kind
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}', expected one of {', '.join(self.KINDS)}")
+        self.kind = kind
+        self.params = [float(value) for value in params.split(",")]
+        self.spec = spec
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "constant":
+                return self.params[0]
+            if self.kind == "uniform":
+                return self._rng.uniform(*self.params[:2])
+            if self.kind == "normal":
+                return max(self._rng.gauss(*self.params[:2]), 0.0)
+            median, sigma = self.params[:2]
+            return self._rng.lognormvariate(math.log(median), sigma)
+
+
+def _extracted_resume(resume_text: str) -> dict:
+    """An extraction result built from the resume text, as the real model would return"""
+    lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+    email = re.search(r"[\w.+-]+@[\w-]+(\.[\w-]+)+", resume_text)
+    phone = re.search(r"\+?\d[\d\s().-]{6,18}\d", resume_text)
+    return {
+        "name": lines[0] if lines else "Jane Doe",
+        "email": email.group(0) if email else "jane.doe@example.com",
+        "phone": phone.group(0) if phone else "+1 555 010 2030",
+        "education": [{"degree": "BSc Computer Science", "institution": "State University", "year": "2018"}],
+        "skills": ["Python", "SQL", "Docker", "AWS", "Communication"],
+        "experience": [
+            {"title": "Software Engineer", "company": "Acme Corp", "duration": "2019-Present",
+             "responsibilities": ["Built REST APIs in Python", "Maintained PostgreSQL databases"]},
+            {"title": "Junior Developer", "company": "Initech", "duration": "2018-2019",
+             "responsibilities": ["Wrote unit tests", "Fixed production bugs"]},
+        ],
+    }
+
+
+def _resume_text_from(prompt: str) -> str:
+    _, _, tail = prompt.partition("Resume Text:")
+    return tail or prompt
+
+
+def canned_response(prompt: str) -> str:
+    """Response text for a pipeline prompt, keyed on each prompt's role line"""
+    if "document classifier" in prompt:
+        return "YES"
+    if "resume information extractor" in prompt:
+        return json.dumps(_extracted_resume(_resume_text_from(prompt)), indent=2)
+    if "ATS (Applicant Tracking System) expert" in prompt:
+        return json.dumps({
+            "formatting_issues": ["Inconsistent date formats"],
+            "missing_sections": ["Professional Summary"],
+            "suggestions": ["Add a professional summary", "Quantify achievements with metrics",
+                            "List cloud certifications"],
+        }, indent=2)
+    if "professional summaries" in prompt:
+        return ("Software engineer with 5+ years of experience building Python services and data "
+                "pipelines on AWS. Reduced API latency by 40% and led migrations to containerized "
+                "deployments. Known for clear communication and mentoring junior developers.")
+    if "experience sections" in prompt:
+        return json.dumps([
+            {"title": "Software Engineer", "company": "Acme Corp", "duration": "2019-Present",
+             "responsibilities": ["Designed and shipped 12 REST APIs in Python serving 2M requests/day",
+                                  "Cut PostgreSQL query latency by 35% through indexing and caching",
+                                  "Automated CI/CD with Docker, reducing release time by 50%"]},
+            {"title": "Junior Developer", "company": "Initech", "duration": "2018-2019",
+             "responsibilities": ["Raised unit test coverage from 40% to 85%",
+                                  "Resolved 60+ production issues within SLA"]},
+        ], indent=2)
+    if "skills optimization" in prompt:
+        return json.dumps({
+            "technical_skills": ["Python", "SQL", "REST APIs", "Microservices"],
+            "soft_skills": ["Communication", "Mentoring", "Problem Solving"],
+            "tools_technologies": ["Docker", "AWS", "PostgreSQL", "Git", "CI/CD"],
+        }, indent=2)
+    if "education sections" in prompt:
+        return json.dumps([{"degree": "Bachelor of Science in Computer Science",
+                            "institution": "State University", "year": "2018",
+                            "details": "Coursework: Algorithms, Databases, Distributed Systems"}], indent=2)
+    return "OK"
+
+
+class FakeChatModel:
+    """
+    Chat model with the invoke/ainvoke surface the agents use. Answers each
+    pipeline prompt with a canned response after a simulated latency, with
+    usage_metadata so token telemetry behaves as it does against Groq.
+    """
+
+    def __init__(self, latency: LatencyDistribution):
+        self.latency = latency
+
+    def _respond(self, messages: list) -> AIMessage:
+        prompt = messages[-1].content
+        content = canned_response(prompt)
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": count_tokens(prompt),
+            "output_tokens": count_tokens(content),
+            "total_tokens": count_tokens(prompt) + count_tokens(content),
+        })
+
+    def invoke(self, messages):
+        time.sleep(self.latency.sample())
+        return self._respond(messages)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency.sample())
+        return self._respond(messages)
+
+
+# (cache, rate limiter) in use before install(), put back by uninstall()
+_previous = None
+
+
+def install(latency: str = "0", seed: int = None, cache: bool = False) -> LatencyDistribution:
+    """
+    Route every agent's model calls to FakeChatModel, e.g.
+    install("lognormal:0.6,0.35", seed=7).
+
+    Args:
+        latency: LatencyDistribution spec
+        seed: Seed for the latency draws (for repeatable runs)
+        cache: Keep the LLM response cache enabled; off by default so every
+            call pays the simulated latency
+
+    The fake has no provider limits, so the rate limiter is switched off too.
+
+    Returns:
+        LatencyDistribution: The shared distribution
+    """
+    global _previous
+    distribution = LatencyDistribution(latency, seed)
+    if _previous is None:
+        _previous = (llm.get_cache(), get_rate_limiter())
+    llm.set_model_factory(lambda model_name, temperature: FakeChatModel(distribution))
+    set_rate_limiter(None)
+    if not cache:
+        llm.set_cache(None)
+    return distribution
+
+
+def uninstall():
+    """Restore the ChatGroq factory and the cache and rate limiter install() replaced"""
+    global _previous
+    llm.set_model_factory(None)
+    if _previous is not None:
+        cache, limiter = _previous
+        llm.set_cache(cache)
+        set_rate_limiter(limiter)
+        _previous = None
@@ -0,0 +1,301 @@
+"""
+Offline pipeline benchmark.
+
+Renders a corpus of synthetic resume PDFs, then measures each pipeline stage
+against the simulated LLM backend in benchmarks.fake_llm:
+
+    extract_text      extract_text_from_pdf
+    extractor         extractor_agent
+    ats               ats_agent
+    enhancer          enhancer_agent
+    pdf_generation    generate_resume_pdf
+    db_write          save_complete_data (only with --db)
+    end_to_end        main.process_resume + PDF, --concurrency resumes at a time
+
+Results are written as JSON; pass --compare with an earlier run to flag
+stages whose mean latency regressed. The modules' self_check() regression
+checks run first; a failing check also makes the run exit non-zero.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --resumes 20 --latency lognormal:0.4,0.3 --output bench.json
+    python -m benchmarks.run_benchmarks --latency 0 --compare bench.json
+"""
+from contextlib import redirect_stdout
+import argparse
+import asyncio
+import platform
+import random
+import subprocess
+import statistics
+import tempfile
+import json
+import io
+import os
+import sys
+import time
+
+# ChatGroq validates the key at construction time; any value works offline
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+
+from benchmarks.fake_llm import install, uninstall
+from utils.pdf_utils import extract_text_from_pdf
+from utils.pdf_generator import generate_resume_pdf
+from agents.extracctor_agent import extractor_agent
+from agents.ats_agent import ats_agent
+from agents.enhancer_agent import enhancer_agent
+from utils import keyword_matcher, rate_limiter
+import database
+import main
+
+FIRST_NAMES = ["Ava", "Liam", "Maya", "Noah", "Priya", "Omar", "Sofia", "Kenji", "Lena", "Mateo"]
+LAST_NAMES = ["Patel", "Garcia", "Nguyen", "Smith", "Kowalski", "Okafor", "Silva", "Tanaka", "Muller", "Haddad"]
+TITLES = ["Software Engineer", "Data Scientist", "DevOps Engineer", "Backend Developer", "ML Engineer",
+          "Frontend Developer", "Data Engineer", "QA Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Analytics"]
+SKILLS = ["Python", "Java", "JavaScript", "TypeScript", "React", "Django", "FastAPI", "SQL", "PostgreSQL",
+          "Docker", "Kubernetes", "AWS", "GCP", "Terraform", "Spark", "Pandas", "PyTorch", "Git", "Linux"]
+SOFT_SKILLS = ["Communication", "Leadership", "Problem Solving", "Teamwork", "Mentoring"]
+ACTIONS = ["Built", "Designed", "Maintained", "Migrated", "Optimized", "Automated", "Led", "Shipped"]
+OBJECTS = ["REST APIs", "data pipelines", "CI/CD workflows", "dashboards", "microservices",
+           "batch jobs", "test suites", "cloud infrastructure"]
+
+
+def synthetic_resume(rng: random.Random, index: int) -> dict:
+    """Resume JSON in the enhancer's output shape, varied in length"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    start_year = rng.randint(2008, 2020)
+    experience = []
+    for job in range(rng.randint(1, 4)):
+        year = start_year + job * 2
+        experience.append({
+            "title": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "duration": f"{year}-{year + 2 if job < 3 else 'Present'}",
+            "responsibilities": [
+                f"{rng.choice(ACTIONS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)} "
+                f"for {rng.randint(2, 40)} teams, improving throughput by {rng.randint(5, 60)}%"
+                for _ in range(rng.randint(2, 6))
+            ],
+        })
+    return {
+        "name": name,
+        "email": f"{name.lower().replace(' ', '.')}{index}@example.com",
+        "phone": f"+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "professional_summary": f"{rng.choice(TITLES)} with {rng.randint(2, 15)} years of experience in "
+                                f"{', '.join(rng.sample(SKILLS, 3))}.",
+        "skills": {
+            "technical_skills": rng.sample(SKILLS, rng.randint(4, 10)),
+            "soft_skills": rng.sample(SOFT_SKILLS, 2),
+            "tools_technologies": rng.sample(SKILLS, 3),
+        },
+        "experience": experience,
+        "education": [{"degree": "Bachelor of Science in Computer Science",
+                       "institution": "State University", "year": str(start_year - 1)}],
+    }
+
+
+def build_corpus(directory: str, count: int, seed: int) -> list:
+    """Render count synthetic resumes into directory; returns their paths"""
+    rng = random.Random(seed)
+    paths = []
+    with redirect_stdout(io.StringIO()):
+        for index in range(count):
+            path = os.path.join(directory, f"resume_{index:04d}.pdf")
+            generate_resume_pdf(synthetic_resume(rng, index), path)
+            paths.append(path)
+    return paths
+
+
+def summarize(durations: list, wall_seconds: float = None) -> dict:
+    """Latency percentiles (ms) and throughput for one stage"""
+    ordered = sorted(durations)
+
+    def percentile(p):
+        return ordered[min(int(p / 100 * len(ordered)), len(ordered) - 1)] * 1000
+
+    wall = wall_seconds if wall_seconds is not None else sum(durations)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(percentile(50), 3),
+        "p95_ms": round(percentile(95), 3),
+        "p99_ms": round(percentile(99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "wall_seconds": round(wall, 4),
+        "throughput_per_s": round(len(ordered) / wall, 3) if wall else None,
+    }
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - start
+
+
+def run_stages(paths: list, output_dir: str, db: bool) -> dict:
+    """Sequential per-stage timings, each stage fed by the previous one's output"""
+    timings = {stage: [] for stage in ("extract_text", "extractor", "ats", "enhancer", "pdf_generation")}
+    if db:
+        timings["db_write"] = []
+
+    for index, path in enumerate(paths):
+        text, seconds = _timed(extract_text_from_pdf, path)
+        timings["extract_text"].append(seconds)
+        extracted, seconds = _timed(extractor_agent, text)
+        timings["extractor"].append(seconds)
+        report, seconds = _timed(ats_agent, extracted)
+        timings["ats"].append(seconds)
+        enhanced, seconds = _timed(enhancer_agent, extracted, report)
+        timings["enhancer"].append(seconds)
+        _, seconds = _timed(generate_resume_pdf, enhanced, os.path.join(output_dir, f"enhanced_{index:04d}.pdf"))
+        timings["pdf_generation"].append(seconds)
+        if db:
+            with open(path, "rb") as f:
+                file_bytes = f.read()
+            _, seconds = _timed(main.save_complete_data, os.path.basename(path), file_bytes,
+                                extracted, report, enhanced)
+            timings["db_write"].append(seconds)
+
+    return {stage: summarize(durations) for stage, durations in timings.items()}
+
+
+async def run_end_to_end(paths: list, output_dir: str, db: bool, concurrency: int) -> dict:
+    """Full pipeline per resume (classify, extract, ATS, enhance, save, render) with bounded concurrency"""
+    semaphore = asyncio.Semaphore(concurrency)
+    durations = []
+
+    async def one(index, path):
+        async with semaphore:
+            start = time.perf_counter()
+            result = await main.process_resume(path, enhance=True, save=db)
+            if result["enhanced_json"]:
+                await asyncio.to_thread(generate_resume_pdf, result["enhanced_json"],
+                                        os.path.join(output_dir, f"e2e_{index:04d}.pdf"))
+            durations.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index, path) for index, path in enumerate(paths)))
+    return summarize(durations, time.perf_counter() - start)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _db_available() -> bool:
+    try:
+        with database.db_connection():
+            pass
+        return True
+    except Exception:
+        return False
+
+
+# Modules with a self_check() that raises AssertionError on a regression
+SELF_CHECKS = {
+    "rate_limiter": rate_limiter.self_check,
+    "keyword_matcher": keyword_matcher.self_check,
+}
+
+
+def run_self_checks() -> dict:
+    """Name -> "ok" or the failure message for every entry in SELF_CHECKS"""
+    results = {}
+    for name, check in SELF_CHECKS.items():
+        try:
+            check()
+            results[name] = "ok"
+        except AssertionError as e:
+            results[name] = f"failed: {e}"
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> dict:
+    """Per-stage mean latency ratio vs. a previous run; ratios above 1 + threshold are regressions"""
+    changes = {}
+    for stage, stats in current["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before or not isinstance(stats, dict) or not stats.get("mean_ms") or not before.get("mean_ms"):
+            continue
+        ratio = stats["mean_ms"] / before["mean_ms"]
+        changes[stage] = {"baseline_mean_ms": before["mean_ms"], "mean_ms": stats["mean_ms"],
+                          "ratio": round(ratio, 3), "regression": ratio > 1 + threshold}
+    return {"baseline_commit": baseline.get("meta", {}).get("commit"), "threshold": threshold,
+            "stages": changes}
+
+
+def run(resumes: int = 10, latency: str = "0", seed: int = 42, concurrency: int = 4,
+        db: bool = False, verbose: bool = False) -> dict:
+    """Build the corpus, run every stage and return the results document"""
+    self_checks = run_self_checks()
+    distribution = install(latency, seed)
+    db_enabled = db and _db_available()
+    sink = sys.stdout if verbose else io.StringIO()
+    try:
+        with tempfile.TemporaryDirectory() as workdir, redirect_stdout(sink):
+            corpus_dir = os.path.join(workdir, "corpus")
+            output_dir = os.path.join(workdir, "out")
+            os.makedirs(corpus_dir)
+            os.makedirs(output_dir)
+
+            start = time.perf_counter()
+            paths = build_corpus(corpus_dir, resumes, seed)
+            corpus_seconds = time.perf_counter() - start
+
+            stages = run_stages(paths, output_dir, db_enabled)
+            if not db_enabled:
+                stages["db_write"] = {"skipped": "pass --db with a reachable database" if not db
+                                      else "database unreachable"}
+            stages["end_to_end"] = asyncio.run(run_end_to_end(paths, output_dir, db_enabled, concurrency))
+    finally:
+        uninstall()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "resumes": resumes,
+            "latency": distribution.spec,
+            "seed": seed,
+            "concurrency": concurrency,
+            "corpus_seconds": round(corpus_seconds, 3),
+        },
+        "self_checks": self_checks,
+        "stages": stages,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark with a simulated LLM")
+    parser.add_argument("--resumes", type=int, default=10, help="Synthetic resumes in the corpus")
+    parser.add_argument("--latency", default="0",
+                        help="Fake LLM latency, e.g. 0, constant:0.3, uniform:0.2,0.8, lognormal:0.6,0.35")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=4, help="Resumes in flight for the end_to_end stage")
+    parser.add_argument("--db", action="store_true", help="Include the database write (needs DB_* settings)")
+    parser.add_argument("--output", help="Write results JSON here as well as to stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed mean slowdown before flagging")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's progress output")
+    args = parser.parse_args()
+
+    results = run(args.resumes, args.latency, args.seed, max(1, args.concurrency), args.db, args.verbose)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            results["comparison"] = compare(results, json.load(f), args.threshold)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if any(status != "ok" for status in results["self_checks"].values()):
+        sys.exit(1)
+    if args.compare and any(stage["regression"] for stage in results["comparison"]["stages"].values()):
+        sys.exit(1)
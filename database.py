@@ -1,38 +1,481 @@
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from psycopg2.extras import execute_values
+from contextlib import contextmanager
 import psycopg2
+import threading
+import hashlib
+import asyncio
+import time
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_connection(): #get the connection to pgadmin postgres
-    conn = psycopg2.connect(
+# Pool size; keep DB_POOL_MAX >= the number of concurrent writers (e.g. --max-concurrency)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# Connections idle for longer than this are pinged before being handed out
+DB_POOL_HEALTHCHECK_SECONDS = float(os.getenv("DB_POOL_HEALTHCHECK_SECONDS", "30"))
+# Batched writes: rows per multi-row INSERT, and the longest a row waits in the buffer
+DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "50"))
+DB_BATCH_INTERVAL = float(os.getenv("DB_BATCH_INTERVAL", "1.0"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_last_used = {}
+
+def _connect_params() -> dict:
+    return dict(
         host = os.getenv("DB_HOST"),
         dbname = os.getenv("DB_NAME"),
         user = os.getenv("DB_USER"),
         password = os.getenv("DB_PASSWORD"),
         port = os.getenv("DB_PORT")
     )
+
+def get_connection(): #get the connection to pgadmin postgres
+    """Open a new, unpooled connection (prefer db_connection for regular work)"""
+    conn = psycopg2.connect(**_connect_params())
     return conn
 
-def init_db():
-    conn = get_connection()
-    cur = conn.cursor()
+def get_pool() -> ThreadedConnectionPool:
+    """Process-wide thread-safe connection pool, created on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, **_connect_params())
+                # Bounds checkouts so callers wait for a free connection instead of
+                # getting PoolError; kept on the pool so close_pool can't mix them up
+                pool.slots = threading.BoundedSemaphore(DB_POOL_MAX)
+                _pool = pool
+    return _pool
+
+def close_pool():
+    """
+    Close every pooled connection (the pool is recreated on next use).
+    Connections still checked out are closed when they are returned.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _last_used.clear()
+
+def _is_healthy(conn) -> bool:
+    """Closed connections are rejected; long-idle ones must answer SELECT 1"""
+    if conn.closed:
+        return False
+    if time.monotonic() - _last_used.get(id(conn), 0) < DB_POOL_HEALTHCHECK_SECONDS:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def _checkout():
+    pool = get_pool()
+    pool.slots.acquire()
+    try:
+        # One retry per pool slot covers a pool full of stale connections
+        for _ in range(DB_POOL_MAX + 1):
+            conn = pool.getconn()
+            if _is_healthy(conn):
+                return pool, conn
+            _last_used.pop(id(conn), None)
+            pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("No healthy database connection available")
+    except Exception:
+        pool.slots.release()
+        raise
+
+def _checkin(pool, conn, broken: bool = False):
+    try:
+        if broken or conn.closed:
+            _last_used.pop(id(conn), None)
+            pool.putconn(conn, close=True)
+        else:
+            _last_used[id(conn)] = time.monotonic()
+            pool.putconn(conn)
+    except PoolError:
+        # The pool was closed while this connection was out
+        _last_used.pop(id(conn), None)
+        if not conn.closed:
+            conn.close()
+    finally:
+        pool.slots.release()
+
+@contextmanager
+def db_connection():
+    """
+    Borrow a pooled connection.
+
+    Commits when the block succeeds and rolls back when it raises; connections
+    that failed at the connection level are closed instead of returned.
+
+    Usage:
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(...)
+    """
+    pool, conn = _checkout()
+    broken = False
+    try:
+        yield conn
+        conn.commit()
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _checkin(pool, conn, broken)
+
+def _run_with_connection(func, args, kwargs):
+    with db_connection() as conn:
+        return func(conn, *args, **kwargs)
+
+async def arun_with_connection(func, *args, **kwargs):
+    """
+    Async variant of db_connection: runs func(conn, *args, **kwargs) with a
+    pooled connection in a worker thread and returns its result, so the event
+    loop never blocks on checkout or on the query.
+    """
+    return await asyncio.to_thread(_run_with_connection, func, args, kwargs)
+
+def content_hash(file_bytes: bytes) -> str:
+    """SHA-256 hex digest identifying a file by its content"""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+def insert_many(conn, sql: str, rows: list, template: str = None) -> list:
+    """
+    Run a multi-row INSERT ... VALUES %s RETURNING ... as a single statement.
+
+    Postgres does not return RETURNING rows in VALUES order (least of all
+    for ON CONFLICT upserts), so return a key column along with the id and
+    match rows up by it.
+
+    Args:
+        template: Per-row placeholder template, e.g. for casts (optional)
+
+    Returns:
+        list: The RETURNING rows, in no particular order
+    """
+    with conn.cursor() as cur:
+        return execute_values(cur, sql, rows, template=template, page_size=len(rows), fetch=True)
+
+class BatchWriter:
+    """
+    Buffers rows from async callers and writes them with one multi-row
+    INSERT per flush, each flush in a single transaction.
+
+    A flush happens when flush_size rows are buffered or flush_interval
+    seconds after the oldest buffered row, whichever comes first. submit()
+    returns a future resolving to the row's generated id (or raising the
+    flush's error), so callers don't have to wait for the flush.
+
+    Usage:
+        async with BatchWriter(insert_rows) as writer:
+            resume_id = await writer.submit(row)
+    """
+
+    def __init__(self, insert_rows, flush_size: int = None, flush_interval: float = None):
+        """
+        Args:
+            insert_rows: Callable (conn, rows) -> list of ids, e.g. wrapping insert_many
+            flush_size: Rows per INSERT (defaults to DB_BATCH_SIZE)
+            flush_interval: Maximum seconds a row waits (defaults to DB_BATCH_INTERVAL)
+        """
+        self.insert_rows = insert_rows
+        self.flush_size = max(1, flush_size or DB_BATCH_SIZE)
+        self.flush_interval = flush_interval if flush_interval is not None else DB_BATCH_INTERVAL
+        self.rows_written = 0
+        self.flushes = 0
+        self._buffer = []
+        self._tasks = set()
+        self._timer = None
+
+    def submit(self, row: tuple) -> asyncio.Future:
+        """Buffer one row; returns a future for its id"""
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((row, future))
+        if len(self._buffer) >= self.flush_size:
+            self._spawn(self.flush())
+        elif self._timer is None:
+            self._timer = self._spawn(self._flush_later())
+        return future
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far"""
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        try:
+            ids = await arun_with_connection(self.insert_rows, [row for row, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.rows_written += len(batch)
+        self.flushes += 1
+        for (_, future), row_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(row_id)
+
+    async def close(self):
+        """Flush the remaining rows and wait for in-flight flushes"""
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+# Raw files live in their own table, keyed by content hash, so the resumes
+# rows (scanned by listing/search/analytics queries) never carry PDF bytes
+FILE_CHUNK_SIZE = int(os.getenv("DB_FILE_CHUNK_SIZE", str(1024 * 1024)))
+
+def store_files(conn, files: list):
+    """Insert (content_hash, file_bytes) pairs into resume_files, skipping files already stored"""
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO resume_files (content_hash, file_data, size_bytes)
+            VALUES %s
+            ON CONFLICT (content_hash) DO NOTHING;
+        """, [(file_hash, file_bytes, len(file_bytes)) for file_hash, file_bytes in files])
+
+def file_size(conn, file_hash: str):
+    """Stored size in bytes, or None if the file is unknown"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT size_bytes FROM resume_files WHERE content_hash = %s;", (file_hash,))
+        row = cur.fetchone()
+    return row[0] if row else None
+
+def iter_file_chunks(file_hash: str, chunk_size: int = None):
+    """
+    Stream a stored file in chunks without loading it whole.
+
+    file_data uses uncompressed TOAST storage, so each substring() only
+    reads the pages it needs.
+
+    Yields:
+        bytes: Consecutive chunks of the file
+    """
+    chunk_size = chunk_size or FILE_CHUNK_SIZE
+    with db_connection() as conn:
+        size = file_size(conn, file_hash)
+        if size is None:
+            raise FileNotFoundError(f"No stored file with hash {file_hash}")
+        with conn.cursor() as cur:
+            for offset in range(0, size, chunk_size):
+                # substring() is 1-based
+                cur.execute("""
+                    SELECT substring(file_data FROM %s FOR %s)
+                    FROM resume_files WHERE content_hash = %s;
+                """, (offset + 1, chunk_size, file_hash))
+                yield bytes(cur.fetchone()[0])
+
+def load_file(file_hash: str) -> bytes:
+    """Whole stored file (prefer iter_file_chunks for large files)"""
+    return b"".join(iter_file_chunks(file_hash))
+
+def copy_file_to(file_hash: str, output, chunk_size: int = None) -> int:
+    """Write a stored file to a path or binary file object; returns bytes written"""
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, "wb") as f:
+            return copy_file_to(file_hash, f, chunk_size)
+    written = 0
+    for chunk in iter_file_chunks(file_hash, chunk_size):
+        output.write(chunk)
+        written += len(chunk)
+    return written
+
+def _has_column(cur, table: str, column: str) -> bool:
     cur.execute("""
-                CREATE TABLE IF NOT EXISTS resumes(
-                    id SERIAL PRIMARY KEY,
-                    filename TEXT,
-                    file_data BYTEA,
-                    extracted_json JSONB,
-                    ats_report JSONB,
-                    enhanced_json JSONB
-                );
-              """  )
-    conn.commit()
-    cur.close()
-    conn.close()
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = %s AND column_name = %s;
+    """, (table, column))
+    return cur.fetchone() is not None
+
+def migrate_file_data(batch_size: int = 100) -> dict:
+    """
+    Move legacy resumes.file_data bytes into resume_files, one committed batch at a time.
+
+    Each migrated row gets its content_hash reference and file_data is set to
+    NULL. The bytes are copied inside Postgres (sha256() needs PostgreSQL 11+).
+    Rows whose file is also stored by another row (duplicate uploads from
+    before content hashing) cannot take the unique hash; they keep their
+    bytes and are counted as duplicates.
+
+    Returns:
+        dict: moved, duplicates
+    """
+    moved = duplicates = 0
+    last_id = 0
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            if not _has_column(cur, "resumes", "file_data"):
+                return {"moved": 0, "duplicates": 0}
+
+    while True:
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT id, content_hash, encode(sha256(file_data), 'hex')
+                    FROM resumes
+                    WHERE file_data IS NOT NULL AND id > %s
+                    ORDER BY id
+                    LIMIT %s;
+                """, (last_id, batch_size))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                ids = [row_id for row_id, _, _ in rows]
+                cur.execute("""
+                    INSERT INTO resume_files (content_hash, file_data, size_bytes)
+                    SELECT encode(sha256(file_data), 'hex'), file_data, length(file_data)
+                    FROM resumes WHERE id = ANY(%s)
+                    ON CONFLICT (content_hash) DO NOTHING;
+                """, (ids,))
+
+                cur.execute("SELECT content_hash FROM resumes WHERE content_hash = ANY(%s);",
+                            ([file_hash for _, _, file_hash in rows],))
+                taken = {row[0] for row in cur.fetchall()}
+                updates = []
+                for row_id, current_hash, file_hash in rows:
+                    if current_hash == file_hash:
+                        updates.append((row_id, file_hash))
+                    elif current_hash is None and file_hash not in taken:
+                        taken.add(file_hash)
+                        updates.append((row_id, file_hash))
+                    else:
+                        duplicates += 1
+                if updates:
+                    execute_values(cur, """
+                        UPDATE resumes SET content_hash = v.hash, file_data = NULL
+                        FROM (VALUES %s) AS v(id, hash)
+                        WHERE resumes.id = v.id;
+                    """, updates)
+                moved += len(updates)
+        print(f"📦 Migrated {moved} file(s) so far ({duplicates} duplicate(s) left in place)")
+
+    return {"moved": moved, "duplicates": duplicates}
+
+def init_db():
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                        CREATE TABLE IF NOT EXISTS resumes(
+                            id SERIAL PRIMARY KEY,
+                            filename TEXT,
+                            extracted_json JSONB,
+                            ats_report JSONB,
+                            enhanced_json JSONB
+                        );
+                      """  )
+            # Content identity: re-uploads of the same file map to the same row
+            cur.execute("ALTER TABLE resumes ADD COLUMN IF NOT EXISTS content_hash TEXT;")
+            cur.execute("""
+                        CREATE UNIQUE INDEX IF NOT EXISTS resumes_content_hash_key
+                        ON resumes (content_hash);
+                      """)
+            # Raw PDFs, referenced by resumes.content_hash; EXTERNAL storage
+            # (no compression, PDFs are compressed already) keeps chunked reads cheap
+            cur.execute("""
+                        CREATE TABLE IF NOT EXISTS resume_files(
+                            content_hash TEXT PRIMARY KEY,
+                            file_data BYTEA NOT NULL,
+                            size_bytes INTEGER NOT NULL,
+                            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                        );
+                      """)
+            cur.execute("ALTER TABLE resume_files ALTER COLUMN file_data SET STORAGE EXTERNAL;")
+            # Normalized search columns (see search.py) and their indexes
+            cur.execute("""
+                        ALTER TABLE resumes
+                            ADD COLUMN IF NOT EXISTS skills TEXT[] NOT NULL DEFAULT '{}',
+                            ADD COLUMN IF NOT EXISTS title_terms TEXT[] NOT NULL DEFAULT '{}',
+                            ADD COLUMN IF NOT EXISTS company_terms TEXT[] NOT NULL DEFAULT '{}',
+                            ADD COLUMN IF NOT EXISTS ats_score SMALLINT NOT NULL DEFAULT 0;
+                      """)
+            cur.execute("CREATE INDEX IF NOT EXISTS resumes_skills_gin ON resumes USING GIN (skills);")
+            cur.execute("CREATE INDEX IF NOT EXISTS resumes_title_terms_gin ON resumes USING GIN (title_terms);")
+            cur.execute("CREATE INDEX IF NOT EXISTS resumes_company_terms_gin ON resumes USING GIN (company_terms);")
+            cur.execute("CREATE INDEX IF NOT EXISTS resumes_ats_score_id ON resumes (ats_score, id);")
+            # Durable work queue (see work_queue.py); stage outputs are kept so
+            # a retried job resumes after its last completed stage
+            cur.execute("""
+                        CREATE TABLE IF NOT EXISTS jobs(
+                            id BIGSERIAL PRIMARY KEY,
+                            content_hash TEXT NOT NULL REFERENCES resume_files(content_hash),
+                            filename TEXT NOT NULL,
+                            enhance BOOLEAN NOT NULL DEFAULT FALSE,
+                            status TEXT NOT NULL DEFAULT 'queued',
+                            attempts INTEGER NOT NULL DEFAULT 0,
+                            max_attempts INTEGER NOT NULL DEFAULT 5,
+                            run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+                            lease_owner TEXT,
+                            lease_expires_at TIMESTAMPTZ,
+                            stage TEXT,
+                            stage_state JSONB NOT NULL DEFAULT '{}',
+                            extracted_json JSONB,
+                            ats_report JSONB,
+                            enhanced_json JSONB,
+                            resume_id INTEGER REFERENCES resumes(id),
+                            last_error TEXT,
+                            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                            updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                            finished_at TIMESTAMPTZ
+                        );
+                      """)
+            # Claims scan only unfinished jobs
+            cur.execute("""
+                        CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (run_after, id)
+                        WHERE status IN ('queued', 'running');
+                      """)
+            # One unfinished job per file and mode; enqueueing it again returns the existing job
+            cur.execute("""
+                        CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_file ON jobs (content_hash, enhance)
+                        WHERE status IN ('queued', 'running');
+                      """)
     print("Successfully Initialized the dataabse")
-    
-    
+
+
 if __name__ == "__main__":
-        init_db()
-    
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Initialize or migrate the resumes database")
+    parser.add_argument("--migrate-files", action="store_true",
+                        help="Move file bytes from resumes.file_data into resume_files")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per migration transaction")
+    args = parser.parse_args()
+
+    init_db()
+    if args.migrate_files:
+        stats = migrate_file_data(args.batch_size)
+        print(f"✅ Moved {stats['moved']} file(s) to resume_files, {stats['duplicates']} duplicate(s) left in place")
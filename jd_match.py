@@ -0,0 +1,162 @@
+"""
+Rank stored resumes against a job description.
+
+A BM25 index over every resume's extracted_json text (see utils.bm25) is
+kept on disk and topped up with resumes saved since it was last built, so
+ranking the whole corpus against a JD is one sparse mat-vec. Each hit lists
+the JD terms it matched (with their score contribution) and the ones it is
+missing. The LLM ATS analysis can then be run on the shortlist only:
+
+    python jd_match.py job_description.txt --top 20 --analyze 5
+"""
+from utils.bm25 import BM25Index, analyze_text, resume_text
+from agents.ats_agent import aats_agent
+from database import db_connection
+from dotenv import load_dotenv
+import argparse
+import asyncio
+import time
+import os
+
+load_dotenv()
+
+JD_INDEX_PATH = os.getenv("JD_INDEX_PATH", ".jd_index.pkl")
+# Rows fetched per round trip while indexing
+FETCH_SIZE = 2000
+
+
+def _iter_resumes(after_id: int):
+    """(id, extracted_json) of resumes with id > after_id, streamed with a server-side cursor"""
+    with db_connection() as conn:
+        with conn.cursor(name="jd_match_resumes") as cur:
+            cur.itersize = FETCH_SIZE
+            cur.execute("""
+                SELECT id, extracted_json FROM resumes
+                WHERE id > %s AND extracted_json IS NOT NULL
+                ORDER BY id;
+            """, (after_id,))
+            yield from cur
+
+
+def update_index(index: BM25Index = None, after_id: int = 0) -> tuple:
+    """Add resumes saved after after_id to the index; returns (index, last indexed id)"""
+    index = index or BM25Index()
+    ids, documents = [], []
+    for resume_id, extracted_json in _iter_resumes(after_id):
+        ids.append(resume_id)
+        documents.append(analyze_text(resume_text(extracted_json)))
+        if len(ids) >= FETCH_SIZE:
+            index.add_documents(ids, documents)
+            after_id = ids[-1]
+            ids, documents = [], []
+    if ids:
+        index.add_documents(ids, documents)
+        after_id = ids[-1]
+    return index, after_id
+
+
+def load_index(path: str = JD_INDEX_PATH, rebuild: bool = False) -> BM25Index:
+    """
+    The on-disk index, topped up with newly saved resumes (and written back).
+
+    Resumes re-saved with new results keep their old terms until the index
+    is rebuilt with rebuild=True.
+    """
+    index, last_id = None, 0
+    if not rebuild and os.path.exists(path):
+        index, metadata = BM25Index.load(path)
+        last_id = metadata.get("last_id", 0)
+
+    count = len(index) if index else 0
+    index, new_last_id = update_index(index, last_id)
+    if new_last_id != last_id or rebuild or not os.path.exists(path):
+        index.save(path, last_id=new_last_id)
+        print(f"🗂️  Indexed {len(index) - count} new resume(s), {len(index)} total")
+    return index
+
+
+def _fetch_resumes(ids: list) -> dict:
+    """id -> (filename, extracted_json, ats_report) for the given ids"""
+    if not ids:
+        return {}
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT id, filename, extracted_json, ats_report FROM resumes
+                WHERE id = ANY(%s);
+            """, (ids,))
+            return {row[0]: row[1:] for row in cur.fetchall()}
+
+
+def rank_resumes(job_description: str, top_k: int = 20, index: BM25Index = None) -> list:
+    """
+    Top resumes for a job description.
+
+    Returns:
+        list: dicts with resume_id, filename, name, score, match_percent,
+            matched ({term: contribution}) and missing (JD terms not found,
+            rarest first)
+    """
+    index = index or load_index()
+    hits = index.top_k(analyze_text(job_description), top_k)
+    stored = _fetch_resumes([hit["doc_id"] for hit in hits])
+
+    results = []
+    for hit in hits:
+        filename, extracted_json, _ = stored.get(hit["doc_id"], (None, {}, None))
+        results.append({
+            "resume_id": hit.pop("doc_id"),
+            "filename": filename,
+            "name": (extracted_json or {}).get("name"),
+            **hit,
+        })
+    return results
+
+
+async def analyze_shortlist(results: list, count: int, max_concurrency: int = 4) -> list:
+    """Run the LLM ATS analysis for the first count ranked resumes (stored reports are reused)"""
+    shortlist = results[:count]
+    stored = _fetch_resumes([result["resume_id"] for result in shortlist])
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def analyze(result):
+        _, extracted_json, ats_report = stored.get(result["resume_id"], (None, None, None))
+        if not ats_report and extracted_json:
+            async with semaphore:
+                ats_report = await aats_agent(extracted_json)
+        result["ats_report"] = ats_report
+
+    await asyncio.gather(*(analyze(result) for result in shortlist))
+    return shortlist
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank stored resumes against a job description")
+    parser.add_argument("job_description", help="Path to a text file with the job description ('-' for stdin)")
+    parser.add_argument("--top", type=int, default=20, help="Number of resumes to return")
+    parser.add_argument("--analyze", type=int, default=0, help="Run the ATS analysis for the best N")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from scratch")
+    args = parser.parse_args()
+
+    if args.job_description == "-":
+        import sys
+        job_description = sys.stdin.read()
+    else:
+        with open(args.job_description, "r", encoding="utf-8") as f:
+            job_description = f.read()
+
+    index = load_index(rebuild=args.rebuild)
+    start = time.perf_counter()
+    results = rank_resumes(job_description, args.top, index)
+    print(f"🎯 Ranked {len(index)} resume(s) in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    if args.analyze:
+        asyncio.run(analyze_shortlist(results, args.analyze))
+
+    for rank, result in enumerate(results, 1):
+        print(f"{rank:>3}. #{result['resume_id']:<6} {result['match_percent']:>5.1f}%  "
+              f"{result['name'] or result['filename']}")
+        print(f"      matched: {', '.join(list(result['matched'])[:10]) or '-'}")
+        print(f"      missing: {', '.join(result['missing'][:10]) or '-'}")
+        if result.get("ats_report"):
+            print(f"      ATS score: {result['ats_report'].get('ats_score')}/100")
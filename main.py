@@ -1,55 +1,306 @@
-from utils.pdf_utils import extract_text_from_pdf
+from utils.pdf_utils import extract_text_from_pdf, iter_pdf_pages, take_text
 from utils.pdf_generator import generate_resume_pdf
-from agents.extracctor_agent import extractor_agent
-from agents.ats_agent import ats_agent
-from agents.enhancer_agent import enhancer_agent
-from database import get_connection
-from langchain_groq import ChatGroq
+from agents.extracctor_agent import extractor_agent, aextractor_agent, extractor_app
+from agents.ats_agent import ats_agent, aats_agent
+from agents.enhancer_agent import enhancer_agent, aenhancer_agent
+from database import db_connection, arun_with_connection, insert_many, content_hash, store_files, BatchWriter
+from utils.llm import invoke_model, ainvoke_model
+from utils.resume_classifier import classify_resume_text, stats as classifier_stats
+from utils.prompting import build_prompt, get_token_report
+from utils.telemetry import instrument_node, start_metrics_server, write_metrics_file
+from utils.checkpointing import get_checkpointer, graph_started, agraph_started, clear_run
+from search import search_fields
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
+import argparse
+import asyncio
 import json
 import os
+import time
 
 load_dotenv()
 
+# The file itself goes to resume_files (once per content hash); re-saving a
+# known file only overwrites the results that were (re)computed this time
+RESUME_UPSERT = """
+    INSERT INTO resumes (filename, content_hash, extracted_json, ats_report, enhanced_json,
+                         skills, title_terms, company_terms, ats_score)
+    VALUES {values}
+    ON CONFLICT (content_hash) DO UPDATE SET
+        extracted_json = COALESCE(EXCLUDED.extracted_json, resumes.extracted_json),
+        ats_report = COALESCE(EXCLUDED.ats_report, resumes.ats_report),
+        enhanced_json = COALESCE(EXCLUDED.enhanced_json, resumes.enhanced_json),
+        skills = EXCLUDED.skills,
+        title_terms = EXCLUDED.title_terms,
+        company_terms = EXCLUDED.company_terms,
+        ats_score = EXCLUDED.ats_score
+    RETURNING id, content_hash;
+"""
+
+RESUME_VALUES = "(%s, %s, %s, %s, %s, %s::text[], %s::text[], %s::text[], %s)"
+
+def _json_or_null(value):
+    return json.dumps(value) if value is not None else None
+
+def _resume_row(filename, file_hash, structured_json, ats_report, enhanced_json) -> tuple:
+    fields = search_fields(structured_json, ats_report)
+    return (
+        filename,
+        file_hash,
+        _json_or_null(structured_json),
+        _json_or_null(ats_report),
+        _json_or_null(enhanced_json),
+        fields["skills"],
+        fields["title_terms"],
+        fields["company_terms"],
+        fields["ats_score"]
+    )
+
+def _insert_resume(conn, filename, file_bytes, structured_json, ats_report, enhanced_json):
+    file_hash = content_hash(file_bytes)
+    store_files(conn, [(file_hash, file_bytes)])
+    with conn.cursor() as cur:
+        cur.execute(
+            RESUME_UPSERT.format(values=RESUME_VALUES),
+            _resume_row(filename, file_hash, structured_json, ats_report, enhanced_json)
+        )
+        return cur.fetchone()[0]
+
+def _insert_resumes(conn, rows):
+    """Multi-row variant of _insert_resume for BatchWriter; rows are (filename, file_bytes, extracted, ats, enhanced)"""
+    hashes = [content_hash(row[1]) for row in rows]
+    # One statement cannot upsert the same row twice: keep the last copy of each file
+    files = {file_hash: row[1] for file_hash, row in zip(hashes, rows)}
+    unique = {file_hash: _resume_row(row[0], file_hash, *row[2:]) for file_hash, row in zip(hashes, rows)}
+    store_files(conn, list(files.items()))
+    returned = insert_many(conn, RESUME_UPSERT.format(values="%s"), list(unique.values()), template=RESUME_VALUES)
+    id_by_hash = {file_hash: resume_id for resume_id, file_hash in returned}
+    return [id_by_hash[file_hash] for file_hash in hashes]
+
+def _find_resume(conn, file_hash: str):
+    """Stored results for a file content hash, or None"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT id, extracted_json, ats_report, enhanced_json
+            FROM resumes WHERE content_hash = %s;
+        """, (file_hash,))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    return {"resume_id": row[0], "extracted_json": row[1], "ats_report": row[2], "enhanced_json": row[3]}
+
+def find_processed_resume(file_bytes: bytes):
+    """Stored results for a previously saved copy of this file, or None"""
+    with db_connection() as conn:
+        return _find_resume(conn, content_hash(file_bytes))
+
+async def afind_processed_resume(file_bytes: bytes):
+    """Async counterpart of find_processed_resume"""
+    return await arun_with_connection(_find_resume, content_hash(file_bytes))
+
 def save_complete_data(filename, file_bytes, structured_json, ats_report, enhanced_json):
     """Save all data (extracted, ATS report, and enhanced) to database"""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO resumes (filename, file_data, extracted_json, ats_report, enhanced_json)
-        VALUES (%s, %s, %s, %s, %s)
-        RETURNING id;
-    """, (
-        filename, 
-        file_bytes, 
-        json.dumps(structured_json), 
-        json.dumps(ats_report),
-        json.dumps(enhanced_json)
-    ))
-    
-    resume_id = cur.fetchone()[0]
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_connection() as conn:
+        resume_id = _insert_resume(conn, filename, file_bytes, structured_json, ats_report, enhanced_json)
+    print(f"✅ Complete resume data saved to DB with ID: {resume_id}")
+    return resume_id
+
+async def asave_complete_data(filename, file_bytes, structured_json, ats_report, enhanced_json):
+    """Async counterpart of save_complete_data, runs the DB write off the event loop"""
+    resume_id = await arun_with_connection(
+        _insert_resume, filename, file_bytes, structured_json, ats_report, enhanced_json
+    )
     print(f"✅ Complete resume data saved to DB with ID: {resume_id}")
     return resume_id
 
+# is_resume only looks at the start of the document
+CLASSIFY_CHARS = 2000
+
+CLASSIFY_PROMPT = """
+You are a document classifier.
+Decide if the following text is a resume or not.
+Answer only 'YES' or 'NO'.
+
+Text:
+{text}
+"""
+
+def _classification_message(text: str) -> HumanMessage:
+    # only the first 2000 chars to limit tokens
+    return HumanMessage(content=build_prompt("classify", CLASSIFY_PROMPT, {"text": text[:CLASSIFY_CHARS]}))
+
+def _parse_classification(content: str) -> bool:
+    answer = content.strip().lower()
+    print(f"🧠 Resume Check Model Output: {answer}")
+    return "yes" in answer
+
+def _heuristic_classification(text: str):
+    """Local pre-check; returns None when the LLM has to decide"""
+    decision = classify_resume_text(text[:CLASSIFY_CHARS])
+    if decision is not None:
+        print(f"🧠 Resume Check Heuristic: {'yes' if decision else 'no'}")
+    return decision
+
+@instrument_node("classify")
 def is_resume(text: str) -> bool:
     """Classify if the uploaded PDF is a resume or not."""
-    model = ChatGroq(model="llama-3.1-8b-instant")
-    prompt = f"""
-    You are a document classifier.
-    Decide if the following text is a resume or not.
-    Answer only 'YES' or 'NO'.
-
-    Text:
-    {text[:2000]}  # only the first 2000 chars to limit tokens
+    decision = _heuristic_classification(text)
+    if decision is not None:
+        return decision
+    response = invoke_model([_classification_message(text)])
+    return _parse_classification(response.content)
+
+@instrument_node("classify")
+async def ais_resume(text: str) -> bool:
+    """Async counterpart of is_resume."""
+    decision = _heuristic_classification(text)
+    if decision is not None:
+        return decision
+    response = await ainvoke_model([_classification_message(text)])
+    return _parse_classification(response.content)
+
+def get_filename(file_path: str) -> str:
+    """Return the file name from a Windows or Unix style path"""
+    filename = file_path.split("\\")[-1]  # Works for Windows
+    if "/" in file_path:
+        filename = file_path.split("/")[-1]  # Works for Unix/Mac
+    return filename
+
+def _read_file(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
+
+# Checkpoint namespace for runs started without --run-id
+DEFAULT_RUN_ID = "run"
+
+def file_run_id(file_bytes: bytes, run_id: str = None, source: str = None):
     """
-    response = model.invoke([HumanMessage(content=prompt)])
-    answer = response.content.strip().lower()
-    print(f"🧠 Resume Check Model Output: {answer}")
-    return "yes" in answer
+    Checkpoint run id for one file within a run, or None when checkpointing is off.
+    source (e.g. the file's path) tells apart identical files processed side by side.
+    """
+    if get_checkpointer() is None:
+        return None
+    file_run = f"{run_id or DEFAULT_RUN_ID}:{content_hash(file_bytes)[:16]}"
+    if source:
+        file_run += f":{content_hash(source.encode())[:8]}"
+    return file_run
+
+async def aread_resume_text(source):
+    """
+    Full text of a PDF (path or bytes), or None if it is not a resume.
+
+    Pages are read lazily: classification only needs the first CLASSIFY_CHARS,
+    so non-resumes are rejected without parsing the rest of the document.
+    """
+    pages = iter_pdf_pages(source)
+    try:
+        head = await asyncio.to_thread(take_text, pages, CLASSIFY_CHARS)
+        if not head:
+            raise Exception("Error extracting text from PDF: No text could be extracted from the PDF")
+        if not await ais_resume(" ".join(head)):
+            return None
+        rest = await asyncio.to_thread(take_text, pages, float("inf"))
+    finally:
+        pages.close()
+    return " ".join(head + rest)
+
+async def process_resume(file_path: str, enhance: bool = False, save: bool = True,
+                         reuse: bool = None, file_bytes: bytes = None, on_stage=None,
+                         run_id: str = None, keep_run: bool = False) -> dict:
+    """
+    Run the full pipeline for one PDF without blocking the event loop.
+
+    Blocking work (file I/O, PDF parsing, the DB write) runs in worker threads
+    and the LLM calls use the async graph/model APIs, so many resumes can be
+    in flight on one event loop.
+
+    Files already in the database (same content hash) are not reprocessed:
+    the stored results are returned and only missing stages (e.g. the
+    enhancement of a resume saved without one) are run.
+
+    Args:
+        file_path: Path to the PDF
+        enhance: Also run enhancer_agent on the ATS feedback
+        save: Persist the results with save_complete_data
+        reuse: Look up stored results by content hash first (defaults to save)
+        file_bytes: The file's content, if the caller has already read it
+        on_stage: Called with each stage name (classify, extract, ats,
+            enhance, save) as the stage starts
+        run_id: Checkpoint the agent graphs under this run (see
+            utils.checkpointing); running it again after a failure resumes
+            at the first unfinished node. Dropped once the results are saved
+            (or, with save=False, once they are returned)
+        keep_run: Leave the run's checkpoints for the caller to clear, e.g.
+            after writing the results itself
+
+    Returns:
+        dict: filename, is_resume, extracted_json, ats_report, enhanced_json,
+            resume_id, reused (stored results were found) and stages_run
+    """
+    result = {
+        "filename": get_filename(file_path),
+        "is_resume": False,
+        "extracted_json": None,
+        "ats_report": None,
+        "enhanced_json": None,
+        "resume_id": None,
+        "reused": False,
+        "stages_run": []
+    }
+    if reuse is None:
+        reuse = save
+    if on_stage is None:
+        on_stage = lambda stage: None
+
+    stored = None
+    if reuse or save:
+        if file_bytes is None:
+            file_bytes = await asyncio.to_thread(_read_file, file_path)
+        if reuse:
+            stored = await afind_processed_resume(file_bytes)
+
+    if stored and stored["extracted_json"]:
+        print(f"♻️  {result['filename']} already processed (ID {stored['resume_id']}), reusing stored results")
+        result.update(stored, is_resume=True, reused=True)
+    else:
+        # A checkpointed extraction means the file was already classified as a resume
+        text = None
+        if run_id and await agraph_started(extractor_app, run_id, "extract"):
+            print(f"⏯️  Resuming run {run_id} for {result['filename']}")
+        else:
+            on_stage("classify")
+            text = await aread_resume_text(file_bytes if file_bytes is not None else file_path)
+            result["stages_run"].append("classify")
+            if text is None:
+                return result
+        result["is_resume"] = True
+
+        on_stage("extract")
+        result["extracted_json"] = await aextractor_agent(text, run_id)
+        result["stages_run"].append("extract")
+
+    if not result["ats_report"]:
+        on_stage("ats")
+        result["ats_report"] = await aats_agent(result["extracted_json"], run_id)
+        result["stages_run"].append("ats")
+    if enhance and not result["enhanced_json"]:
+        on_stage("enhance")
+        result["enhanced_json"] = await aenhancer_agent(result["extracted_json"], result["ats_report"], run_id)
+        result["stages_run"].append("enhance")
+
+    if save and result["stages_run"]:
+        on_stage("save")
+        result["resume_id"] = await asave_complete_data(
+            result["filename"],
+            file_bytes,
+            result["extracted_json"],
+            result["ats_report"],
+            result["enhanced_json"]
+        )
+    if run_id and not keep_run:
+        await asyncio.to_thread(clear_run, run_id)
+
+    return result
 
 def print_ats_report(report: dict):
     """Pretty print ATS report"""
@@ -100,6 +351,14 @@ def print_ats_report(report: dict):
     
     print("\n" + "="*60 + "\n")
 
+def print_token_report():
+    """Print prompt tokens sent this run and how many the compact prompts saved"""
+    totals = get_token_report()["totals"]
+    if totals["calls"]:
+        print(f"   • Prompt tokens: {totals['prompt_tokens']} "
+              f"(saved {totals['saved_tokens']} vs. indented full-field prompts, "
+              f"{totals['trimmed_calls']} trimmed to budget)")
+
 def print_enhanced_preview(enhanced_json: dict):
     """Pretty print enhanced resume preview"""
     print("\n" + "="*60)
@@ -145,7 +404,150 @@ def print_enhanced_preview(enhanced_json: dict):
     
     print("\n" + "="*60 + "\n")
 
-if __name__ == "__main__":
+def iter_batch_paths(source: str):
+    """
+    Yield PDF paths from a directory or a manifest file.
+
+    A manifest is a text file with one PDF path per line; blank lines and
+    lines starting with '#' are skipped, relative paths are resolved against
+    the manifest's directory. Paths are yielded lazily so huge batches are
+    never materialised in memory.
+    """
+    if os.path.isdir(source):
+        for entry in sorted(os.listdir(source)):
+            path = os.path.join(source, entry)
+            if entry.lower().endswith(".pdf") and os.path.isfile(path):
+                yield path
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as manifest:
+        for line in manifest:
+            path = line.strip()
+            if not path or path.startswith("#"):
+                continue
+            yield path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+async def run_batch(source: str, enhance: bool = False, max_concurrency: int = 4,
+                    summary_path: str = "batch_summary.jsonl", save: bool = True,
+                    db_batch_size: int = None, db_flush_interval: float = None, run_id: str = None) -> dict:
+    """
+    Process every PDF from a directory or manifest with bounded concurrency.
+
+    At most max_concurrency files are in flight. Results are buffered and
+    written to the DB in multi-row inserts (db_batch_size rows, or whatever
+    has waited db_flush_interval seconds); a file's JSONL summary line is
+    appended once its row id is known. Workers move on to the next file
+    without waiting for the flush.
+
+    With checkpointing on (CHECKPOINT_URL), each file's graphs are
+    checkpointed under run_id, so rerunning a batch with the same run_id
+    resumes files that failed part-way.
+
+    Returns:
+        dict: Aggregate counts, elapsed time and throughput
+    """
+    queue = asyncio.Queue(maxsize=max_concurrency)
+    counts = {"ok": 0, "not_resume": 0, "error": 0}
+    reused = {"count": 0}
+    writer = BatchWriter(_insert_resumes, db_batch_size, db_flush_interval) if save else None
+    checkpointing = get_checkpointer() is not None
+    pending = set()
+    start = time.perf_counter()
+    classifier_before = classifier_stats.as_dict()
+
+    async def produce():
+        for path in iter_batch_paths(source):
+            await queue.put(path)
+        for _ in range(max_concurrency):
+            await queue.put(None)
+
+    async def work(summary_file):
+        while True:
+            path = await queue.get()
+            if path is None:
+                return
+            file_start = time.perf_counter()
+            record = {"file": path, "status": "ok", "resume_id": None, "ats_score": None,
+                      "enhanced": False, "reused": False, "error": None}
+            saved = None
+            file_run = None
+            try:
+                if writer is not None or checkpointing:
+                    file_bytes = await asyncio.to_thread(_read_file, path)
+                    # The path keeps duplicate files in one directory on separate checkpoints
+                    file_run = file_run_id(file_bytes, run_id, path)
+                else:
+                    file_bytes = None
+                # With a writer the checkpoints are dropped after the batched save
+                result = await process_resume(path, enhance=enhance, save=False, reuse=writer is not None,
+                                              file_bytes=file_bytes, run_id=file_run,
+                                              keep_run=writer is not None)
+                if not result["is_resume"]:
+                    record["status"] = "not_resume"
+                else:
+                    record["ats_score"] = result["ats_report"].get("ats_score")
+                    record["enhanced"] = result["enhanced_json"] is not None
+                    record["reused"] = result["reused"]
+                    record["resume_id"] = result["resume_id"]
+                    if writer is not None and result["stages_run"]:
+                        saved = writer.submit((result["filename"], file_bytes, result["extracted_json"],
+                                               result["ats_report"], result["enhanced_json"]))
+            except Exception as e:
+                record["status"] = "error"
+                record["error"] = str(e)
+
+            if saved is None:
+                finish(summary_file, record, file_start)
+            else:
+                task = asyncio.create_task(finish_after_save(summary_file, record, file_start, saved, file_run))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+    async def finish_after_save(summary_file, record, file_start, saved, file_run):
+        try:
+            record["resume_id"] = await saved
+            if file_run:
+                await asyncio.to_thread(clear_run, file_run)
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"Database write failed: {e}"
+        finish(summary_file, record, file_start)
+
+    def finish(summary_file, record, file_start):
+        record["seconds"] = round(time.perf_counter() - file_start, 3)
+        counts[record["status"]] += 1
+        reused["count"] += int(record["reused"])
+
+        summary_file.write(json.dumps(record) + "\n")
+        summary_file.flush()
+        icon = {"ok": "✅", "not_resume": "⚠️ ", "error": "❌"}[record["status"]]
+        print(f"{icon} {record['status']:<10} {record['seconds']:>7.2f}s  {record['file']}")
+
+    with open(summary_path, "a", encoding="utf-8") as summary_file:
+        await asyncio.gather(produce(), *(work(summary_file) for _ in range(max_concurrency)))
+        if writer is not None:
+            await writer.close()
+        if pending:
+            await asyncio.gather(*pending)
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    return {
+        **counts,
+        "total": total,
+        "elapsed_seconds": round(elapsed, 2),
+        "files_per_minute": round(total / elapsed * 60, 2) if elapsed else 0.0,
+        "resumes_per_minute": round(counts["ok"] / elapsed * 60, 2) if elapsed else 0.0,
+        "prompt_tokens": get_token_report()["totals"],
+        "classifier": classifier_stats.since(classifier_before),
+        "reused": reused["count"],
+        "db_rows_written": writer.rows_written if writer else 0,
+        "db_flushes": writer.flushes if writer else 0,
+    }
+
+def run_interactive(run_id: str = None):
+    """Interactive single-file session (checkpointed under run_id when CHECKPOINT_URL is set)"""
     print("🚀 AI Resume Enhancement System")
     print("="*60)
     
@@ -157,34 +559,47 @@ if __name__ == "__main__":
             file_bytes = f.read()
     except FileNotFoundError:
         print("❌ File not found. Please check the path.")
-        exit()
-
-    print("\n⏳ Extracting text from PDF...")
-    text = extract_text_from_pdf(file_path)
-    print("✅ Text extraction complete")
-    print("\n📝 Extracted Text Preview:")
-    print(text[:500] + "...\n")
-
-    # Step 1: Classify whether it's a resume
-    print("⏳ Checking if document is a resume...")
-    if not is_resume(text):
-        print("\n⚠️  The uploaded document does NOT look like a resume.")
-        print("Please upload a valid resume PDF.")
-        exit()
-
-    print("✅ Confirmed: This is a resume\n")
-
-    # Step 2: Extract structured data
-    print("⏳ Extracting structured data from resume...")
-    structured_json = extractor_agent(text)
-    print("✅ Structured extraction complete")
+        return
+
+    run_id = file_run_id(file_bytes, run_id)
+    stored = find_processed_resume(file_bytes)
+    if stored and stored["extracted_json"]:
+        print(f"\n♻️  This file was already processed (ID {stored['resume_id']}), reusing stored results")
+        structured_json = stored["extracted_json"]
+    elif run_id and graph_started(extractor_app, run_id, "extract"):
+        stored = None
+        print(f"\n⏯️  Resuming interrupted run {run_id}")
+        structured_json = extractor_agent(None, run_id)
+    else:
+        stored = None
+        print("\n⏳ Extracting text from PDF...")
+        text = extract_text_from_pdf(file_path)
+        print("✅ Text extraction complete")
+        print("\n📝 Extracted Text Preview:")
+        print(text[:500] + "...\n")
+
+        # Step 1: Classify whether it's a resume
+        print("⏳ Checking if document is a resume...")
+        if not is_resume(text):
+            print("\n⚠️  The uploaded document does NOT look like a resume.")
+            print("Please upload a valid resume PDF.")
+            return
+
+        print("✅ Confirmed: This is a resume\n")
+
+        # Step 2: Extract structured data
+        print("⏳ Extracting structured data from resume...")
+        structured_json = extractor_agent(text, run_id)
+        print("✅ Structured extraction complete")
     print("\n📄 Original Extracted Resume Data:")
     print(json.dumps(structured_json, indent=2))
 
     # Step 3: Run ATS Analysis
-    print("\n⏳ Running ATS compatibility analysis...")
-    ats_report = ats_agent(structured_json)
-    print("✅ ATS analysis complete")
+    ats_report = stored["ats_report"] if stored else None
+    if not ats_report:
+        print("\n⏳ Running ATS compatibility analysis...")
+        ats_report = ats_agent(structured_json, run_id)
+        print("✅ ATS analysis complete")
     
     # Display ATS Report
     print_ats_report(ats_report)
@@ -194,11 +609,15 @@ if __name__ == "__main__":
     
     enhanced_json = None
     if enhance_choice == 'y':
-        print("\n⏳ Enhancing your resume with AI...")
-        print("   This may take a minute...\n")
-        
-        enhanced_json = enhancer_agent(structured_json, ats_report)
-        print("✅ Resume enhancement complete!")
+        enhanced_json = stored["enhanced_json"] if stored else None
+        if enhanced_json:
+            print("\n♻️  Using the stored enhanced resume")
+        else:
+            print("\n⏳ Enhancing your resume with AI...")
+            print("   This may take a minute...\n")
+            
+            enhanced_json = enhancer_agent(structured_json, ats_report, run_id)
+            print("✅ Resume enhancement complete!")
         
         # Display enhanced preview
         print_enhanced_preview(enhanced_json)
@@ -210,11 +629,11 @@ if __name__ == "__main__":
 
     # Step 5: Save to database
     print("\n⏳ Saving data to database...")
-    filename = file_path.split("\\")[-1]  # Works for Windows
-    if "/" in file_path:
-        filename = file_path.split("/")[-1]  # Works for Unix/Mac
+    filename = get_filename(file_path)
     
     resume_id = save_complete_data(filename, file_bytes, structured_json, ats_report, enhanced_json)
+    if run_id:
+        clear_run(run_id)
     
     print(f"\n🎉 Process complete! Resume ID: {resume_id}")
     print("\n" + "="*60)
@@ -226,6 +645,7 @@ if __name__ == "__main__":
     else:
         print(f"   • Resume Enhanced: ✗")
     print(f"   • Data saved with ID: {resume_id}")
+    print_token_report()
     print("\n" + "="*60)
     print("Next steps:")
     if enhanced_json:
@@ -234,4 +654,63 @@ if __name__ == "__main__":
     else:
         print("  • Run enhancement to improve your resume")
         print("  • Generate PDF after enhancement")
-    print("="*60)
\ No newline at end of file
+    print("="*60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Resume Enhancement System")
+    parser.add_argument("--batch", metavar="PATH",
+                        help="Directory of PDFs or manifest file (one path per line); runs non-interactively")
+    parser.add_argument("--enhance", action="store_true", help="Run the enhancer agent in batch mode")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Resumes processed at once in batch mode")
+    parser.add_argument("--summary", default="batch_summary.jsonl", help="JSONL file for per-file batch results")
+    parser.add_argument("--no-db", action="store_true", help="Skip saving batch results to the database")
+    parser.add_argument("--db-batch-size", type=int, help="Rows per multi-row INSERT in batch mode (DB_BATCH_SIZE)")
+    parser.add_argument("--db-flush-interval", type=float,
+                        help="Longest a result waits before being written, in seconds (DB_BATCH_INTERVAL)")
+    parser.add_argument("--run-id", help="Checkpoint run to start or resume (needs CHECKPOINT_URL)")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port at /metrics")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="Interface for --metrics-port (0.0.0.0 exposes it on every interface)")
+    parser.add_argument("--metrics-file", default=os.getenv("METRICS_FILE"),
+                        help="Write Prometheus metrics to this file on exit")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port, args.metrics_host)
+        print(f"📈 Metrics at http://{args.metrics_host}:{args.metrics_port}/metrics")
+
+    if not args.batch:
+        run_interactive(args.run_id)
+    else:
+        print(f"🚀 Batch processing {args.batch} (max concurrency {args.max_concurrency})")
+        print("="*60)
+        stats = asyncio.run(run_batch(
+            args.batch,
+            enhance=args.enhance,
+            max_concurrency=max(1, args.max_concurrency),
+            summary_path=args.summary,
+            save=not args.no_db,
+            db_batch_size=args.db_batch_size,
+            db_flush_interval=args.db_flush_interval,
+            run_id=args.run_id
+        ))
+        print("="*60)
+        print(f"📊 {stats['total']} file(s): {stats['ok']} processed, "
+              f"{stats['not_resume']} not resumes, {stats['error']} failed")
+        print(f"⏱️  {stats['elapsed_seconds']}s elapsed, {stats['resumes_per_minute']} resumes/min "
+              f"({stats['files_per_minute']} files/min)")
+        classifier = stats["classifier"]
+        if classifier["llm_calls_avoided"] or classifier["deferred_to_llm"]:
+            print(f"🧠 Pre-classifier decided {classifier['llm_calls_avoided']} file(s) without the LLM "
+                  f"({classifier['decided_resume']} resumes, {classifier['decided_not_resume']} not), "
+                  f"deferred {classifier['deferred_to_llm']}")
+        if stats["reused"]:
+            print(f"♻️  {stats['reused']} resume(s) already in the database were not reprocessed")
+        if stats["db_flushes"]:
+            print(f"💾 {stats['db_rows_written']} row(s) saved in {stats['db_flushes']} batched insert(s)")
+        print_token_report()
+        print(f"📝 Summary written to {args.summary}")
+
+    if args.metrics_file:
+        write_metrics_file(args.metrics_file)
+        print(f"📈 Metrics written to {args.metrics_file}")
@@ -0,0 +1,355 @@
+"""
+Candidate search over stored resumes.
+
+Each resumes row carries normalized search columns, written on save
+(see search_fields) and backfilled with `python search.py --reindex`:
+
+    skills          canonical skill names (taxonomy aliases resolved), lowercase
+    title_terms     words of every job title, lowercase
+    company_terms   words of every company name, lowercase
+    ats_score       the ATS report's score
+
+The array columns have GIN indexes and ats_score a btree index, so queries
+like
+
+    Python AND Kubernetes, ats_score >= 70
+    (skill:react OR skill:vue) title:"frontend engineer" NOT company:acme
+
+are answered from the indexes. Commas and juxtaposition mean AND; OR, NOT
+and parentheses work as usual. Bare words search skills. Results are
+keyset-paginated and never read file data.
+"""
+from utils.keyword_matcher import get_matcher, flatten_text
+from database import db_connection
+from psycopg2.extras import execute_values
+import argparse
+import base64
+import json
+import re
+
+# Query field -> resumes column
+TERM_FIELDS = {
+    "skill": "skills",
+    "skills": "skills",
+    "title": "title_terms",
+    "company": "company_terms",
+}
+NUMERIC_FIELDS = {"ats_score": "ats_score", "score": "ats_score"}
+OPERATORS = {">=", "<=", ">", "<", "=", "!="}
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<paren>[()])
+      | (?P<comma>,)
+      | (?P<op>>=|<=|!=|=|>|<)
+      | "(?P<quoted>[^"]*)"
+      | (?P<word>[^\s(),"<>=!]+)
+    )""", re.VERBOSE)
+WORD_RE = re.compile(r"[\w+#]+")
+
+
+class QueryError(ValueError):
+    """Raised for search queries that cannot be parsed"""
+
+
+def _dedupe(values) -> list:
+    return list(dict.fromkeys(value for value in values if value))
+
+
+def normalize_terms(text: str) -> list:
+    """Lowercase words of a title or company name"""
+    return _dedupe(WORD_RE.findall(str(text or "").lower()))
+
+
+def normalize_skill(skill: str) -> str:
+    """Canonical lowercase skill name ("k8s" -> "kubernetes"); unknown skills are just lowercased"""
+    text = " ".join(str(skill or "").split())
+    found = get_matcher().find_skills(text)
+    if len(found) == 1:
+        return found[0].lower()
+    return text.lower()
+
+
+def search_fields(extracted_json: dict, ats_report: dict) -> dict:
+    """Search column values for a resume (stored alongside it on save)"""
+    resume = extracted_json if isinstance(extracted_json, dict) else {}
+    raw_skills = resume.get("skills") if isinstance(resume.get("skills"), list) else []
+    experience = [entry for entry in resume.get("experience") or [] if isinstance(entry, dict)]
+
+    # Only the skills list and job titles: companies and free-text
+    # responsibilities ("Spring Corp", "go to market") are not skills
+    titles = [entry.get("title") for entry in experience]
+    skills = [name.lower() for name in get_matcher().find_skills(flatten_text([raw_skills, titles]))]
+    skills += [normalize_skill(skill) for skill in raw_skills if isinstance(skill, str)]
+    score = (ats_report or {}).get("ats_score") if isinstance(ats_report, dict) else None
+    return {
+        "skills": _dedupe(skills),
+        "title_terms": _dedupe(term for entry in experience for term in normalize_terms(entry.get("title"))),
+        "company_terms": _dedupe(term for entry in experience for term in normalize_terms(entry.get("company"))),
+        "ats_score": int(score) if isinstance(score, (int, float)) else 0,
+    }
+
+
+def tokenize(query: str) -> list:
+    """(kind, value) tokens; kind is paren, comma, op, quoted or word"""
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = TOKEN_RE.match(query, position)
+        if not match or match.end() == position:
+            raise QueryError(f"Unexpected character at position {position}: {query[position:position + 10]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent over:
+        query      := or_expr (',' or_expr)*
+        or_expr    := and_expr ('OR' and_expr)*
+        and_expr   := unary ('AND'? unary)*
+        unary      := 'NOT' unary | '(' query ')' | comparison | term
+        comparison := NUMERIC_FIELD op number
+        term       := [field ':'] (word | "quoted")
+    """
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.index = 0
+
+    def peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.index += 1
+        return token
+
+    def is_keyword(self, word: str) -> bool:
+        kind, value = self.peek()
+        return kind == "word" and value.upper() == word
+
+    def parse(self):
+        if not self.tokens:
+            raise QueryError("Empty query")
+        node = self.query()
+        if self.index < len(self.tokens):
+            raise QueryError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def query(self):
+        nodes = [self.or_expr()]
+        while self.peek()[0] == "comma":
+            self.take()
+            nodes.append(self.or_expr())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def or_expr(self):
+        nodes = [self.and_expr()]
+        while self.is_keyword("OR"):
+            self.take()
+            nodes.append(self.and_expr())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def and_expr(self):
+        nodes = [self.unary()]
+        while True:
+            if self.is_keyword("AND"):
+                self.take()
+            elif self.peek()[0] not in ("word", "quoted") and self.peek() != ("paren", "("):
+                break
+            elif self.is_keyword("OR"):
+                break
+            nodes.append(self.unary())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def unary(self):
+        if self.is_keyword("NOT"):
+            self.take()
+            return ("not", self.unary())
+        kind, value = self.take()
+        if (kind, value) == ("paren", "("):
+            node = self.query()
+            if self.take() != ("paren", ")"):
+                raise QueryError("Missing closing parenthesis")
+            return node
+        if kind == "word" and value.lower() in NUMERIC_FIELDS and self.peek()[0] == "op":
+            _, op = self.take()
+            _, number = self.take()
+            try:
+                number = float(number)
+            except (TypeError, ValueError):
+                raise QueryError(f"Expected a number after {value} {op}, got {number!r}")
+            # Integers keep the comparison on the smallint index
+            return ("cmp", NUMERIC_FIELDS[value.lower()], op, int(number) if number.is_integer() else number)
+        if kind == "quoted":
+            return ("term", "skill", value)
+        if kind != "word":
+            raise QueryError(f"Unexpected {value!r}" if value else "Query ends unexpectedly")
+
+        field, colon, term = value.partition(":")
+        if not colon:
+            return ("term", "skill", value)
+        if field.lower() not in TERM_FIELDS:
+            raise QueryError(f"Unknown field '{field}', expected one of: {', '.join(TERM_FIELDS)}")
+        if not term:
+            term_kind, term = self.take()
+            if term_kind not in ("word", "quoted"):
+                raise QueryError(f"Expected a value after '{field}:'")
+        return ("term", field.lower(), term)
+
+
+def parse_query(query: str):
+    """Parse a search query into a tuple tree (and/or/not/term/cmp nodes)"""
+    return _Parser(tokenize(query)).parse()
+
+
+def compile_query(node) -> tuple:
+    """SQL condition and parameters for a parsed query"""
+    kind = node[0]
+    if kind in ("and", "or"):
+        parts = [compile_query(child) for child in node[1]]
+        joiner = " AND " if kind == "and" else " OR "
+        return "(" + joiner.join(sql for sql, _ in parts) + ")", [param for _, params in parts for param in params]
+    if kind == "not":
+        sql, params = compile_query(node[1])
+        return f"NOT {sql}", params
+    if kind == "cmp":
+        _, column, op, number = node
+        if op not in OPERATORS:
+            raise QueryError(f"Unknown operator {op}")
+        return f"{column} {'<>' if op == '!=' else op} %s", [number]
+
+    _, field, value = node
+    column = TERM_FIELDS[field]
+    values = [normalize_skill(value)] if column == "skills" else normalize_terms(value)
+    if not values:
+        raise QueryError(f"Nothing to search for in {field}:{value!r}")
+    # Array containment is answered by the GIN index
+    return f"{column} @> %s::text[]", [values]
+
+
+def _encode_cursor(row_key: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(row_key).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeDecodeError):
+        raise QueryError("Invalid cursor")
+
+
+def search_resumes(query: str, limit: int = 20, cursor: str = None, sort: str = "score") -> dict:
+    """
+    Find stored resumes matching a query, best ATS score first (or newest
+    first with sort="recent").
+
+    Args:
+        query: Search query (see module docstring)
+        limit: Page size
+        cursor: next_cursor from the previous page
+
+    Returns:
+        dict: {"results": [...], "next_cursor": str or None}; pass
+            next_cursor back to get the following page
+    """
+    where, params = compile_query(parse_query(query))
+    if sort == "score":
+        order = "ats_score DESC, id DESC"
+        if cursor:
+            where += " AND (ats_score, id) < (%s, %s)"
+            params += _decode_cursor(cursor)
+    elif sort == "recent":
+        order = "id DESC"
+        if cursor:
+            where += " AND id < %s"
+            params += _decode_cursor(cursor)
+    else:
+        raise QueryError(f"Unknown sort '{sort}', expected 'score' or 'recent'")
+
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT id, filename, extracted_json->>'name', extracted_json->>'email',
+                       ats_score, skills, title_terms, company_terms, enhanced_json IS NOT NULL
+                FROM resumes
+                WHERE {where}
+                ORDER BY {order}
+                LIMIT %s;
+            """, params + [limit + 1])
+            rows = cur.fetchall()
+
+    results = [{
+        "id": row[0],
+        "filename": row[1],
+        "name": row[2],
+        "email": row[3],
+        "ats_score": row[4],
+        "skills": row[5],
+        "title_terms": row[6],
+        "company_terms": row[7],
+        "enhanced": row[8],
+    } for row in rows[:limit]]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = results[-1]
+        next_cursor = _encode_cursor([last["ats_score"], last["id"]] if sort == "score" else [last["id"]])
+    return {"results": results, "next_cursor": next_cursor}
+
+
+def reindex(batch_size: int = 500) -> int:
+    """Recompute the search columns of every stored resume; returns rows updated"""
+    updated = 0
+    last_id = 0
+    while True:
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT id, extracted_json, ats_report FROM resumes
+                    WHERE id > %s ORDER BY id LIMIT %s;
+                """, (last_id, batch_size))
+                rows = cur.fetchall()
+                if not rows:
+                    return updated
+                last_id = rows[-1][0]
+
+                values = []
+                for row_id, extracted_json, ats_report in rows:
+                    fields = search_fields(extracted_json, ats_report)
+                    values.append((row_id, fields["skills"], fields["title_terms"],
+                                   fields["company_terms"], fields["ats_score"]))
+                execute_values(cur, """
+                    UPDATE resumes SET skills = v.skills, title_terms = v.title_terms,
+                        company_terms = v.company_terms, ats_score = v.ats_score
+                    FROM (VALUES %s) AS v(id, skills, title_terms, company_terms, ats_score)
+                    WHERE resumes.id = v.id;
+                """, values, template="(%s, %s::text[], %s::text[], %s::text[], %s)")
+                updated += len(rows)
+        print(f"🔎 Reindexed {updated} resume(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search stored resumes")
+    parser.add_argument("query", nargs="?", help='e.g. "Python AND Kubernetes, ats_score >= 70"')
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--cursor", help="next_cursor from a previous page")
+    parser.add_argument("--sort", choices=["score", "recent"], default="score")
+    parser.add_argument("--reindex", action="store_true", help="Recompute search columns for all resumes")
+    args = parser.parse_args()
+
+    if args.reindex:
+        print(f"✅ Search columns updated for {reindex()} resume(s)")
+    if args.query:
+        page = search_resumes(args.query, args.limit, args.cursor, args.sort)
+        for result in page["results"]:
+            print(f"#{result['id']:<6} {result['ats_score']:>3}/100  {result['name'] or result['filename']}  "
+                  f"[{', '.join(result['skills'][:8])}]")
+        if page["next_cursor"]:
+            print(f"\nMore results: --cursor {page['next_cursor']}")
+        elif not page["results"]:
+            print("No matching resumes")
@@ -0,0 +1,436 @@
+"""
+HTTP service for the resume pipeline.
+
+Uploads are queued and processed by background workers (coroutines on an
+event loop in a daemon thread), so request handlers only enqueue and read
+job state:
+
+    POST /jobs?filename=cv.pdf&enhance=1    raw PDF body -> 202 {"job_id": ...}
+    GET  /jobs/<id>                          job status
+    GET  /jobs/<id>/events                   status changes as server-sent events
+    GET  /jobs/<id>/extracted                extracted resume JSON
+    GET  /jobs/<id>/report                   ATS report
+    GET  /jobs/<id>/enhanced                 enhanced resume JSON (enhance=1 jobs)
+    GET  /jobs/<id>/pdf                      rendered enhanced resume PDF
+    GET  /metrics                            Prometheus metrics (queue depth, worker utilization, LLM usage)
+    GET  /healthz
+
+Job state is kept in memory. Run fully locally with a fake LLM and without
+Postgres:
+    python server.py --port 8000 --workers 4 --fake-llm lognormal:0.6,0.35 --no-db
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from utils.pdf_generator import generate_resume_pdf_bytes
+from utils.telemetry import render_prometheus
+from main import process_resume, file_run_id
+from dotenv import load_dotenv
+import argparse
+import asyncio
+import threading
+import json
+import time
+import uuid
+import os
+
+load_dotenv()
+
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "4"))
+# Jobs waiting for a worker before new uploads are refused with 503
+SERVICE_QUEUE_SIZE = int(os.getenv("SERVICE_QUEUE_SIZE", "100"))
+SERVICE_MAX_UPLOAD_BYTES = int(float(os.getenv("SERVICE_MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+# Finished jobs kept in memory; the oldest are dropped beyond this
+SERVICE_MAX_JOBS = int(os.getenv("SERVICE_MAX_JOBS", "1000"))
+# Seconds between keep-alive comments on an idle event stream
+SSE_KEEPALIVE = 15
+
+TERMINAL_STATUSES = ("done", "not_resume", "failed")
+PUBLIC_FIELDS = ("job_id", "filename", "enhance", "status", "stage", "submitted_at", "started_at",
+                 "finished_at", "error", "resume_id", "reused", "ats_score", "version")
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    In-memory jobs processed by a fixed pool of background workers.
+
+    Handler threads call submit() and read snapshots; the workers run
+    main.process_resume on their own event loop. Every state change bumps
+    the job's version and wakes threads waiting in wait_for_change().
+    """
+
+    def __init__(self, workers: int = SERVICE_WORKERS, max_queued: int = SERVICE_QUEUE_SIZE,
+                 save: bool = True, max_jobs: int = SERVICE_MAX_JOBS):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.save = save
+        self.max_jobs = max_jobs
+        self.jobs = OrderedDict()
+        self.queued = 0
+        self.changed = threading.Condition()
+        self.started_at = time.monotonic()
+        self.busy_seconds = 0.0
+        self._busy_since = {}
+        # Checkpoint run id -> [lock, jobs using it]; jobs for the same file share a run
+        self._run_locks = {}
+        self._loop = asyncio.new_event_loop()
+        self._queue = None
+        self._tasks = []
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._tasks = [self._loop.create_task(self._worker(index)) for index in range(self.workers)]
+        ready.set()
+        self._loop.run_forever()
+
+    def close(self):
+        """Stop the workers; queued and running jobs are abandoned"""
+        async def cancel_workers():
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(cancel_workers(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def submit(self, filename: str, file_bytes: bytes, enhance: bool = False) -> dict:
+        """Queue a PDF; returns the job snapshot. Raises QueueFull when max_queued jobs are waiting."""
+        job_id = uuid.uuid4().hex
+        with self.changed:
+            if self.queued >= self.max_queued:
+                raise QueueFull(f"{self.queued} jobs already queued")
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "filename": filename,
+                "enhance": enhance,
+                "status": "queued",
+                "stage": None,
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+                "resume_id": None,
+                "reused": False,
+                "ats_score": None,
+                "version": 0,
+                "file_bytes": file_bytes,
+                "result": None,
+                "pdf": None,
+            }
+            self.queued += 1
+            self._evict()
+            snapshot = self._snapshot(job_id)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job_id)
+        return snapshot
+
+    def _evict(self):
+        """Drop the oldest finished jobs beyond max_jobs (caller holds the lock)"""
+        excess = len(self.jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job["status"] in TERMINAL_STATUSES][:excess]:
+            del self.jobs[job_id]
+
+    def _update(self, job: dict, **changes):
+        with self.changed:
+            job.update(changes)
+            job["version"] += 1
+            self.changed.notify_all()
+
+    def _snapshot(self, job_id: str):
+        job = self.jobs.get(job_id)
+        return {field: job[field] for field in PUBLIC_FIELDS} if job else None
+
+    def get(self, job_id: str):
+        """Public fields of a job, or None if unknown"""
+        with self.changed:
+            return self._snapshot(job_id)
+
+    def result(self, job_id: str):
+        """(snapshot, process_resume result, PDF bytes) of a job"""
+        with self.changed:
+            job = self.jobs.get(job_id)
+            if not job:
+                return None, None, None
+            return self._snapshot(job_id), job["result"], job["pdf"]
+
+    def wait_for_change(self, job_id: str, version: int, timeout: float):
+        """Snapshot once the job's version differs from version (or after timeout)"""
+        with self.changed:
+            self.changed.wait_for(
+                lambda: job_id not in self.jobs or self.jobs[job_id]["version"] != version, timeout)
+            return self._snapshot(job_id)
+
+    @asynccontextmanager
+    async def _run_lock(self, run_id: str):
+        """
+        Run jobs that share a checkpoint run one at a time, so one job's
+        clear_run can't delete checkpoints another is still using.
+        """
+        if run_id is None:
+            yield
+            return
+        entry = self._run_locks.setdefault(run_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._run_locks[run_id]
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            with self.changed:
+                self.queued -= 1
+                job = self.jobs.get(job_id)
+                self._busy_since[index] = time.monotonic()
+            try:
+                self._update(job, status="running", started_at=time.time())
+                # Keyed by file content, so re-submitting after a crash resumes the checkpointed run
+                run_id = file_run_id(job["file_bytes"], "service")
+                async with self._run_lock(run_id):
+                    result = await process_resume(
+                        job["filename"],
+                        enhance=job["enhance"],
+                        save=self.save,
+                        file_bytes=job["file_bytes"],
+                        on_stage=lambda stage: self._update(job, stage=stage),
+                        run_id=run_id
+                    )
+                pdf = None
+                if result["enhanced_json"]:
+                    self._update(job, stage="pdf")
+                    pdf = await asyncio.to_thread(generate_resume_pdf_bytes, result["enhanced_json"])
+                self._update(
+                    job,
+                    status="done" if result["is_resume"] else "not_resume",
+                    stage=None,
+                    finished_at=time.time(),
+                    resume_id=result["resume_id"],
+                    reused=result["reused"],
+                    ats_score=(result["ats_report"] or {}).get("ats_score"),
+                    file_bytes=None,
+                    result=result,
+                    pdf=pdf
+                )
+            except Exception as e:
+                self._update(job, status="failed", finished_at=time.time(), error=str(e), file_bytes=None)
+            finally:
+                with self.changed:
+                    self.busy_seconds += time.monotonic() - self._busy_since.pop(index)
+
+    def stats(self) -> dict:
+        """Queue depth, worker utilization and job counts"""
+        with self.changed:
+            now = time.monotonic()
+            busy_seconds = self.busy_seconds + sum(now - since for since in self._busy_since.values())
+            uptime = now - self.started_at
+            statuses = {}
+            for job in self.jobs.values():
+                statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+            return {
+                "queue_depth": self.queued,
+                "workers": self.workers,
+                "busy_workers": len(self._busy_since),
+                "busy_seconds": busy_seconds,
+                "utilization": busy_seconds / (self.workers * uptime) if uptime else 0.0,
+                "jobs": statuses,
+            }
+
+
+def render_service_metrics(stats: dict) -> str:
+    """JobQueue.stats() in the Prometheus text exposition format"""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"])
+        lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+    metric("resume_service_queue_depth", "gauge", "Jobs waiting for a worker", [("", stats["queue_depth"])])
+    metric("resume_service_workers", "gauge", "Background workers", [("", stats["workers"])])
+    metric("resume_service_workers_busy", "gauge", "Workers currently running a job",
+           [("", stats["busy_workers"])])
+    metric("resume_service_worker_busy_seconds_total", "counter", "Time workers spent running jobs",
+           [("", round(stats["busy_seconds"], 3))])
+    metric("resume_service_worker_utilization", "gauge", "Busy share of worker time since startup",
+           [("", round(stats["utilization"], 4))])
+    metric("resume_service_jobs", "gauge", "Jobs held in memory by status",
+           [(f'{{status="{status}"}}', count) for status, count in sorted(stats["jobs"].items())])
+    return "\n".join(lines) + "\n"
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Routes requests to the JobQueue at self.server.jobs"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, payload, headers: dict = None):
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+    def _error(self, status: int, message: str, **extra):
+        self._json(status, {"error": message, **extra})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            self._error(404, "not found")
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            self._error(400, "send the PDF as the request body")
+            return
+        if length > SERVICE_MAX_UPLOAD_BYTES:
+            self._error(413, f"upload larger than {SERVICE_MAX_UPLOAD_BYTES} bytes")
+            return
+        file_bytes = self.rfile.read(length)
+        if not file_bytes.startswith(b"%PDF"):
+            self._error(415, "body is not a PDF")
+            return
+
+        params = parse_qs(url.query)
+        filename = os.path.basename(params.get("filename", ["upload.pdf"])[0]) or "upload.pdf"
+        enhance = params.get("enhance", ["0"])[0].lower() in ("1", "true", "yes")
+        try:
+            job = self.server.jobs.submit(filename, file_bytes, enhance)
+        except QueueFull as e:
+            self._json(503, {"error": f"queue full ({e})"}, {"Retry-After": "5"})
+            return
+        self._json(202, job, {"Location": f"/jobs/{job['job_id']}"})
+
+    def do_GET(self):
+        parts = [part for part in urlparse(self.path).path.split("/") if part]
+        if parts == ["healthz"]:
+            self._json(200, {"status": "ok"})
+        elif parts == ["metrics"]:
+            body = render_service_metrics(self.server.jobs.stats()) + render_prometheus()
+            self._send(200, body.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.server.jobs.get(parts[1])
+            if job:
+                self._json(200, job)
+            else:
+                self._error(404, "unknown job")
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            self._stream_events(parts[1])
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] in ("extracted", "report", "enhanced", "pdf"):
+            self._send_result(parts[1], parts[2])
+        else:
+            self._error(404, "not found")
+
+    def _send_result(self, job_id: str, kind: str):
+        job, result, pdf = self.server.jobs.result(job_id)
+        if not job:
+            self._error(404, "unknown job")
+            return
+        if job["status"] != "done":
+            self._error(409, f"job is {job['status']}", status=job["status"], detail=job["error"])
+            return
+
+        if kind == "pdf":
+            if pdf is None:
+                self._error(404, "no enhanced resume; submit with enhance=1")
+                return
+            name = os.path.splitext(job["filename"])[0]
+            self._send(200, pdf, "application/pdf",
+                       {"Content-Disposition": f'attachment; filename="{name}_Enhanced.pdf"'})
+            return
+
+        key = {"extracted": "extracted_json", "report": "ats_report", "enhanced": "enhanced_json"}[kind]
+        if result[key] is None:
+            self._error(404, f"no {kind} data for this job")
+            return
+        self._json(200, result[key])
+
+    def _stream_events(self, job_id: str):
+        """Send the job's status on every change until it finishes"""
+        jobs = self.server.jobs
+        job = jobs.get(job_id)
+        if not job:
+            self._error(404, "unknown job")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        version = None
+        try:
+            while job:
+                if job["version"] == version:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    version = job["version"]
+                    self.wfile.write(f"event: status\ndata: {json.dumps(job)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if job["status"] in TERMINAL_STATUSES:
+                    break
+                job = jobs.wait_for_change(job_id, version, SSE_KEEPALIVE)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8000, workers: int = SERVICE_WORKERS,
+                max_queued: int = SERVICE_QUEUE_SIZE, save: bool = True) -> ThreadingHTTPServer:
+    """HTTP server with its JobQueue attached as server.jobs (call serve_forever to run it)"""
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.jobs = JobQueue(workers=workers, max_queued=max_queued, save=save)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resume pipeline HTTP service")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Interface to listen on; the API has no authentication, so 0.0.0.0 exposes "
+                             "resumes and results to the whole network")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Jobs processed at once")
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE,
+                        help="Queued jobs before uploads are refused with 503")
+    parser.add_argument("--no-db", action="store_true", help="Don't look up or save results in Postgres")
+    parser.add_argument("--fake-llm", metavar="LATENCY",
+                        help="Answer LLM calls with the offline fake model (e.g. lognormal:0.6,0.35)")
+    args = parser.parse_args()
+
+    if args.fake_llm:
+        # ChatGroq validates the key at construction time; any value works offline
+        os.environ.setdefault("GROQ_API_KEY", "fake-llm-placeholder")
+        from benchmarks.fake_llm import install
+        install(args.fake_llm)
+        print(f"🧪 Using the fake LLM ({args.fake_llm})")
+
+    server = make_server(args.host, args.port, max(1, args.workers), max(1, args.queue_size), save=not args.no_db)
+    print(f"🚀 Resume service on http://{args.host}:{args.port} "
+          f"({args.workers} workers{', no database' if args.no_db else ''})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
+        server.jobs.close()
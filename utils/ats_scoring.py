@@ -0,0 +1,121 @@
+from utils.resume_schema import EMAIL_RE, PHONE_RE
+import re
+
+# Maximum points per component; they add up to 100
+WEIGHTS = {
+    "sections": 30,
+    "keywords": 25,
+    "formatting": 20,
+    "completeness": 25,
+}
+
+YEAR_RE = re.compile(r"(19|20)\d{2}|present|current", re.IGNORECASE)
+
+# Points lost per formatting issue reported by the analysis
+FORMATTING_ISSUE_PENALTY = 4
+
+
+def _ratio(value: float, target: float) -> float:
+    """value/target capped at 1"""
+    return min(value / target, 1.0) if target else 1.0
+
+
+def _as_list(value) -> list:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        # Skills are sometimes grouped by category
+        return [item for group in value.values() if isinstance(group, list) for item in group]
+    return []
+
+
+def score_sections(resume: dict) -> float:
+    """Presence of the key sections: name, contact, experience, education, skills"""
+    present = [
+        bool(str(resume.get("name", "")).strip()),
+        bool(resume.get("email") or resume.get("phone")),
+        bool(_as_list(resume.get("experience"))),
+        bool(_as_list(resume.get("education"))),
+        bool(_as_list(resume.get("skills"))),
+    ]
+    return WEIGHTS["sections"] * sum(present) / len(present)
+
+
+def score_keywords(keyword_analysis: dict) -> float:
+    """Keyword density: enough technical and soft skills, few important ones missing"""
+    technical = len(keyword_analysis.get("technical_keywords", []) or [])
+    soft = len(keyword_analysis.get("soft_skills", []) or [])
+    missing = len(keyword_analysis.get("missing_important_keywords", []) or [])
+
+    coverage = technical + soft
+    coverage_share = coverage / (coverage + missing) if coverage + missing else 0.0
+    return WEIGHTS["keywords"] * (
+        0.5 * _ratio(technical, 10) + 0.2 * _ratio(soft, 4) + 0.3 * coverage_share
+    )
+
+
+def score_formatting(resume: dict, formatting_issues: list) -> float:
+    """Formatting consistency: reported issues plus local contact/date checks"""
+    penalty = FORMATTING_ISSUE_PENALTY * len(formatting_issues or [])
+
+    email = str(resume.get("email", "") or "").strip()
+    if email and not EMAIL_RE.match(email):
+        penalty += FORMATTING_ISSUE_PENALTY
+    phone = str(resume.get("phone", "") or "").strip()
+    if phone and not PHONE_RE.match(phone):
+        penalty += FORMATTING_ISSUE_PENALTY
+
+    durations = [entry.get("duration", "") for entry in _as_list(resume.get("experience"))
+                 if isinstance(entry, dict)]
+    if durations and not all(YEAR_RE.search(str(duration or "")) for duration in durations):
+        penalty += FORMATTING_ISSUE_PENALTY
+
+    return max(WEIGHTS["formatting"] - penalty, 0)
+
+
+def score_completeness(resume: dict, missing_sections: list) -> float:
+    """How filled-in the experience, education and skills entries are"""
+    experience = [entry for entry in _as_list(resume.get("experience")) if isinstance(entry, dict)]
+    education = [entry for entry in _as_list(resume.get("education")) if isinstance(entry, dict)]
+    skills = _as_list(resume.get("skills"))
+
+    def filled(entries, fields):
+        if not entries:
+            return 0.0
+        return sum(sum(1 for field in fields if entry.get(field)) / len(fields)
+                   for entry in entries) / len(entries)
+
+    experience_share = filled(experience, ["title", "company", "duration", "responsibilities"])
+    education_share = filled(education, ["degree", "institution", "year"])
+    skills_share = _ratio(len(skills), 8)
+    missing_share = 1 - _ratio(len(missing_sections or []), 4)
+
+    return WEIGHTS["completeness"] * (
+        0.4 * experience_share + 0.25 * education_share + 0.2 * skills_share + 0.15 * missing_share
+    )
+
+
+def compute_ats_score(resume: dict, keyword_analysis: dict, formatting_issues: list,
+                      missing_sections: list) -> dict:
+    """
+    Rule-based ATS score (0-100) from the extracted resume and the analysis.
+
+    The same inputs always produce the same score.
+
+    Returns:
+        dict: {"ats_score": int, "components": {name: {"score": float, "max": int}}}
+    """
+    components = {
+        "sections": score_sections(resume),
+        "keywords": score_keywords(keyword_analysis or {}),
+        "formatting": score_formatting(resume, formatting_issues),
+        "completeness": score_completeness(resume, missing_sections),
+    }
+    total = round(sum(components.values()))
+    return {
+        "ats_score": min(max(total, 0), 100),
+        "components": {
+            name: {"score": round(score, 1), "max": WEIGHTS[name]}
+            for name, score in components.items()
+        },
+    }
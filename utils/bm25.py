@@ -0,0 +1,186 @@
+from utils.keyword_matcher import get_matcher, flatten_text
+from scipy import sparse
+import numpy as np
+import pickle
+import re
+
+# Words start with a letter: bare numbers ("5", "2020") only add noise
+WORD_RE = re.compile(r"[a-z][a-z0-9+#]*")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does
+doing during each etc for from had has have having he her here his how i if in into is it its
+just me more most my no nor not of on once only or other our out over own per same she should
+so some such than that the their them then there these they this those through to too under
+until up very via was we were what when where which while who whom why will with would you your
+able ability across along among years year experience work working role team teams strong
+including within using use used new well must required requirements preferred plus looking
+""".split())
+
+
+def analyze_text(text: str) -> list:
+    """
+    Terms for BM25: taxonomy skills collapse to one canonical term each
+    ("k8s" and "Kubernetes" -> "kubernetes", "machine learning" ->
+    "machine_learning"); the remaining words are lowercased, stopwords dropped.
+    """
+    matcher = get_matcher()
+    folded = text.lower()
+    spans = [(start, end, value) for start, end, value in matcher.folded.iter_matches(folded)]
+    spans += [(start, end, value) for start, end, value in matcher.cased.iter_matches(text)]
+    # Longest match first, then keep non-overlapping spans
+    spans.sort(key=lambda span: (span[0], -(span[1] - span[0])))
+    terms = []
+    position = 0
+    for start, end, value in spans:
+        if start < position:
+            continue
+        terms.extend(word for word in WORD_RE.findall(folded[position:start]) if word not in STOPWORDS)
+        terms.append(matcher.skills[value][0].lower().replace(" ", "_"))
+        position = end
+    terms.extend(word for word in WORD_RE.findall(folded[position:]) if word not in STOPWORDS)
+    return terms
+
+
+def resume_text(extracted_json: dict) -> str:
+    """Searchable text of an extracted resume"""
+    return flatten_text(extracted_json if isinstance(extracted_json, dict) else {})
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a sparse term-frequency matrix.
+
+    Raw term frequencies are kept (documents can be appended); the BM25
+    weight matrix is derived from them in one vectorized pass, so scoring a
+    query is a sparse column slice and a mat-vec over every document.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocabulary = {}
+        self.terms = []
+        self.doc_ids = []
+        self.tf = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._weights = None
+        self._idf = None
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add_documents(self, doc_ids: list, documents: list):
+        """Append documents given as term lists"""
+        data, indices, indptr = [], [], [0]
+        for terms in documents:
+            counts = {}
+            for term in terms:
+                column = self.vocabulary.get(term)
+                if column is None:
+                    column = self.vocabulary[term] = len(self.terms)
+                    self.terms.append(term)
+                counts[column] = counts.get(column, 0) + 1
+            indices.extend(counts)
+            data.extend(counts.values())
+            indptr.append(len(indices))
+
+        shape = (len(documents), len(self.vocabulary))
+        block = sparse.csr_matrix((np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+                                   np.asarray(indptr, dtype=np.int64)), shape=shape)
+        existing = self.tf
+        existing.resize((existing.shape[0], len(self.vocabulary)))
+        self.tf = sparse.vstack([existing, block], format="csr")
+        self.doc_ids.extend(doc_ids)
+        self._weights = None
+
+    def _prepare(self):
+        """idf per term and the per-document BM25 weight matrix (CSC, for column slicing)"""
+        if self._weights is not None:
+            return
+        n_docs = max(self.tf.shape[0], 1)
+        doc_freq = np.bincount(self.tf.indices, minlength=self.tf.shape[1])
+        self._idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+        lengths = np.asarray(self.tf.sum(axis=1)).ravel()
+        average = lengths.mean() if lengths.size else 0.0
+        norm = self.k1 * (1 - self.b + self.b * lengths / (average or 1.0))
+        weights = self.tf.copy()
+        row_norm = np.repeat(norm, np.diff(weights.indptr)).astype(np.float32)
+        tf = weights.data
+        weights.data = self._idf[weights.indices] * tf * (self.k1 + 1) / (tf + row_norm)
+        self._weights = weights.tocsc()
+
+    def query_vector(self, terms: list) -> tuple:
+        """(columns, weights) for the query terms present in the vocabulary; repeats weigh 1 + log(count)"""
+        counts = {}
+        for term in terms:
+            column = self.vocabulary.get(term)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        columns = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        return columns, weights.astype(np.float32)
+
+    def score(self, terms: list) -> np.ndarray:
+        """BM25 score of every document for a query"""
+        self._prepare()
+        columns, weights = self.query_vector(terms)
+        if not columns.size:
+            return np.zeros(len(self.doc_ids), dtype=np.float32)
+        return self._weights[:, columns] @ weights
+
+    def top_k(self, terms: list, k: int = 10) -> list:
+        """
+        Best k documents with per-term contributions.
+
+        Returns:
+            list: dicts with doc_id, score, match_percent (share of the best
+                possible score for this query), matched ({term: contribution})
+                and missing (query terms absent from the document, rarest first)
+        """
+        scores = self.score(terms)
+        if not scores.size:
+            return []
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        columns, weights = self.query_vector(terms)
+        # Upper bound per term: a document where the term saturates (tf -> inf, short doc)
+        best_possible = float((self._idf[columns] * (self.k1 + 1) * weights).sum()) if columns.size else 0.0
+        contributions = self._weights[:, columns][top].toarray() * weights
+
+        results = []
+        for row, doc_index in enumerate(top):
+            if scores[doc_index] <= 0:
+                break
+            matched = {self.terms[column]: round(float(value), 4)
+                       for column, value in zip(columns.tolist(), contributions[row]) if value > 0}
+            missing = [self.terms[column] for column in columns[np.argsort(-self._idf[columns])].tolist()
+                       if self.terms[column] not in matched]
+            results.append({
+                "doc_id": self.doc_ids[doc_index],
+                "score": round(float(scores[doc_index]), 4),
+                "match_percent": round(100 * float(scores[doc_index]) / best_possible, 1) if best_possible else 0.0,
+                "matched": dict(sorted(matched.items(), key=lambda item: -item[1])),
+                "missing": missing,
+            })
+        return results
+
+    def save(self, path: str, **metadata):
+        with open(path, "wb") as f:
+            pickle.dump({"index": self, "metadata": metadata}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path: str) -> tuple:
+        """(index, metadata) from save()"""
+        with open(path, "rb") as f:
+            stored = pickle.load(f)
+        return stored["index"], stored["metadata"]
+
+    def __getstate__(self):
+        # Derived matrices are rebuilt on demand
+        state = dict(self.__dict__)
+        state["_weights"] = None
+        state["_idf"] = None
+        return state
@@ -0,0 +1,196 @@
+"""Optional LangGraph checkpointing for the agent graphs, keyed by run id"""
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from dotenv import load_dotenv
+import threading
+import asyncio
+import os
+
+load_dotenv()
+
+# Where checkpoints go; unset turns checkpointing off. "memory" keeps them in
+# process, "sqlite:PATH" needs langgraph-checkpoint-sqlite, and "postgres"
+# (the DB_* database) or a postgresql:// URL needs langgraph-checkpoint-postgres
+CHECKPOINT_URL = os.getenv("CHECKPOINT_URL", "")
+
+_checkpointer = None
+_checkpointer_ready = False
+_checkpointer_lock = threading.Lock()
+_apps = {}
+
+
+class ThreadedSaver(BaseCheckpointSaver):
+    """
+    Async interface for a sync-only saver (SqliteSaver, PostgresSaver).
+
+    The agent graphs are run with both invoke and ainvoke, so one saver has
+    to serve both; the async methods run the sync ones in worker threads.
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+
+    def get_tuple(self, config):
+        return self.saver.get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        return self.saver.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        return self.saver.put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id):
+        return self.saver.delete_thread(thread_id)
+
+    def get_next_version(self, current, channel):
+        return self.saver.get_next_version(current, channel)
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.saver.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: list(self.saver.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.saver.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.saver.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return await asyncio.to_thread(self.saver.delete_thread, thread_id)
+
+
+def _postgres_url() -> str:
+    from database import _connect_params
+    params = _connect_params()
+    return " ".join(f"{key}={value}" for key, value in params.items() if value)
+
+
+def _create_checkpointer(url: str) -> BaseCheckpointSaver:
+    if url == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+        return InMemorySaver()
+
+    if url.startswith("sqlite:"):
+        try:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+        except ImportError:
+            raise RuntimeError("CHECKPOINT_URL=sqlite:... needs: pip install langgraph-checkpoint-sqlite")
+        import sqlite3
+        path = url[len("sqlite:"):].removeprefix("//") or ".checkpoints.db"
+        saver = SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+        saver.setup()
+        return ThreadedSaver(saver)
+
+    if url == "postgres" or url.startswith(("postgres://", "postgresql://")):
+        try:
+            from langgraph.checkpoint.postgres import PostgresSaver
+            from psycopg.rows import dict_row
+            from psycopg_pool import ConnectionPool
+        except ImportError:
+            raise RuntimeError("CHECKPOINT_URL=postgres needs: pip install langgraph-checkpoint-postgres psycopg-pool")
+        pool = ConnectionPool(_postgres_url() if url == "postgres" else url, open=True,
+                              kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row})
+        saver = PostgresSaver(pool)
+        saver.setup()
+        return ThreadedSaver(saver)
+
+    raise ValueError(f"Unsupported CHECKPOINT_URL: {url!r}")
+
+
+def get_checkpointer():
+    """The configured checkpointer (created on first use), or None when checkpointing is off"""
+    global _checkpointer, _checkpointer_ready
+    if not _checkpointer_ready:
+        with _checkpointer_lock:
+            if not _checkpointer_ready:
+                _checkpointer = _create_checkpointer(CHECKPOINT_URL) if CHECKPOINT_URL else None
+                _checkpointer_ready = True
+    return _checkpointer
+
+
+def set_checkpointer(checkpointer=None):
+    """Use the given saver for checkpointed runs (None turns checkpointing off)"""
+    global _checkpointer, _checkpointer_ready
+    with _checkpointer_lock:
+        _checkpointer = checkpointer
+        _checkpointer_ready = True
+        _apps.clear()
+
+
+def _checkpointed(app, run_id: str, graph: str):
+    """(app bound to the checkpointer, thread config), or (None, None) if this run isn't checkpointed"""
+    checkpointer = get_checkpointer() if run_id else None
+    if checkpointer is None:
+        return None, None
+    bound = _apps.get(id(app))
+    if bound is None or bound.checkpointer is not checkpointer:
+        bound = _apps[id(app)] = app.copy(update={"checkpointer": checkpointer})
+    return bound, {"configurable": {"thread_id": f"{run_id}:{graph}"}}
+
+
+def run_graph(app, state: dict, run_id: str = None, graph: str = "graph") -> dict:
+    """
+    Invoke a compiled graph, resuming the run's checkpoint if there is one.
+
+    Checkpoints are saved after every node to the thread "<run id>:<graph>".
+    A finished graph returns its stored final state; an interrupted one
+    continues at the first node that did not finish.
+
+    Args:
+        app: Compiled graph (without a checkpointer)
+        state: Initial state, used when the run has no checkpoint yet
+        run_id: Run to checkpoint under; None runs the graph without checkpoints
+        graph: Name of the graph within the run
+
+    Returns:
+        dict: Final graph state
+    """
+    bound, config = _checkpointed(app, run_id, graph)
+    if bound is None:
+        return app.invoke(state)
+    snapshot = bound.get_state(config)
+    if snapshot.values and not snapshot.next:
+        return snapshot.values
+    return bound.invoke(None if snapshot.next else state, config)
+
+
+async def arun_graph(app, state: dict, run_id: str = None, graph: str = "graph") -> dict:
+    """Async counterpart of run_graph"""
+    bound, config = _checkpointed(app, run_id, graph)
+    if bound is None:
+        return await app.ainvoke(state)
+    snapshot = await bound.aget_state(config)
+    if snapshot.values and not snapshot.next:
+        return snapshot.values
+    return await bound.ainvoke(None if snapshot.next else state, config)
+
+
+async def agraph_started(app, run_id: str, graph: str) -> bool:
+    """Whether the run already has a checkpoint for this graph"""
+    bound, config = _checkpointed(app, run_id, graph)
+    if bound is None:
+        return False
+    snapshot = await bound.aget_state(config)
+    return bool(snapshot.values)
+
+
+def graph_started(app, run_id: str, graph: str) -> bool:
+    """Sync counterpart of agraph_started"""
+    bound, config = _checkpointed(app, run_id, graph)
+    return bound is not None and bool(bound.get_state(config).values)
+
+
+def clear_run(run_id: str, graphs: tuple = ("extract", "ats", "enhance")):
+    """Drop a run's checkpoints once its results are saved"""
+    checkpointer = get_checkpointer() if run_id else None
+    if checkpointer is not None:
+        for graph in graphs:
+            checkpointer.delete_thread(f"{run_id}:{graph}")
@@ -0,0 +1,306 @@
+from collections import deque
+from functools import lru_cache
+import hashlib
+import json
+import os
+import pickle
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TAXONOMY_PATH = os.path.join(BASE_DIR, "data", "skills_taxonomy.json")
+DEFAULT_INDEX_PATH = os.path.join(BASE_DIR, "data", "skills_index.pkl")
+# Bump when the way the automata are built changes, so cached indexes are rebuilt
+INDEX_VERSION = 2
+
+# Ordinary English that must not be read as skills, and resume phrases that
+# must be (checked by self_check)
+NOT_SKILLS = ["Go to market", "express shipping", "Spring Corp", "R&D",
+              "Julia Roberts took a swift look at the flask", "- Go to market"]
+SKILL_CHECKS = {
+    "Used Excel and Flask": ["Excel", "Flask"],
+    "Wrote Go microservices": ["Go", "Microservices"],
+    "Senior Go Developer": ["Go"],
+    "Spring Boot": ["Spring Boot"],
+    "Python, Go, Rust": ["Python", "Go", "Rust"],
+}
+
+# Characters that continue a token, so "java" does not match inside
+# "javascript" and "c" does not match the start of "c++" or "c#"
+_WORD_EXTRA = set("+#")
+# Text ending in one of these starts a new sentence or bullet
+_SENTENCE_BREAKS = set(".!?|:;\n•·*-–")
+# Capitalised words that may follow a skill name ("Senior Go Developer")
+_ROLE_WORDS = {"developer", "developers", "engineer", "engineers", "programmer",
+               "programmers", "architect", "consultant", "specialist", "expert"}
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char in _WORD_EXTRA
+
+
+def _neighbour_words(text: str, start: int, end: int) -> tuple:
+    """The words directly before and after text[start:end] when only spaces separate them, else ''"""
+    before, after = text[:start].split(), text[end:].split()
+    previous = before[-1] if before and text[start - 1] == " " else ""
+    following = after[0] if after and text[end:end + 1] == " " else ""
+    return previous, following
+
+
+def _starts_sentence(text: str, index: int) -> bool:
+    """Whether text[index:] begins a sentence, bullet or field"""
+    before = text[:index].rstrip()
+    return not before or before[-1] in _SENTENCE_BREAKS
+
+
+def _is_standalone(text: str, start: int, end: int) -> bool:
+    """
+    Whether a cased alias at text[start:end] reads as the skill rather than
+    an English word or part of a name: not glued to '&' ("R&D"), not inside
+    a run of capitalised words ("Spring Corp", "paid by American Express"), and not
+    a sentence-initial word followed by more words ("Go to market").
+
+    Resume lines capitalise their first word, so a capitalised word that
+    opens the sentence ("Used Excel", "Senior Go Developer") does not count,
+    nor does a role word after the alias.
+    """
+    if (start and text[start - 1] == "&") or (end < len(text) and text[end] == "&"):
+        return False
+    previous, following = _neighbour_words(text, start, end)
+    if (previous[:1].isupper() and _is_word_char(previous[-1])
+            and not _starts_sentence(text, start - 1 - len(previous))):
+        return False
+    if following[:1].isupper() and following.strip(".,;:!?").lower() not in _ROLE_WORDS:
+        return False
+    return not (_starts_sentence(text, start) and following[:1].isalnum())
+
+
+class AhoCorasick:
+    """Multi-pattern automaton: finds every pattern occurrence in one pass over the text"""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+    def add(self, pattern: str, value: int):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = next_state
+        self.out[state].append((len(pattern), value))
+
+    def build(self):
+        """Compute failure links (breadth-first) and merge outputs along them"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.out[next_state] = self.out[next_state] + self.out[self.fail[next_state]]
+        return self
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, value) for every whole-word occurrence of a pattern"""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        length = len(text)
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_length, value in out[state]:
+                start = index - pattern_length + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if index + 1 < length and _is_word_char(text[index + 1]):
+                    continue
+                yield start, index + 1, value
+
+
+class KeywordMatcher:
+    """
+    Skill taxonomy compiled into Aho-Corasick automata.
+
+    Plain aliases are matched case-insensitively. Skills with "cased_aliases"
+    (names that are also ordinary English, like "Go" or "Swift") only match
+    the name and those aliases as written, and only when they stand alone.
+    """
+
+    def __init__(self, taxonomy: dict):
+        self.skills = [(skill["name"], skill["category"]) for skill in taxonomy["skills"]]
+        self.roles = taxonomy["roles"]
+        self.default_role = taxonomy.get("default_role")
+        self.folded = AhoCorasick()
+        self.cased = AhoCorasick()
+        for index, skill in enumerate(taxonomy["skills"]):
+            cased = skill.get("cased_aliases", [])
+            aliases = {alias.lower() for alias in skill.get("aliases", [])}
+            # A name that is also an English word only matches as written
+            if not cased:
+                aliases.add(skill["name"].lower())
+            for alias in aliases:
+                self.folded.add(alias, index)
+            for alias in {skill["name"], *cased} if cased else ():
+                self.cased.add(alias, index)
+        self.folded.build()
+        self.cased.build()
+
+    def find(self, text: str) -> list:
+        """Canonical skill indexes found in text, in order of first appearance"""
+        hits = {}
+        for start, _, value in self.folded.iter_matches(text.lower()):
+            hits.setdefault(value, start)
+        for start, end, value in self.cased.iter_matches(text):
+            if not _is_standalone(text, start, end):
+                continue
+            if value not in hits or start < hits[value]:
+                hits[value] = start
+        return sorted(hits, key=hits.get)
+
+    def find_skills(self, text: str) -> list:
+        """Canonical skill names found in text"""
+        return [self.skills[index][0] for index in self.find(text)]
+
+    def detect_role(self, titles: list) -> str:
+        """Pick the role whose title keywords best match the given job titles"""
+        text = " ".join(str(title).lower() for title in titles)
+        best_role, best_hits = self.default_role, 0
+        for role, spec in self.roles.items():
+            hits = sum(1 for keyword in spec["titles"] if keyword in text)
+            if hits > best_hits:
+                best_role, best_hits = role, hits
+        return best_role
+
+    def analyze(self, resume: dict) -> dict:
+        """
+        Keyword analysis for an extracted resume, without any network call.
+
+        Returns:
+            dict: technical_keywords, soft_skills, missing_important_keywords
+                (for the detected role) and detected_role
+        """
+        found = self.find(flatten_text(resume))
+        technical = [self.skills[i][0] for i in found if self.skills[i][1] != "soft"]
+        soft = [self.skills[i][0] for i in found if self.skills[i][1] == "soft"]
+
+        experience = resume.get("experience") if isinstance(resume.get("experience"), list) else []
+        titles = [entry.get("title", "") for entry in experience if isinstance(entry, dict)]
+        role = self.detect_role(titles or [resume.get("professional_summary", "")])
+
+        found_names = set(technical) | set(soft)
+        important = self.roles.get(role, {}).get("important", [])
+        return {
+            "technical_keywords": technical,
+            "soft_skills": soft,
+            "missing_important_keywords": [name for name in important if name not in found_names],
+            "detected_role": role,
+        }
+
+
+def flatten_text(value) -> str:
+    """Join every string in a nested JSON value, with separators between fields"""
+    parts = []
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, dict):
+            stack.extend(reversed(list(item.values())))
+        elif isinstance(item, (list, tuple)):
+            stack.extend(reversed(item))
+        elif item is not None:
+            parts.append(str(item))
+    return " | ".join(parts)
+
+
+def _taxonomy_digest(raw: bytes) -> str:
+    return hashlib.sha256(raw + f"\0{INDEX_VERSION}".encode()).hexdigest()
+
+
+def build_index(taxonomy_path: str = DEFAULT_TAXONOMY_PATH, index_path: str = DEFAULT_INDEX_PATH) -> KeywordMatcher:
+    """Compile the taxonomy and write the prebuilt index next to it"""
+    with open(taxonomy_path, "rb") as f:
+        raw = f.read()
+    matcher = KeywordMatcher(json.loads(raw))
+    with open(index_path, "wb") as f:
+        pickle.dump({"digest": _taxonomy_digest(raw), "matcher": matcher}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return matcher
+
+
+def load_matcher(taxonomy_path: str = DEFAULT_TAXONOMY_PATH, index_path: str = DEFAULT_INDEX_PATH) -> KeywordMatcher:
+    """
+    Load the prebuilt index, rebuilding it when missing or older than the taxonomy.
+    """
+    with open(taxonomy_path, "rb") as f:
+        digest = _taxonomy_digest(f.read())
+    try:
+        with open(index_path, "rb") as f:
+            index = pickle.load(f)
+        if index.get("digest") == digest:
+            return index["matcher"]
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    try:
+        return build_index(taxonomy_path, index_path)
+    except OSError:
+        # Read-only checkout: compile in memory only
+        with open(taxonomy_path, "r", encoding="utf-8") as f:
+            return KeywordMatcher(json.load(f))
+
+
+@lru_cache(maxsize=None)
+def get_matcher() -> KeywordMatcher:
+    """Process-wide matcher for the default taxonomy"""
+    return load_matcher()
+
+
+def analyze_keywords(resume: dict) -> dict:
+    """Local keyword analysis of an extracted resume (see KeywordMatcher.analyze)"""
+    return get_matcher().analyze(resume)
+
+
+def self_check(matcher: KeywordMatcher = None):
+    """
+    Regression check for cased aliases: NOT_SKILLS match nothing and every
+    SKILL_CHECKS phrase finds its skills. Raises AssertionError on failure.
+    """
+    matcher = matcher or get_matcher()
+    for text in NOT_SKILLS:
+        found = matcher.find_skills(text)
+        assert not found, f"{text!r} matched {found}"
+    for text, expected in SKILL_CHECKS.items():
+        found = matcher.find_skills(text)
+        assert found == expected, f"{text!r} found {found}, expected {expected}"
+
+
+if __name__ == "__main__":
+    # Rebuild the prebuilt index: python -m utils.keyword_matcher
+    # Import through the package so pickled classes resolve from any module
+    from utils import keyword_matcher
+
+    start = time.perf_counter()
+    matcher = keyword_matcher.build_index()
+    built = time.perf_counter() - start
+
+    keyword_matcher.self_check(matcher)
+
+    start = time.perf_counter()
+    keyword_matcher.load_matcher()
+    loaded = time.perf_counter() - start
+
+    print(f"✅ Index written to {DEFAULT_INDEX_PATH}")
+    print(f"   {len(matcher.skills)} skills, {len(matcher.folded.goto) + len(matcher.cased.goto)} automaton states")
+    print(f"   build {built * 1000:.1f} ms, load {loaded * 1000:.1f} ms")
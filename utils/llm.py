@@ -0,0 +1,190 @@
+from langchain_groq import ChatGroq
+from langchain_core.messages import AIMessage
+from utils.llm_cache import LLMCache, MemoryLRUCache, SQLiteCache, make_cache_key
+from utils.telemetry import record_llm_call
+from utils.rate_limiter import get_rate_limiter
+from dotenv import load_dotenv
+import threading
+import time
+import os
+
+load_dotenv()
+
+# Model used by every agent unless a node asks for a different one
+DEFAULT_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+
+# Response cache settings
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3")
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+# Creative (sampling) nodes bypass the cache unless this is set
+LLM_CACHE_CREATIVE = os.getenv("LLM_CACHE_CREATIVE", "0") == "1"
+
+_models = {}
+_models_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _groq_factory(model_name: str, temperature: float = None):
+    """
+    Default factory: a ChatGroq client (temperature None keeps the client default).
+    With the shared rate limiter on, retries are left to it so backoff happens
+    across all calls; without it the client keeps its own retries.
+    """
+    options = {"max_retries": 0} if get_rate_limiter() is not None else {}
+    if temperature is None:
+        return ChatGroq(model=model_name, **options)
+    return ChatGroq(model=model_name, temperature=temperature, **options)
+
+
+_model_factory = _groq_factory
+
+
+def get_model(temperature: float = None, model_name: str = None):
+    """
+    Return a shared chat model for the given model name and temperature.
+
+    Chat models are stateless between calls, so one instance per
+    (model, temperature) pair is created lazily and reused by every node.
+
+    Args:
+        temperature: Sampling temperature (None keeps the client default)
+        model_name: Model to use (defaults to GROQ_MODEL / DEFAULT_MODEL)
+
+    Returns:
+        A LangChain chat model
+    """
+    key = (model_name or DEFAULT_MODEL, temperature)
+    model = _models.get(key)
+    if model is None:
+        with _models_lock:
+            model = _models.get(key)
+            if model is None:
+                model = _model_factory(*key)
+                _models[key] = model
+    return model
+
+
+def set_model_factory(factory=None):
+    """
+    Replace the function used to build chat models, e.g. with a fake model
+    for offline runs. Passing None restores the ChatGroq factory.
+
+    Args:
+        factory: Callable taking (model_name, temperature) and returning a chat model
+    """
+    global _model_factory
+    _model_factory = factory or _groq_factory
+    clear_models()
+
+
+def clear_models():
+    """Drop all cached model instances"""
+    with _models_lock:
+        _models.clear()
+
+
+def get_cache():
+    """Return the shared response cache (memory LRU in front of SQLite), or None if disabled"""
+    global _cache
+    if _cache is None and LLM_CACHE_ENABLED:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache([
+                    MemoryLRUCache(LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_TTL),
+                    SQLiteCache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL),
+                ])
+    return _cache
+
+
+def set_cache(cache):
+    """Install a different cache (any object with get/set), or None to disable caching"""
+    global _cache, LLM_CACHE_ENABLED
+    with _cache_lock:
+        _cache = cache
+        LLM_CACHE_ENABLED = cache is not None
+
+
+def _cache_key_for(messages: list, temperature: float, model_name: str, creative: bool):
+    """Return (cache, key) for a call, or (None, None) when the call must not be cached"""
+    cache = get_cache()
+    if cache is None or (creative and not LLM_CACHE_CREATIVE):
+        return None, None
+    prompt = "\n".join(f"{message.type}: {message.content}" for message in messages)
+    return cache, make_cache_key(model_name or DEFAULT_MODEL, temperature, prompt)
+
+
+def invoke_model(messages: list, temperature: float = None, model_name: str = None,
+                 creative: bool = False):
+    """
+    Invoke the shared model for the given messages, going through the response
+    cache and (on a miss) the shared rate limiter.
+
+    Args:
+        messages: Chat messages to send
+        temperature: Sampling temperature (None keeps the client default)
+        model_name: Model to use (defaults to DEFAULT_MODEL)
+        creative: Sampling node whose output should vary between runs; these
+            bypass the cache unless LLM_CACHE_CREATIVE=1
+
+    Returns:
+        AIMessage: The model (or cached) response
+    """
+    cache, key = _cache_key_for(messages, temperature, model_name, creative)
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            record_llm_call(messages, None, 0.0, cache_hit=True)
+            return AIMessage(content=cached)
+
+    model = get_model(temperature, model_name)
+
+    def send():
+        started = time.perf_counter()
+        response = model.invoke(messages)
+        record_llm_call(messages, response, time.perf_counter() - started)
+        return response
+
+    limiter = get_rate_limiter()
+    response = limiter.call(send, messages) if limiter else send()
+    if key is not None:
+        cache.set(key, response.content)
+    return response
+
+
+async def ainvoke_model(messages: list, temperature: float = None, model_name: str = None,
+                        creative: bool = False):
+    """Async counterpart of invoke_model"""
+    cache, key = _cache_key_for(messages, temperature, model_name, creative)
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            record_llm_call(messages, None, 0.0, cache_hit=True)
+            return AIMessage(content=cached)
+
+    model = get_model(temperature, model_name)
+
+    async def send():
+        started = time.perf_counter()
+        response = await model.ainvoke(messages)
+        record_llm_call(messages, response, time.perf_counter() - started)
+        return response
+
+    limiter = get_rate_limiter()
+    response = await limiter.acall(send, messages) if limiter else await send()
+    if key is not None:
+        cache.set(key, response.content)
+    return response
+
+
+def strip_code_fence(content: str) -> str:
+    """Remove markdown code blocks if present"""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:]
+    return content
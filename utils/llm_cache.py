@@ -0,0 +1,191 @@
+from collections import OrderedDict
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def make_cache_key(model_name: str, temperature, prompt: str) -> str:
+    """Content address of an LLM call: sha256 over model, temperature and exact prompt"""
+    payload = json.dumps([model_name, temperature, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryLRUCache:
+    """In-process LRU tier with optional TTL"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created_at = entry
+            if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, created_at: float = None):
+        with self._lock:
+            self._entries[key] = (value, created_at or time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk tier; evicts expired entries and least recently used rows past max_entries"""
+
+    # Trimming needs a COUNT, so only check the size every few writes
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int = 100_000, ttl_seconds: float = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache(
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache(key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def _prune(self, now: float):
+        removed = 0
+        if self.ttl_seconds is not None:
+            removed += self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+        excess = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            removed += self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access LIMIT ?)", (excess,)
+            ).rowcount
+        self._conn.commit()
+        self.evictions += removed
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class LLMCache:
+    """
+    Tiered LLM response cache.
+
+    Lookups go through the tiers in order (e.g. memory, then SQLite) and a hit
+    in a lower tier is promoted into the tiers above it. Any object with
+    get/set/clear can be used as a tier.
+    """
+
+    def __init__(self, tiers: list):
+        self.tiers = tiers
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.tier_hits = [0] * len(tiers)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for upper in self.tiers[:index]:
+                    upper.set(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.tier_hits[index] += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        for tier in self.tiers:
+            tier.set(key, value)
+        with self._lock:
+            self.writes += 1
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for the whole cache and per tier"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "tiers": [
+                {
+                    "tier": type(tier).__name__,
+                    "hits": self.tier_hits[index],
+                    "evictions": getattr(tier, "evictions", 0),
+                }
+                for index, tier in enumerate(self.tiers)
+            ],
+        }
@@ -0,0 +1,137 @@
+"""
+Render many resume PDFs across a process pool.
+
+ReportLab layout is pure Python and holds the GIL, so threads do not help;
+each worker process builds the stylesheet once in its initializer and then
+renders documents sent to it. Results are yielded as they finish, and only
+a bounded number of documents are in flight, so the input can be a lazy
+iterable of any size.
+
+Regenerate every stored enhanced resume:
+    python -m utils.pdf_batch output_dir --workers 4
+"""
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import redirect_stdout
+import itertools
+import argparse
+import time
+import io
+import os
+
+# Stylesheet of the current worker process, set by _init_worker
+_worker_styles = None
+
+
+def _init_worker():
+    global _worker_styles
+    from utils.pdf_generator import _build_styles
+    _worker_styles = _build_styles()
+
+
+def _pdf_filename(index: int, enhanced_json: dict) -> str:
+    name = str(enhanced_json.get('name') or 'Resume').replace(' ', '_').replace(os.sep, '_')
+    return f"{index:05d}_{name}_Enhanced.pdf"
+
+
+def _render(index: int, enhanced_json: dict, output_dir: str = None) -> tuple:
+    """(index, path or PDF bytes, seconds) for one document, in a worker"""
+    from utils.pdf_generator import ResumePDFGenerator
+    start = time.perf_counter()
+    if output_dir:
+        output = os.path.join(output_dir, _pdf_filename(index, enhanced_json))
+    else:
+        output = io.BytesIO()
+    # generate() prints a line per file; keep worker output quiet
+    with redirect_stdout(io.StringIO()):
+        ResumePDFGenerator(output, styles=_worker_styles).generate(enhanced_json)
+    result = output if output_dir else output.getvalue()
+    return index, result, time.perf_counter() - start
+
+
+def render_pdfs(documents, output_dir: str = None, workers: int = None, max_pending: int = None):
+    """
+    Render enhanced resume JSON documents in parallel, yielding results as they complete.
+
+    Args:
+        documents: Iterable of enhanced resume dicts (consumed lazily)
+        output_dir: Write PDFs here and yield their paths; without it PDF bytes are yielded
+        workers: Worker processes (default: CPU count)
+        max_pending: Documents in flight at once (default: 4 per worker)
+
+    Yields:
+        dict: index (position in documents), path or pdf, seconds, and error
+            (None unless rendering failed); in completion order
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 4
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    source = enumerate(documents)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = {}
+
+        def fill():
+            for index, enhanced_json in itertools.islice(source, max_pending - len(pending)):
+                pending[pool.submit(_render, index, enhanced_json, output_dir)] = index
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                record = {"index": index, "path" if output_dir else "pdf": None, "seconds": None, "error": None}
+                try:
+                    _, result, seconds = future.result()
+                    record["path" if output_dir else "pdf"] = result
+                    record["seconds"] = round(seconds, 4)
+                except Exception as e:
+                    record["error"] = f"{type(e).__name__}: {e}"
+                yield record
+            fill()
+
+
+def measure_throughput(documents: list, worker_counts: list) -> dict:
+    """Documents/second of render_pdfs (in memory) for each worker count"""
+    results = {}
+    for workers in worker_counts:
+        start = time.perf_counter()
+        errors = sum(1 for record in render_pdfs(documents, workers=workers) if record["error"])
+        elapsed = time.perf_counter() - start
+        results[workers] = {
+            "documents": len(documents),
+            "errors": errors,
+            "seconds": round(elapsed, 3),
+            "docs_per_s": round(len(documents) / elapsed, 2) if elapsed else None,
+        }
+    return results
+
+
+def _stored_enhanced_resumes():
+    """enhanced_json of every stored resume that has one, streamed"""
+    from database import db_connection
+    with db_connection() as conn:
+        with conn.cursor(name="pdf_batch_resumes") as cur:
+            cur.itersize = 500
+            cur.execute("SELECT enhanced_json FROM resumes WHERE enhanced_json IS NOT NULL ORDER BY id;")
+            for (enhanced_json,) in cur:
+                yield enhanced_json
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate enhanced resume PDFs for all stored resumes")
+    parser.add_argument("output_dir", help="Directory for the generated PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rendered = failed = 0
+    for record in render_pdfs(_stored_enhanced_resumes(), args.output_dir, args.workers):
+        if record["error"]:
+            failed += 1
+            print(f"❌ #{record['index']}: {record['error']}")
+        else:
+            rendered += 1
+    elapsed = time.perf_counter() - start
+    print(f"✅ Rendered {rendered} PDF(s), {failed} failed, in {elapsed:.1f}s "
+          f"({rendered / elapsed if elapsed else 0:.1f} docs/s)")
@@ -6,112 +6,125 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 from datetime import datetime
+import io
 import os
 
+
+def _build_styles():
+    """Sample stylesheet plus the custom paragraph styles for the resume"""
+    styles = getSampleStyleSheet()
+    # Name style
+    styles.add(ParagraphStyle(
+        name='Name',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1a1a1a'),
+        spaceAfter=6,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Contact info style
+    styles.add(ParagraphStyle(
+        name='Contact',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#555555'),
+        alignment=TA_CENTER,
+        spaceAfter=12
+    ))
+    
+    # Section header style
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=8,
+        spaceBefore=12,
+        fontName='Helvetica-Bold',
+        borderWidth=1,
+        borderColor=colors.HexColor('#3498db'),
+        borderPadding=4,
+        backColor=colors.HexColor('#ecf0f1')
+    ))
+    
+    # Job title style
+    styles.add(ParagraphStyle(
+        name='JobTitle',
+        parent=styles['Normal'],
+        fontSize=11,
+        textColor=colors.HexColor('#2c3e50'),
+        fontName='Helvetica-Bold',
+        spaceAfter=2
+    ))
+    
+    # Company style
+    styles.add(ParagraphStyle(
+        name='Company',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#7f8c8d'),
+        fontName='Helvetica-Oblique',
+        spaceAfter=4
+    ))
+    
+    # Body text style
+    styles.add(ParagraphStyle(
+        name='ResumeBody',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#34495e'),
+        spaceAfter=6,
+        alignment=TA_JUSTIFY
+    ))
+    
+    # Bullet point style
+    styles.add(ParagraphStyle(
+        name='ResumeBullet',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=colors.HexColor('#34495e'),
+        leftIndent=20,
+        spaceAfter=4,
+        bulletIndent=10
+    ))
+    
+    # Skills style
+    styles.add(ParagraphStyle(
+        name='Skills',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=colors.HexColor('#34495e'),
+        spaceAfter=4
+    ))
+    return styles
+
+
+# Built once and shared: styles are only read while a PDF is rendered
+RESUME_STYLES = _build_styles()
+
+
 class ResumePDFGenerator:
     """Generate professional resume PDFs from enhanced JSON data"""
     
-    def __init__(self, output_path: str):
-        self.output_path = output_path
+    def __init__(self, output, styles=None):
+        """
+        Args:
+            output: Path of the PDF, or a binary file-like object to write it to
+            styles: Stylesheet to use (defaults to the shared RESUME_STYLES)
+        """
+        self.output_path = output
         self.doc = SimpleDocTemplate(
-            output_path,
+            output,
             pagesize=letter,
             rightMargin=0.75*inch,
             leftMargin=0.75*inch,
             topMargin=0.75*inch,
             bottomMargin=0.75*inch
         )
-        self.styles = getSampleStyleSheet()
+        self.styles = RESUME_STYLES if styles is None else styles
         self.story = []
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles for the resume"""
-        # Name style
-        self.styles.add(ParagraphStyle(
-            name='Name',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a1a1a'),
-            spaceAfter=6,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Contact info style
-        self.styles.add(ParagraphStyle(
-            name='Contact',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#555555'),
-            alignment=TA_CENTER,
-            spaceAfter=12
-        ))
-        
-        # Section header style
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=8,
-            spaceBefore=12,
-            fontName='Helvetica-Bold',
-            borderWidth=1,
-            borderColor=colors.HexColor('#3498db'),
-            borderPadding=4,
-            backColor=colors.HexColor('#ecf0f1')
-        ))
-        
-        # Job title style
-        self.styles.add(ParagraphStyle(
-            name='JobTitle',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            textColor=colors.HexColor('#2c3e50'),
-            fontName='Helvetica-Bold',
-            spaceAfter=2
-        ))
-        
-        # Company style
-        self.styles.add(ParagraphStyle(
-            name='Company',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#7f8c8d'),
-            fontName='Helvetica-Oblique',
-            spaceAfter=4
-        ))
-        
-        # Body text style
-        self.styles.add(ParagraphStyle(
-            name='BodyText',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#34495e'),
-            spaceAfter=6,
-            alignment=TA_JUSTIFY
-        ))
-        
-        # Bullet point style
-        self.styles.add(ParagraphStyle(
-            name='Bullet',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            textColor=colors.HexColor('#34495e'),
-            leftIndent=20,
-            spaceAfter=4,
-            bulletIndent=10
-        ))
-        
-        # Skills style
-        self.styles.add(ParagraphStyle(
-            name='Skills',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            textColor=colors.HexColor('#34495e'),
-            spaceAfter=4
-        ))
     
     def add_header(self, name: str, email: str, phone: str):
         """Add resume header with contact information"""
@@ -134,7 +147,7 @@ class ResumePDFGenerator:
         header = Paragraph("PROFESSIONAL SUMMARY", self.styles['SectionHeader'])
         self.story.append(header)
         
-        summary_para = Paragraph(summary, self.styles['BodyText'])
+        summary_para = Paragraph(summary, self.styles['ResumeBody'])
         self.story.append(summary_para)
         
         self.story.append(Spacer(1, 0.15*inch))
@@ -192,7 +205,7 @@ class ResumePDFGenerator:
             responsibilities = exp.get('responsibilities', [])
             for resp in responsibilities:
                 bullet_text = f"• {resp}"
-                bullet_para = Paragraph(bullet_text, self.styles['Bullet'])
+                bullet_para = Paragraph(bullet_text, self.styles['ResumeBullet'])
                 self.story.append(bullet_para)
             
             self.story.append(Spacer(1, 0.1*inch))
@@ -224,7 +237,7 @@ class ResumePDFGenerator:
             
             # Additional details
             if details:
-                details_para = Paragraph(details, self.styles['Bullet'])
+                details_para = Paragraph(details, self.styles['ResumeBullet'])
                 self.story.append(details_para)
             
             self.story.append(Spacer(1, 0.1*inch))
@@ -265,7 +278,8 @@ class ResumePDFGenerator:
         
         # Build PDF
         self.doc.build(self.story)
-        print(f"✅ PDF generated successfully: {self.output_path}")
+        if isinstance(self.output_path, str):
+            print(f"✅ PDF generated successfully: {self.output_path}")
 
 
 def generate_resume_pdf(enhanced_json: dict, output_path: str = None):
@@ -297,6 +311,21 @@ def generate_resume_pdf(enhanced_json: dict, output_path: str = None):
     return output_path
 
 
+def generate_resume_pdf_bytes(enhanced_json: dict) -> bytes:
+    """
+    Render the resume PDF in memory, for serving it without a temp file
+    
+    Args:
+        enhanced_json: Enhanced resume data from enhancer_agent
+    
+    Returns:
+        bytes: The PDF document
+    """
+    buffer = io.BytesIO()
+    ResumePDFGenerator(buffer).generate(enhanced_json)
+    return buffer.getvalue()
+
+
 # For testing
 if __name__ == "__main__":
     # Test with sample enhanced resume
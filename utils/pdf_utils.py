@@ -1,24 +1,78 @@
 import fitz  # PyMuPDF
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract all text from a PDF file."""
+def _open_pdf(source):
+    """Open a PDF from a file path or from raw bytes"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    return fitz.open(source)
+
+def _describe(source) -> str:
+    return "<bytes>" if isinstance(source, (bytes, bytearray, memoryview)) else str(source)
+
+def iter_pdf_pages(source, max_pages: int = None):
+    """
+    Yield whitespace-normalized text one page at a time.
+
+    Only the current page's text is held in memory, and callers can stop
+    iterating (or close the generator) as soon as they have enough text.
+
+    Args:
+        source: Path to the PDF or its raw bytes
+        max_pages: Stop after this many pages (optional)
+
+    Yields:
+        str: Text of each page with runs of whitespace collapsed to one space
+    """
     try:
-        text = ""
-        with fitz.open(file_path) as pdf:
-            for page in pdf:
-                text += page.get_text()
-        
-        # Remove excessive whitespace
-        text = " ".join(text.split())
-        
-        if not text.strip():
-            raise ValueError("No text could be extracted from the PDF")
-        
-        return text
-    
+        with _open_pdf(source) as pdf:
+            for index, page in enumerate(pdf):
+                if max_pages is not None and index >= max_pages:
+                    break
+                yield " ".join(page.get_text().split())
+
     except fitz.FileNotFoundError:
-        raise FileNotFoundError(f"PDF file not found: {file_path}")
+        raise FileNotFoundError(f"PDF file not found: {_describe(source)}")
     except fitz.FileDataError:
-        raise ValueError(f"Invalid or corrupted PDF file: {file_path}")
+        raise ValueError(f"Invalid or corrupted PDF file: {_describe(source)}")
     except Exception as e:
-        raise Exception(f"Error extracting text from PDF: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error extracting text from PDF: {str(e)}")
+
+def take_text(pages, min_chars: int) -> list:
+    """
+    Pull pages from an iter_pdf_pages generator until at least min_chars of
+    text have been read (or the document ends). The generator can be resumed
+    afterwards to read the remaining pages.
+    """
+    taken = []
+    total = 0
+    for page_text in pages:
+        if page_text:
+            taken.append(page_text)
+            total += len(page_text) + 1
+        if total >= min_chars:
+            break
+    return taken
+
+def extract_text_from_pdf(file_path: str, max_pages: int = None, max_chars: int = None) -> str:
+    """
+    Extract all text from a PDF file.
+
+    Args:
+        file_path: Path to the PDF (raw bytes are accepted too)
+        max_pages: Only read the first max_pages pages (optional)
+        max_chars: Stop reading pages once this many characters are available
+            and truncate the result to it (optional)
+    """
+    pages = iter_pdf_pages(file_path, max_pages)
+    try:
+        if max_chars is None:
+            text = " ".join(page_text for page_text in pages if page_text)
+        else:
+            text = " ".join(take_text(pages, max_chars))[:max_chars]
+    finally:
+        pages.close()
+
+    if not text:
+        raise Exception("Error extracting text from PDF: No text could be extracted from the PDF")
+
+    return text
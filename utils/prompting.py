@@ -0,0 +1,168 @@
+from dotenv import load_dotenv
+import threading
+import json
+import math
+import os
+
+load_dotenv()
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional dependency (or its data) is unavailable
+    _encoding = None
+
+# Default per-node prompt budgets in tokens; override with PROMPT_BUDGET_<NODE>=n
+PROMPT_BUDGETS = {
+    "classify": 700,
+    "extract": 6000,
+    "extract_retry": 7000,
+    "ats_analysis": 3000,
+    "enhance_summary": 1500,
+    "enhance_experience": 2500,
+    "enhance_skills": 800,
+    "enhance_education": 800,
+}
+
+_report = {}
+_report_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, otherwise a ~4 chars/token estimate"""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def compact_json(value) -> str:
+    """JSON without indentation or spaces after separators"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def project(data: dict, fields: list) -> dict:
+    """
+    Keep only the listed fields of a resume dict.
+
+    "experience.title" keeps only "title" inside each experience entry; list
+    several dotted fields to keep several keys. Empty values are dropped.
+    """
+    if not isinstance(data, dict):
+        return data
+    result = {}
+    nested = {}
+    for field in fields:
+        key, _, sub_key = field.partition(".")
+        if sub_key:
+            nested.setdefault(key, []).append(sub_key)
+        elif data.get(key) not in (None, "", [], {}):
+            result[key] = data[key]
+    for key, sub_keys in nested.items():
+        entries = data.get(key)
+        if isinstance(entries, list) and entries:
+            result[key] = [
+                {sub_key: entry[sub_key] for sub_key in sub_keys if entry.get(sub_key) not in (None, "", [])}
+                if isinstance(entry, dict) else entry
+                for entry in entries
+            ]
+    return result
+
+
+def get_budget(node: str) -> int:
+    """Token budget for a node (PROMPT_BUDGET_<NODE> overrides the default)"""
+    override = os.getenv(f"PROMPT_BUDGET_{node.upper()}")
+    return int(override) if override else PROMPT_BUDGETS.get(node, 4000)
+
+
+def _serialize(value) -> str:
+    return value if isinstance(value, str) else compact_json(value)
+
+
+def _trim(value, overflow_tokens: int):
+    """Shrink a field by roughly overflow_tokens; returns None when it cannot shrink"""
+    if isinstance(value, str):
+        if not value:
+            return None
+        keep = max(len(value) - overflow_tokens * 4, 0)
+        return value[:keep]
+    if isinstance(value, list) and value:
+        return value[:-1]
+    if isinstance(value, dict):
+        # Shrink the largest value that can still shrink
+        for key in sorted(value, key=lambda key: len(_serialize(value[key])), reverse=True):
+            shrunk = _trim(value[key], overflow_tokens)
+            if shrunk is not None:
+                return {**value, key: shrunk}
+    return None
+
+
+def build_prompt(node: str, template: str, fields: dict, baseline: dict = None) -> str:
+    """
+    Format a prompt with compactly serialized fields, trimmed to the node's budget.
+
+    When over budget, the largest trimmable field is shortened first (strings
+    are cut from the end, lists lose trailing items, dicts shrink their
+    largest value the same way) until the prompt fits.
+
+    Args:
+        node: Budget/report key, e.g. "ats_analysis"
+        template: str.format template
+        fields: Placeholder values; non-strings are serialized with compact_json
+        baseline: The unprojected values the node used to send, serialized with
+            indent=2; only used for the tokens-saved report
+
+    Returns:
+        str: The prompt
+    """
+    budget = get_budget(node)
+    values = dict(fields)
+    prompt = template.format(**{key: _serialize(value) for key, value in values.items()})
+    tokens = count_tokens(prompt)
+    trimmed = False
+
+    while tokens > budget:
+        candidates = sorted(values, key=lambda key: len(_serialize(values[key])), reverse=True)
+        for key in candidates:
+            shrunk = _trim(values[key], tokens - budget)
+            if shrunk is not None:
+                values[key] = shrunk
+                break
+        else:
+            break  # nothing left to trim
+        trimmed = True
+        prompt = template.format(**{key: _serialize(value) for key, value in values.items()})
+        tokens = count_tokens(prompt)
+
+    baseline_values = {**fields, **(baseline or {})}
+    baseline_prompt = template.format(**{
+        key: value if isinstance(value, str) else json.dumps(value, indent=2)
+        for key, value in baseline_values.items()
+    })
+    _record(node, tokens, count_tokens(baseline_prompt), trimmed)
+    return prompt
+
+
+def _record(node: str, tokens: int, baseline_tokens: int, trimmed: bool):
+    with _report_lock:
+        entry = _report.setdefault(node, {"calls": 0, "prompt_tokens": 0, "baseline_tokens": 0, "trimmed_calls": 0})
+        entry["calls"] += 1
+        entry["prompt_tokens"] += tokens
+        entry["baseline_tokens"] += baseline_tokens
+        entry["trimmed_calls"] += int(trimmed)
+
+
+def get_token_report() -> dict:
+    """Prompt tokens per node vs. the old indent=2/full-field prompts"""
+    with _report_lock:
+        nodes = {node: {**entry, "saved_tokens": entry["baseline_tokens"] - entry["prompt_tokens"]}
+                 for node, entry in _report.items()}
+    totals = {
+        key: sum(entry[key] for entry in nodes.values())
+        for key in ("calls", "prompt_tokens", "baseline_tokens", "saved_tokens", "trimmed_calls")
+    }
+    return {"nodes": nodes, "totals": totals}
+
+
+def reset_token_report():
+    with _report_lock:
+        _report.clear()
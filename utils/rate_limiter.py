@@ -0,0 +1,314 @@
+"""Shared scheduler for LLM requests (rate limits, adaptive concurrency, retries)"""
+from utils.telemetry import record_llm_wait, record_llm_retry, set_llm_concurrency
+from utils.prompting import count_tokens
+from dotenv import load_dotenv
+import threading
+import asyncio
+import random
+import time
+import re
+import os
+
+load_dotenv()
+
+LLM_RATE_LIMIT = os.getenv("LLM_RATE_LIMIT", "1") != "0"
+# Groq free-tier limits for llama-3.1-8b-instant; 0 disables a bucket
+LLM_RPM = float(os.getenv("LLM_RPM", "30"))
+LLM_TPM = float(os.getenv("LLM_TPM", "6000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+# Completion tokens reserved per request until the real usage is known
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "300"))
+
+# Longest a waiter sleeps before re-checking (slots may free up sooner)
+_POLL_SECONDS = 0.05
+_RETRY_IN_RE = re.compile(r"try again in (?:(\d+)m)?([\d.]+)(ms|s)")
+
+
+class TokenBucket:
+    """Holds up to per_minute units, refilled continuously"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (requests larger than the bucket wait for a full one)"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float):
+        self.level -= amount
+
+    def drain(self):
+        self.level = min(self.level, 0.0)
+
+
+def classify_error(error: Exception) -> tuple:
+    """
+    (reason, retry_after seconds or None) for a failed request; reason is
+    None when retrying would not help (bad request, auth, ...).
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+
+    retry_after = None
+    headers = getattr(response, "headers", None) or {}
+    if headers.get("retry-after"):
+        try:
+            retry_after = float(headers["retry-after"])
+        except ValueError:
+            pass
+    if retry_after is None:
+        # Groq also puts it in the message: "Please try again in 1m2.5s"
+        match = _RETRY_IN_RE.search(str(error))
+        if match:
+            minutes, value, unit = match.groups()
+            retry_after = int(minutes or 0) * 60 + float(value) / (1000 if unit == "ms" else 1)
+
+    if status == 429:
+        return "rate_limit", retry_after
+    if status is not None and status >= 500:
+        return "server_error", retry_after
+    if status is None and (isinstance(error, (ConnectionError, TimeoutError))
+                           or type(error).__name__ in ("APIConnectionError", "APITimeoutError")):
+        return "connection", retry_after
+    return None, None
+
+
+def estimate_tokens(messages: list) -> int:
+    """Prompt tokens plus the completion allowance"""
+    return sum(count_tokens(str(message.content)) for message in messages) + LLM_EXPECTED_OUTPUT_TOKENS
+
+
+def _used_tokens(response):
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+class RateLimiter:
+    """
+    Admission control and retries for LLM requests, shared by sync (thread)
+    and async callers.
+
+    call()/acall() take a function that sends the request. They wait until
+    the requests/minute and estimated tokens/minute buckets have room and a
+    concurrency slot is free, run it, and retry throttled (429), 5xx and
+    connection errors with jittered exponential backoff. The concurrency
+    limit grows by 1/limit per success and halves on a 429; a Retry-After
+    pauses every request, not just the throttled one.
+    """
+
+    def __init__(self, requests_per_minute: float = LLM_RPM, tokens_per_minute: float = LLM_TPM,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE, backoff_max: float = LLM_BACKOFF_MAX):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.stats = {"requests": 0, "throttled": 0, "retries": 0, "wait_seconds": 0.0}
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        set_llm_concurrency(int(self.limit), 0)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take a slot and bucket capacity, returning 0; or the seconds to wait before trying again"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.limit):
+            return _POLL_SECONDS
+        wait = max(self.requests.wait_time(1, now) if self.requests else 0.0,
+                   self.tokens.wait_time(tokens, now) if self.tokens else 0.0)
+        if wait > 0:
+            return wait
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens:
+            self.tokens.take(tokens)
+        self.in_flight += 1
+        self.stats["requests"] += 1
+        set_llm_concurrency(int(self.limit), self.in_flight)
+        return 0.0
+
+    def _acquired(self, started: float):
+        waited = time.monotonic() - started
+        record_llm_wait(waited)
+        with self._lock:
+            self.stats["wait_seconds"] += waited
+
+    def acquire(self, tokens: int):
+        """Block until the request may be sent"""
+        started = time.monotonic()
+        with self._lock:
+            while True:
+                wait = self._try_acquire(tokens)
+                if not wait:
+                    break
+                self._released.wait(wait)
+        self._acquired(started)
+
+    async def aacquire(self, tokens: int):
+        """Wait (without blocking the event loop) until the request may be sent"""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._try_acquire(tokens)
+            if not wait:
+                break
+            await asyncio.sleep(min(wait, 1.0) if wait > _POLL_SECONDS else wait)
+        self._acquired(started)
+
+    def release(self, tokens: int, response=None, throttled: bool = False, retry_after: float = None):
+        """
+        Return the slot. Successes grow the concurrency limit additively,
+        throttling halves it (at most once per pause) and pauses all
+        requests for retry_after.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            used = _used_tokens(response) if response is not None else None
+            if self.tokens and used is not None:
+                self.tokens.level += tokens - used
+            if throttled:
+                self.stats["throttled"] += 1
+                if now - self.last_decrease > max(retry_after or 0.0, 1.0):
+                    self.limit = max(1.0, self.limit / 2)
+                    self.last_decrease = now
+                # Our estimate of the provider's budget was too high
+                if self.tokens:
+                    self.tokens.drain()
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            elif response is not None:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            set_llm_concurrency(int(self.limit), self.in_flight)
+            self._released.notify_all()
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Delay before retry number attempt + 1: Retry-After if given, else full-jitter exponential"""
+        if retry_after:
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retry_delay(self, reason: str, retry_after: float, attempt: int):
+        """Seconds to wait before retrying a failed attempt, or None if the error is final"""
+        if reason is None or attempt >= self.max_retries:
+            return None
+        record_llm_retry(reason)
+        with self._lock:
+            self.stats["retries"] += 1
+        return self.backoff(attempt, retry_after)
+
+    def call(self, send, messages: list):
+        """Run send() (which performs the request for messages) under the limits, retrying transient errors"""
+        tokens = estimate_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens)
+            response, reason, retry_after = None, None, None
+            try:
+                response = send()
+                return response
+            except Exception as e:
+                reason, retry_after = classify_error(e)
+                delay = self._retry_delay(reason, retry_after, attempt)
+                if delay is None:
+                    raise
+            finally:
+                # Also runs on KeyboardInterrupt, so the slot is never lost
+                self.release(tokens, response, reason == "rate_limit", retry_after)
+            time.sleep(delay)
+
+    async def acall(self, send, messages: list):
+        """Async counterpart of call; send is a coroutine function"""
+        tokens = estimate_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            await self.aacquire(tokens)
+            response, reason, retry_after = None, None, None
+            try:
+                response = await send()
+                return response
+            except Exception as e:
+                reason, retry_after = classify_error(e)
+                delay = self._retry_delay(reason, retry_after, attempt)
+                if delay is None:
+                    raise
+            finally:
+                # Also runs when the caller is cancelled (CancelledError is not an Exception)
+                self.release(tokens, response, reason == "rate_limit", retry_after)
+            await asyncio.sleep(delay)
+
+
+def self_check():
+    """
+    Regression check: attempts that are cancelled mid-request (wait_for
+    timeouts, a worker losing its job lease) must give their slot back.
+    Raises AssertionError on failure.
+    """
+    from langchain_core.messages import HumanMessage
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0, max_concurrency=2)
+    messages = [HumanMessage(content="ping")]
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def answer():
+        return "ok"
+
+    async def run():
+        for _ in range(limiter.max_concurrency):
+            try:
+                await asyncio.wait_for(limiter.acall(hang, messages), 0.01)
+            except asyncio.TimeoutError:
+                pass
+        assert limiter.in_flight == 0, f"cancelled calls kept {limiter.in_flight} slot(s)"
+        assert await asyncio.wait_for(limiter.acall(answer, messages), 1.0) == "ok"
+
+    asyncio.run(run())
+    # The throwaway limiter overwrote the gauges; put the shared one's back
+    current = _limiter
+    if current is not None:
+        set_llm_concurrency(int(current.limit), current.in_flight)
+
+
+_limiter = None
+_limiter_ready = False
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """The shared RateLimiter, or None when LLM_RATE_LIMIT=0 / set_rate_limiter(None)"""
+    global _limiter, _limiter_ready
+    if not _limiter_ready:
+        with _limiter_lock:
+            if not _limiter_ready:
+                _limiter = RateLimiter() if LLM_RATE_LIMIT else None
+                _limiter_ready = True
+    return _limiter
+
+
+def set_rate_limiter(limiter=None):
+    """Replace the shared limiter (None sends requests unthrottled, e.g. to a fake model)"""
+    global _limiter, _limiter_ready
+    with _limiter_lock:
+        _limiter = limiter
+        _limiter_ready = True
+    # Clients are configured for the limiter (retries on or off); rebuild them
+    from utils import llm
+    llm.clear_models()
@@ -0,0 +1,148 @@
+from utils.telemetry import record_classifier_decision
+from dotenv import load_dotenv
+import threading
+import re
+import os
+
+load_dotenv()
+
+# Score at or above ACCEPT is a resume, at or below REJECT is not; anything
+# in between is left to the LLM classifier. REJECT only catches documents
+# with no resume signal at all (or non-resume vocabulary), so sparse resumes
+# still get an LLM opinion.
+ACCEPT_THRESHOLD = float(os.getenv("RESUME_HEURISTIC_ACCEPT", "6.0"))
+REJECT_THRESHOLD = float(os.getenv("RESUME_HEURISTIC_REJECT", "0.0"))
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+# Phone candidates: a digit run with separators, checked for 7+ digits once
+# year spans ("2018 - 2021") and numeric dates are blanked out
+PHONE_RE = re.compile(r"(?<![\w+])\+?\(?\d[\d\s().-]{5,18}\d(?!\w)")
+YEAR_SPAN_RE = re.compile(r"\b(?:19|20)\d{2}(?:\s*[-–—/]\s*|\s+)(?:(?:19|20)\d{2}|present|current|now)\b"
+                          r"|\b\d{4}[./-]\d{1,2}[./-]\d{1,2}\b|\b\d{1,2}[./-]\d{1,2}[./-]\d{4}\b", re.IGNORECASE)
+PROFILE_RE = re.compile(r"linkedin\.com|github\.com", re.IGNORECASE)
+HEADING_RE = re.compile(
+    r"\b(experience|work history|employment|education|skills|technical skills|summary|objective|"
+    r"projects|certifications?|achievements|internships?|publications)\b",
+    re.IGNORECASE
+)
+DATE_RANGE_RE = re.compile(
+    r"\b(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?(?:19|20)\d{2}\s*"
+    r"(?:-|–|—|to)\s*(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?"
+    r"(?:(?:19|20)\d{2}|present|current|now)\b",
+    re.IGNORECASE
+)
+NEGATIVE_RE = re.compile(
+    r"\b(invoice|receipt|amount due|total due|purchase order|terms and conditions|agreement|"
+    r"hereby|abstract|table of contents|chapter|dear (?:sir|madam|hiring)|sincerely|"
+    r"ingredients|lorem ipsum)\b",
+    re.IGNORECASE
+)
+
+# (weight, cap) per signal
+WEIGHTS = {
+    "email": (2.0, 2.0),
+    "phone": (1.0, 1.0),
+    "profile_link": (0.5, 0.5),
+    "heading": (1.0, 4.0),
+    "date_range": (1.0, 2.0),
+    "negative": (-2.0, -6.0),
+}
+
+
+class HeuristicStats:
+    """Counts how often the heuristic decided on its own vs. deferred to the LLM"""
+
+    def __init__(self):
+        self.positive = 0
+        self.negative = 0
+        self.deferred = 0
+        self._lock = threading.Lock()
+
+    def record(self, decision):
+        with self._lock:
+            if decision is True:
+                self.positive += 1
+                outcome = "resume"
+            elif decision is False:
+                self.negative += 1
+                outcome = "not_resume"
+            else:
+                self.deferred += 1
+                outcome = "deferred"
+        record_classifier_decision(outcome)
+
+    @property
+    def llm_calls_avoided(self) -> int:
+        return self.positive + self.negative
+
+    def since(self, before: dict) -> dict:
+        """as_dict() minus an earlier as_dict() snapshot"""
+        return {key: value - before[key] for key, value in self.as_dict().items()}
+
+    def as_dict(self) -> dict:
+        return {
+            "decided_resume": self.positive,
+            "decided_not_resume": self.negative,
+            "deferred_to_llm": self.deferred,
+            "llm_calls_avoided": self.llm_calls_avoided,
+        }
+
+
+stats = HeuristicStats()
+
+
+def has_phone(text: str) -> bool:
+    """Whether text contains something shaped like a phone number (7+ digits, not dates)"""
+    text = YEAR_SPAN_RE.sub(" ", text)
+    return any(sum(char.isdigit() for char in match.group()) >= 7 for match in PHONE_RE.finditer(text))
+
+
+def score_resume_text(text: str) -> float:
+    """
+    Score how resume-like a piece of text is using cheap local signals:
+    contact details, typical section headings and date ranges count for it,
+    invoice/paper/letter vocabulary counts against it.
+    """
+    headings = {match.lower() for match in HEADING_RE.findall(text)}
+    counts = {
+        "email": 1 if EMAIL_RE.search(text) else 0,
+        "phone": 1 if has_phone(text) else 0,
+        "profile_link": 1 if PROFILE_RE.search(text) else 0,
+        "heading": len(headings),
+        "date_range": len(DATE_RANGE_RE.findall(text)),
+        "negative": len({match.lower() for match in NEGATIVE_RE.findall(text)}),
+    }
+
+    score = 0.0
+    for signal, count in counts.items():
+        weight, cap = WEIGHTS[signal]
+        contribution = weight * count
+        score += max(contribution, cap) if weight < 0 else min(contribution, cap)
+    return score
+
+
+def classify_resume_text(text: str, accept: float = None, reject: float = None):
+    """
+    Decide locally whether text is a resume when the evidence is clear.
+
+    Args:
+        text: Document text (usually just the first page or so)
+        accept: Override ACCEPT_THRESHOLD
+        reject: Override REJECT_THRESHOLD
+
+    Returns:
+        True or False when confident, None when the LLM should decide
+    """
+    accept = ACCEPT_THRESHOLD if accept is None else accept
+    reject = REJECT_THRESHOLD if reject is None else reject
+
+    score = score_resume_text(text)
+    if score >= accept:
+        decision = True
+    elif score <= reject:
+        decision = False
+    else:
+        decision = None
+
+    stats.record(decision)
+    return decision
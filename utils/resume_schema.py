@@ -0,0 +1,75 @@
+from typing import TypedDict
+import re
+
+EMAIL_RE = re.compile(r"^[\w.+-]+@[\w-]+(\.[\w-]+)+$")
+PHONE_RE = re.compile(r"^\+?[\d\s().-]{7,20}$")
+
+
+class ExperienceEntry(TypedDict, total=False):
+    title: str
+    company: str
+    duration: str
+    responsibilities: list
+
+
+class EducationEntry(TypedDict, total=False):
+    degree: str
+    institution: str
+    year: str
+
+
+class ResumeData(TypedDict):
+    """Shape of extractor_agent output (see STRUCTURE_PROMPT)"""
+    name: str
+    email: str
+    phone: str
+    education: list  # of EducationEntry
+    skills: list     # of str
+    experience: list  # of ExperienceEntry
+
+
+def _check_entries(errors: list, field: str, entries: list, expected_keys: tuple):
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append(f"{field}[{index}] must be an object")
+        elif not any(entry.get(key) for key in expected_keys):
+            errors.append(f"{field}[{index}] needs at least one of: {', '.join(expected_keys)}")
+
+
+def validate_resume_data(data) -> list:
+    """
+    Check extracted resume data against ResumeData.
+
+    Returns:
+        list: Human-readable problems; empty when the data is valid
+    """
+    if not isinstance(data, dict):
+        return ["output must be a JSON object"]
+    if "raw_output" in data:
+        return ["output was not valid JSON"]
+
+    errors = []
+    for field, expected in ResumeData.__annotations__.items():
+        if field not in data:
+            errors.append(f"missing field '{field}'")
+        elif not isinstance(data[field], expected):
+            errors.append(f"'{field}' must be a {'list' if expected is list else 'string'}")
+    if errors:
+        return errors
+
+    if not data["name"].strip():
+        errors.append("'name' is empty")
+    email = data["email"].strip()
+    phone = data["phone"].strip()
+    if not email and not phone:
+        errors.append("no contact details: 'email' and 'phone' are both empty")
+    if email and not EMAIL_RE.match(email):
+        errors.append(f"'email' is not a valid address: {email!r}")
+    if phone and not PHONE_RE.match(phone):
+        errors.append(f"'phone' is not a valid phone number: {phone!r}")
+
+    if not all(isinstance(skill, str) for skill in data["skills"]):
+        errors.append("'skills' must be a list of strings")
+    _check_entries(errors, "experience", data["experience"], ("title", "company"))
+    _check_entries(errors, "education", data["education"], ("degree", "institution"))
+    return errors
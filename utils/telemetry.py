@@ -0,0 +1,302 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from contextvars import ContextVar
+from functools import wraps
+from langchain_core.runnables import RunnableLambda
+from utils.prompting import count_tokens
+from dotenv import load_dotenv
+import threading
+import inspect
+import logging
+import json
+import time
+import os
+
+load_dotenv()
+
+# Groq list prices for llama-3.1-8b-instant, USD per 1K tokens
+COST_PER_1K_INPUT = float(os.getenv("LLM_COST_PER_1K_INPUT", "0.00005"))
+COST_PER_1K_OUTPUT = float(os.getenv("LLM_COST_PER_1K_OUTPUT", "0.00008"))
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+logger = logging.getLogger("resume_ats.telemetry")
+if os.getenv("TELEMETRY_LOG"):
+    _handler = logging.FileHandler(os.getenv("TELEMETRY_LOG"), encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# Stats of the node currently running in this thread/task, filled in by record_llm_call
+_current_node = ContextVar("current_node", default=None)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+
+    def inc(self, labels: tuple, amount: float = 1.0):
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self, label_names: tuple) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+
+    def set(self, labels: tuple, value: float):
+        self.values[labels] = value
+
+    def render(self, label_names: tuple) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.values = {}
+
+    def observe(self, labels: tuple, value: float):
+        entry = self.values.setdefault(labels, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry["counts"][index] += 1
+        entry["sum"] += value
+        entry["count"] += 1
+
+    def render(self, label_names: tuple) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, entry in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, entry["counts"]):
+                lines.append(f"{self.name}_bucket{_labels(label_names + ('le',), labels + (_number(bound),))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(label_names + ('le',), labels + ('+Inf',))} {entry['count']}")
+            lines.append(f"{self.name}_sum{_labels(label_names, labels)} {_number(entry['sum'])}")
+            lines.append(f"{self.name}_count{_labels(label_names, labels)} {entry['count']}")
+        return lines
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_lock = threading.Lock()
+# (metric, label names)
+METRICS = {
+    "node_calls": (Counter("resume_node_calls_total", "Graph node executions"), ("node", "status")),
+    "node_duration": (Histogram("resume_node_duration_seconds", "Wall time per graph node",
+                                DURATION_BUCKETS), ("node",)),
+    "llm_calls": (Counter("resume_llm_calls_total", "LLM requests by node and source"), ("node", "source")),
+    "llm_duration": (Histogram("resume_llm_call_duration_seconds", "Latency of LLM requests (cache misses)",
+                               DURATION_BUCKETS), ("node",)),
+    "input_tokens": (Counter("resume_llm_input_tokens_total", "Prompt tokens sent to the LLM"), ("node",)),
+    "output_tokens": (Counter("resume_llm_output_tokens_total", "Completion tokens returned by the LLM"), ("node",)),
+    "prompt_tokens": (Histogram("resume_llm_prompt_tokens", "Prompt size per LLM request",
+                                TOKEN_BUCKETS), ("node",)),
+    "cost": (Counter("resume_llm_cost_usd_total", "Estimated LLM spend in USD"), ("node",)),
+    "llm_queue_wait": (Histogram("resume_llm_queue_wait_seconds", "Time LLM requests waited for the rate limiter",
+                                 DURATION_BUCKETS), ("node",)),
+    "llm_retries": (Counter("resume_llm_retries_total", "LLM requests retried after an error"), ("node", "reason")),
+    "llm_concurrency_limit": (Gauge("resume_llm_concurrency_limit", "Adaptive limit on concurrent LLM requests"), ()),
+    "llm_in_flight": (Gauge("resume_llm_in_flight", "LLM requests currently in flight"), ()),
+    "classifier_decisions": (Counter("resume_classifier_decisions_total",
+                                     "Resume pre-classifier outcomes (deferred ones go to the LLM)"), ("outcome",)),
+}
+
+
+def _update(metric: str, labels: tuple, value: float = 1.0):
+    instrument, _ = METRICS[metric]
+    with _lock:
+        if isinstance(instrument, Histogram):
+            instrument.observe(labels, value)
+        elif isinstance(instrument, Gauge):
+            instrument.set(labels, value)
+        else:
+            instrument.inc(labels, value)
+
+
+def record_llm_call(messages: list, response, duration: float, cache_hit: bool = False):
+    """
+    Attribute one LLM request to the running node.
+
+    Token counts come from the response's usage metadata when the provider
+    reports it and are estimated otherwise; cache hits cost no tokens.
+    """
+    stats = _current_node.get()
+    node = stats["node"] if stats else "unattributed"
+    if cache_hit:
+        _update("llm_calls", (node, "cache"))
+        if stats:
+            stats["cache_hits"] += 1
+        return
+
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens") or sum(count_tokens(str(message.content)) for message in messages)
+    output_tokens = usage.get("output_tokens") or count_tokens(str(response.content))
+    cost = input_tokens / 1000 * COST_PER_1K_INPUT + output_tokens / 1000 * COST_PER_1K_OUTPUT
+
+    _update("llm_calls", (node, "api"))
+    _update("llm_duration", (node,), duration)
+    _update("input_tokens", (node,), input_tokens)
+    _update("output_tokens", (node,), output_tokens)
+    _update("prompt_tokens", (node,), input_tokens)
+    _update("cost", (node,), cost)
+    if stats:
+        stats["llm_calls"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+        stats["cost_usd"] += cost
+
+
+def _current_node_name() -> str:
+    stats = _current_node.get()
+    return stats["node"] if stats else "unattributed"
+
+
+def record_llm_wait(seconds: float):
+    """Time the running node's LLM request spent queued in the rate limiter"""
+    _update("llm_queue_wait", (_current_node_name(),), seconds)
+
+
+def record_llm_retry(reason: str):
+    """An LLM request of the running node is being retried (rate_limit, server_error, connection)"""
+    _update("llm_retries", (_current_node_name(), reason))
+
+
+def record_classifier_decision(outcome: str):
+    """A resume pre-classifier outcome: resume, not_resume or deferred"""
+    _update("classifier_decisions", (outcome,))
+
+
+def set_llm_concurrency(limit: int, in_flight: int):
+    _update("llm_concurrency_limit", (), limit)
+    _update("llm_in_flight", (), in_flight)
+
+
+def _start(node: str):
+    stats = {"node": node, "llm_calls": 0, "cache_hits": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+    return stats, _current_node.set(stats), time.perf_counter()
+
+
+def _finish(stats: dict, token, started: float, error: Exception = None):
+    _current_node.reset(token)
+    duration = time.perf_counter() - started
+    status = "error" if error else "ok"
+    _update("node_calls", (stats["node"], status))
+    _update("node_duration", (stats["node"],), duration)
+
+    record = {
+        "event": "node",
+        "node": stats["node"],
+        "status": status,
+        "duration_ms": round(duration * 1000, 2),
+        "llm_calls": stats["llm_calls"],
+        "cache_hits": stats["cache_hits"],
+        "input_tokens": stats["input_tokens"],
+        "output_tokens": stats["output_tokens"],
+        "cost_usd": round(stats["cost_usd"], 8),
+    }
+    if error is not None:
+        record["error"] = f"{type(error).__name__}: {error}"
+    logger.info(json.dumps(record))
+
+
+def instrument_node(name: str):
+    """
+    Decorator recording wall time, LLM tokens, cache hits, cost and errors for
+    a node (sync or async). Each execution is logged as one JSON line.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                stats, token, started = _start(name)
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    _finish(stats, token, started, e)
+                    raise
+                _finish(stats, token, started)
+                return result
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            stats, token, started = _start(name)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                _finish(stats, token, started, e)
+                raise
+            _finish(stats, token, started)
+            return result
+        return wrapper
+    return decorator
+
+
+def traced_node(name: str, func, afunc=None):
+    """
+    Instrumented graph node: a plain function, or a RunnableLambda when an
+    async twin is given so the graph can run it with ainvoke.
+    """
+    if afunc is None:
+        return instrument_node(name)(func)
+    return RunnableLambda(instrument_node(name)(func), afunc=instrument_node(name)(afunc), name=name)
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        for instrument, label_names in METRICS.values():
+            lines.extend(instrument.render(label_names))
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path: str):
+    """Write the Prometheus text to a file (for node_exporter's textfile collector)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread (localhost only unless host says otherwise)"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
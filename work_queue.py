@@ -0,0 +1,408 @@
+"""
+Durable work queue on Postgres for running the pipeline on many machines.
+
+Jobs live in the jobs table (created by database.init_db). Any number of
+worker processes, on any number of hosts, claim them with
+SELECT ... FOR UPDATE SKIP LOCKED, so no broker is needed and adding
+workers adds throughput. A claimed job is leased to its worker and the lease
+is extended by a heartbeat; if the worker dies the lease expires and another
+worker picks the job up. Each stage (read, extract, ats, enhance, save)
+records its state, and its output where it has one, in the job row, so a retried job resumes after its last
+completed stage. Failures are retried with exponential backoff up to
+max_attempts.
+
+    python work_queue.py enqueue resumes/ --enhance
+    python work_queue.py work --concurrency 4
+    python work_queue.py status
+"""
+from main import aread_resume_text, afind_processed_resume, asave_complete_data, iter_batch_paths, get_filename
+from agents.extracctor_agent import aextractor_agent
+from agents.ats_agent import aats_agent
+from agents.enhancer_agent import aenhancer_agent
+from utils.checkpointing import clear_run
+from database import db_connection, arun_with_connection, content_hash, store_files, load_file
+from psycopg2.extras import Json
+from dotenv import load_dotenv
+import argparse
+import asyncio
+import datetime
+import random
+import socket
+import json
+import time
+import os
+
+load_dotenv()
+
+# A job not heartbeated for this long is considered abandoned and is claimed again
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+# Retry delay: JOB_RETRY_BASE * 2^(attempt - 1), capped, with jitter
+JOB_RETRY_BASE = float(os.getenv("JOB_RETRY_BASE", "5"))
+JOB_RETRY_MAX = float(os.getenv("JOB_RETRY_MAX", "600"))
+# Idle workers look for new jobs this often
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+STAGE_COLUMNS = {"extract": "extracted_json", "ats": "ats_report", "enhance": "enhanced_json"}
+
+CLAIM_JOB = """
+    UPDATE jobs SET
+        status = 'running',
+        attempts = attempts + 1,
+        lease_owner = %(owner)s,
+        lease_expires_at = now() + make_interval(secs => %(lease)s),
+        updated_at = now()
+    WHERE id = (
+        SELECT id FROM jobs
+        WHERE status IN ('queued', 'running')
+          AND run_after <= now()
+          AND (status = 'queued' OR lease_expires_at < now())
+          AND attempts < max_attempts
+        ORDER BY run_after, id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, content_hash, filename, enhance, attempts, max_attempts,
+              extracted_json, ats_report, enhanced_json;
+"""
+
+# Jobs whose last allowed attempt died with the worker
+FAIL_ABANDONED = """
+    UPDATE jobs SET status = 'failed', stage = NULL, lease_owner = NULL, lease_expires_at = NULL,
+        last_error = COALESCE(last_error, 'lease expired on the last attempt'),
+        finished_at = now(), updated_at = now()
+    WHERE status = 'running' AND lease_expires_at < now() AND attempts >= max_attempts;
+"""
+
+
+class LeaseLost(Exception):
+    """The job was reclaimed by another worker (our lease expired)"""
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds before retrying after the given (1-based) failed attempt"""
+    delay = min(JOB_RETRY_MAX, JOB_RETRY_BASE * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _enqueue(conn, filename: str, file_bytes: bytes, enhance: bool, max_attempts: int) -> int:
+    file_hash = content_hash(file_bytes)
+    store_files(conn, [(file_hash, file_bytes)])
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO jobs (content_hash, filename, enhance, max_attempts)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (content_hash, enhance) WHERE status IN ('queued', 'running')
+            DO UPDATE SET updated_at = jobs.updated_at
+            RETURNING id;
+        """, (file_hash, filename, enhance, max_attempts))
+        return cur.fetchone()[0]
+
+
+def enqueue_job(filename: str, file_bytes: bytes, enhance: bool = False,
+                max_attempts: int = JOB_MAX_ATTEMPTS) -> int:
+    """
+    Queue a PDF for processing.
+
+    The file goes to resume_files; a file that already has an unfinished job
+    (same content and enhance flag) is not queued twice.
+
+    Returns:
+        int: Job ID
+    """
+    with db_connection() as conn:
+        return _enqueue(conn, filename, file_bytes, enhance, max_attempts)
+
+
+def _claim(conn, owner: str):
+    with conn.cursor() as cur:
+        cur.execute(CLAIM_JOB, {"owner": owner, "lease": JOB_LEASE_SECONDS})
+        row = cur.fetchone()
+        if row is None:
+            cur.execute(FAIL_ABANDONED)
+            return None
+    keys = ("id", "content_hash", "filename", "enhance", "attempts", "max_attempts",
+            "extracted_json", "ats_report", "enhanced_json")
+    return dict(zip(keys, row))
+
+
+def _extend_lease(conn, job_id: int, owner: str) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE jobs SET lease_expires_at = now() + make_interval(secs => %s), updated_at = now()
+            WHERE id = %s AND lease_owner = %s AND status = 'running'
+            RETURNING id;
+        """, (JOB_LEASE_SECONDS, job_id, owner))
+        return cur.fetchone() is not None
+
+
+def _update_job(conn, job_id: int, owner: str, stage: str, stage_state: dict, column: str = None, value=None):
+    """Record a stage's state (and output column); raises LeaseLost if the job is no longer ours"""
+    assignments = "stage = %s, stage_state = stage_state || %s::jsonb, updated_at = now()"
+    params = [stage, Json({stage: stage_state})]
+    if column:
+        assignments += f", {column} = %s"
+        params.append(Json(value))
+    with conn.cursor() as cur:
+        cur.execute(f"UPDATE jobs SET {assignments} WHERE id = %s AND lease_owner = %s;",
+                    params + [job_id, owner])
+        if cur.rowcount == 0:
+            raise LeaseLost(f"job {job_id}")
+
+
+def _finish(conn, job_id: int, owner: str, status: str, resume_id: int = None):
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE jobs SET status = %s, resume_id = %s, stage = NULL, lease_owner = NULL,
+                lease_expires_at = NULL, last_error = NULL, finished_at = now(), updated_at = now()
+            WHERE id = %s AND lease_owner = %s;
+        """, (status, resume_id, job_id, owner))
+        if cur.rowcount == 0:
+            raise LeaseLost(f"job {job_id}")
+
+
+def _fail(conn, job: dict, owner: str, error: str) -> str:
+    """Requeue the job after a backoff, or mark it failed after its last attempt; returns the new status"""
+    final = job["attempts"] >= job["max_attempts"]
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE jobs SET status = %s, run_after = now() + make_interval(secs => %s),
+                last_error = %s, stage = NULL, lease_owner = NULL, lease_expires_at = NULL,
+                finished_at = CASE WHEN %s THEN now() END, updated_at = now()
+            WHERE id = %s AND lease_owner = %s;
+        """, ("failed" if final else "queued", 0 if final else retry_delay(job["attempts"]),
+              error, final, job["id"], owner))
+    return "failed" if final else "queued"
+
+
+async def _run_stage(job: dict, owner: str, stage: str, func, *args):
+    """Run one pipeline stage, recording its state and output in the job row"""
+    started = time.perf_counter()
+    await arun_with_connection(_update_job, job["id"], owner, stage,
+                               {"status": "running", "attempt": job["attempts"], "started_at": _now()})
+    try:
+        value = await func(*args)
+    except Exception as e:
+        await arun_with_connection(_update_job, job["id"], owner, stage,
+                                   {"status": "failed", "attempt": job["attempts"], "error": str(e),
+                                    "seconds": round(time.perf_counter() - started, 3)})
+        raise
+    state = {"status": "done", "attempt": job["attempts"], "finished_at": _now(),
+             "seconds": round(time.perf_counter() - started, 3)}
+    await arun_with_connection(_update_job, job["id"], owner, stage, state, STAGE_COLUMNS.get(stage), value)
+    return value
+
+
+async def process_job(job: dict, owner: str) -> str:
+    """
+    Run the stages of a claimed job that have no stored output yet.
+
+    Returns:
+        str: Final status (done or not_resume)
+    """
+    file_bytes = await asyncio.to_thread(load_file, job["content_hash"])
+    # Node-level checkpoints within each stage (when CHECKPOINT_URL is set)
+    run_id = f"job-{job['id']}"
+
+    if job["extracted_json"] is None:
+        # A previously saved copy of the file supplies every stage it has
+        stored = await afind_processed_resume(file_bytes)
+        if stored and stored["extracted_json"]:
+            for stage, column in STAGE_COLUMNS.items():
+                if stored[column] is not None and job[column] is None:
+                    job[column] = stored[column]
+                    await arun_with_connection(_update_job, job["id"], owner, stage,
+                                               {"status": "reused", "resume_id": stored["resume_id"]},
+                                               column, stored[column])
+        else:
+            text = await _run_stage(job, owner, "read", aread_resume_text, file_bytes)
+            if text is None:
+                await arun_with_connection(_finish, job["id"], owner, "not_resume")
+                return "not_resume"
+            job["extracted_json"] = await _run_stage(job, owner, "extract", aextractor_agent, text, run_id)
+
+    if job["ats_report"] is None:
+        job["ats_report"] = await _run_stage(job, owner, "ats", aats_agent, job["extracted_json"], run_id)
+    if job["enhance"] and job["enhanced_json"] is None:
+        job["enhanced_json"] = await _run_stage(job, owner, "enhance", aenhancer_agent,
+                                                job["extracted_json"], job["ats_report"], run_id)
+
+    resume_id = await _run_stage(job, owner, "save", asave_complete_data, job["filename"], file_bytes,
+                                 job["extracted_json"], job["ats_report"], job["enhanced_json"])
+    await arun_with_connection(_finish, job["id"], owner, "done", resume_id)
+    await asyncio.to_thread(clear_run, run_id)
+    return "done"
+
+
+async def _process_with_lease(job: dict, owner: str) -> str:
+    """process_job with a heartbeat; gives the job up if the lease is lost"""
+    work = asyncio.ensure_future(process_job(job, owner))
+    lost = False
+
+    async def heartbeat():
+        nonlocal lost
+        # Track the expiry locally so a DB outage can't hide it
+        expires = time.monotonic() + JOB_LEASE_SECONDS
+        delay = JOB_LEASE_SECONDS / 3
+        while True:
+            await asyncio.sleep(delay)
+            attempted = time.monotonic()
+            try:
+                extended = await arun_with_connection(_extend_lease, job["id"], owner)
+            except Exception as e:
+                delay = JOB_LEASE_SECONDS / 12
+                if expires - time.monotonic() > delay:
+                    print(f"⚠️  Job {job['id']}: could not extend lease, retrying in {delay:.0f}s: {e}")
+                    continue
+                print(f"❌ Job {job['id']}: lease runs out before it can be extended: {e}")
+                extended = False
+            if not extended:
+                lost = True
+                work.cancel()
+                return
+            expires = attempted + JOB_LEASE_SECONDS
+            delay = JOB_LEASE_SECONDS / 3
+
+    beat = asyncio.create_task(heartbeat())
+    try:
+        return await work
+    except asyncio.CancelledError:
+        if lost:
+            raise LeaseLost(f"job {job['id']}")
+        raise
+    finally:
+        beat.cancel()
+        for outcome in await asyncio.gather(beat, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                print(f"❌ Job {job['id']}: heartbeat failed: {outcome!r}")
+
+
+async def _worker_slot(owner: str, stop: asyncio.Event, stats: dict, drain: bool):
+    while not stop.is_set():
+        try:
+            job = await arun_with_connection(_claim, owner)
+        except Exception as e:
+            print(f"❌ {owner}: could not claim a job: {e}")
+            job = None
+        if job is None:
+            if drain:
+                return
+            # Jitter keeps idle workers from polling in lockstep
+            await asyncio.sleep(JOB_POLL_INTERVAL * random.uniform(0.5, 1.5))
+            continue
+
+        start = time.perf_counter()
+        try:
+            status = await _process_with_lease(job, owner)
+            print(f"✅ Job {job['id']} ({job['filename']}): {status} in {time.perf_counter() - start:.1f}s")
+        except LeaseLost:
+            status = "lease_lost"
+            print(f"⚠️  Job {job['id']} lost its lease, dropping it (it will be retried or is already running elsewhere)")
+        except Exception as e:
+            try:
+                status = await arun_with_connection(_fail, job, owner, str(e))
+            except Exception as db_error:
+                # The lease will expire and the job will be retried
+                status = "error"
+                print(f"❌ Job {job['id']}: could not record failure: {db_error}")
+            print(f"❌ Job {job['id']} attempt {job['attempts']}/{job['max_attempts']} failed "
+                  f"({'will retry' if status == 'queued' else status}): {e}")
+        stats[status] = stats.get(status, 0) + 1
+
+
+async def run_worker(concurrency: int = 4, drain: bool = False, worker_name: str = None) -> dict:
+    """
+    Claim and process jobs until interrupted.
+
+    Args:
+        concurrency: Jobs processed at once by this process
+        drain: Return once no job is claimable instead of polling
+        worker_name: Lease owner prefix (default host:pid)
+
+    Returns:
+        dict: Count of jobs by outcome
+    """
+    name = worker_name or f"{socket.gethostname()}:{os.getpid()}"
+    stop = asyncio.Event()
+    stats = {}
+    slots = [_worker_slot(f"{name}:{slot}", stop, stats, drain) for slot in range(concurrency)]
+    try:
+        await asyncio.gather(*slots)
+    finally:
+        stop.set()
+    return stats
+
+
+def _queue_status(conn) -> dict:
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT status, count(*), min(created_at) FILTER (WHERE status = 'queued')
+            FROM jobs GROUP BY status;
+        """)
+        rows = cur.fetchall()
+        cur.execute("""
+            SELECT id, filename, attempts, last_error FROM jobs
+            WHERE status = 'failed' ORDER BY finished_at DESC LIMIT 10;
+        """)
+        failed = cur.fetchall()
+    oldest = min((row[2] for row in rows if row[2]), default=None)
+    return {
+        "counts": {row[0]: row[1] for row in rows},
+        "oldest_queued": oldest.isoformat() if oldest else None,
+        "recent_failures": [{"id": row[0], "filename": row[1], "attempts": row[2], "error": row[3]}
+                            for row in failed],
+    }
+
+
+def queue_status() -> dict:
+    """Job counts by status, the oldest queued job and recent failures"""
+    with db_connection() as conn:
+        return _queue_status(conn)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Durable Postgres work queue for the resume pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue PDFs from a directory or manifest file")
+    enqueue.add_argument("source", help="Directory of PDFs or manifest file (one path per line)")
+    enqueue.add_argument("--enhance", action="store_true", help="Also run the enhancer agent")
+    enqueue.add_argument("--max-attempts", type=int, default=JOB_MAX_ATTEMPTS)
+
+    work = commands.add_parser("work", help="Process queued jobs")
+    work.add_argument("--concurrency", type=int, default=4, help="Jobs processed at once by this worker")
+    work.add_argument("--drain", action="store_true", help="Exit when no job is left instead of polling")
+    work.add_argument("--name", help="Worker name used as lease owner (default host:pid)")
+
+    commands.add_parser("status", help="Show queue counts and recent failures")
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        # One transaction per file: workers can start on the first jobs right
+        # away, and a bad file doesn't undo the ones queued before it
+        count, failed = 0, []
+        for path in iter_batch_paths(args.source):
+            try:
+                with open(path, "rb") as f:
+                    file_bytes = f.read()
+                enqueue_job(get_filename(path), file_bytes, args.enhance, args.max_attempts)
+                count += 1
+            except Exception as e:
+                failed.append(path)
+                print(f"❌ Could not queue {path}: {e}")
+        print(f"📥 Queued {count} file(s)" + (f", {len(failed)} failed" if failed else ""))
+        if failed:
+            raise SystemExit(1)
+    elif args.command == "work":
+        print(f"🚀 Worker processing jobs (concurrency {args.concurrency})")
+        try:
+            stats = asyncio.run(run_worker(max(1, args.concurrency), args.drain, args.name))
+            print(f"📊 {json.dumps(stats)}")
+        except KeyboardInterrupt:
+            print("\n👋 Stopped; unfinished jobs will be picked up once their lease expires")
+    else:
+        print(json.dumps(queue_status(), indent=2))